@@ -0,0 +1,383 @@
+"""Imports items of a profile into other profiles without the QGIS GUI, e.g. for provisioning many
+machines.
+
+Run with the Python interpreter of QGIS, from the directory containing the plugin:
+
+    python -m profile_manager --source template --plugin "*" --bookmarks target1 target2
+    python -m profile_manager --source template --data-source "WMS/*" target1
+    python -m profile_manager --recipe template.json --plan template.plan.json target1 target2
+    python -m profile_manager --recipe template.json --dry-run target1
+
+Each target profile is imported into by a separate worker process, with the same importers, backups
+and restoring on errors as in the dialog.
+"""
+
+import argparse
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from os import cpu_count, path
+
+from qgis.core import Qgis, QgsApplication
+
+from profile_manager.backups.backup_archive import create_backup_archive
+from profile_manager.backups.backup_creator import create_backup
+from profile_manager.backups.backup_retention import prune_backups
+from profile_manager.backups.backup_settings import DEFAULT_BACKUP_SETTINGS
+from profile_manager.datasources.dataservices.change_set import (
+    UNCHANGED,
+    ChangeSet,
+    ChangeSetOutdated,
+    compute_import_change_set,
+)
+from profile_manager.datasources.dataservices.datasource_handler import (
+    DataSourceSelection,
+)
+from profile_manager.datasources.dataservices.import_plan import (
+    RECIPE_ITEM_FLAGS,
+    ImportPlan,
+    compile_recipe,
+    load_import_plan,
+)
+from profile_manager.tasks.datasource_tasks import ImportTask
+from profile_manager.utils import get_backup_path, get_qgis_profiles_path
+
+# QgsApplication of a worker process or dry run, kept alive for the process's lifetime
+qgs_application = None
+
+
+def main(arguments: list[str] = None) -> int:
+    """Parses the command line and imports into all target profiles.
+
+    Args:
+        arguments (list[str]): Command line arguments, sys.argv if None
+
+    Returns:
+        int: Exit code, 0 if all imports succeeded
+    """
+    arguments, plan = parse_arguments(arguments)
+    selections = {
+        target_profile_name: plan.create_selection(
+            arguments.profiles_path, target_profile_name
+        )
+        for target_profile_name in arguments.targets
+    }
+    if arguments.dry_run:
+        return print_change_sets(selections, arguments.verbose)
+
+    exit_code = import_into_profiles(selections, arguments)
+    if arguments.prune:
+        prune_backups(
+            arguments.backup_path,
+            DEFAULT_BACKUP_SETTINGS["keep_last"],
+            DEFAULT_BACKUP_SETTINGS["keep_daily"],
+            DEFAULT_BACKUP_SETTINGS["keep_weekly"],
+        )
+    return exit_code
+
+
+def parse_arguments(
+    arguments: list[str] = None,
+) -> tuple[argparse.Namespace, ImportPlan]:
+    """Parses and checks the command line, exiting with a usage error if it is invalid.
+
+    Args:
+        arguments (list[str]): Command line arguments, sys.argv if None
+
+    Returns:
+        tuple[argparse.Namespace, ImportPlan]: Parsed arguments and the plan of what to import
+    """
+    parser = create_argument_parser()
+    arguments = parser.parse_args(arguments)
+    # the backup functions expect a trailing separator
+    arguments.backup_path = path.join(arguments.backup_path, "")
+
+    if arguments.recipe and (
+        arguments.source
+        or arguments.data_sources
+        or arguments.plugins
+        or arguments.all
+        or arguments.update_plugins
+        or any(getattr(arguments, flag) for flag in RECIPE_ITEM_FLAGS)
+    ):
+        parser.error("--recipe can not be combined with --source or item selectors")
+    if not arguments.recipe and not arguments.source:
+        parser.error("Either --recipe or --source is required")
+
+    for profile_name in arguments.targets:
+        if not path.isdir(path.join(arguments.profiles_path, profile_name)):
+            parser.error(
+                f"Profile '{profile_name}' not found in {arguments.profiles_path}"
+            )
+
+    try:
+        plan = create_import_plan(arguments)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    if plan.source_profile_name in arguments.targets:
+        parser.error("Target profiles can not include the source profile")
+    return arguments, plan
+
+
+def create_import_plan(arguments: argparse.Namespace) -> ImportPlan:
+    """Returns the import plan of the recipe file or of the item selectors on the command line.
+
+    Raises:
+        OSError: If the recipe or the source profile can not be read
+        ValueError: If the recipe is invalid or a selector matches nothing
+    """
+    if arguments.recipe:
+        return load_import_plan(
+            arguments.recipe, arguments.profiles_path, arguments.plan
+        )
+    return compile_recipe(
+        {
+            "source": arguments.source,
+            "data_sources": arguments.data_sources,
+            "plugins": arguments.plugins,
+            "update_plugins": arguments.update_plugins,
+            **{
+                flag: arguments.all or getattr(arguments, flag)
+                for flag in RECIPE_ITEM_FLAGS
+            },
+        },
+        arguments.profiles_path,
+    )
+
+
+def print_change_sets(selections: dict[str, DataSourceSelection], verbose: bool) -> int:
+    """Prints the changes the imports would make to the target profiles, without writing anything.
+
+    QGIS is initialized like in the worker processes of an import, so the change sets are computed
+    the same way.
+
+    Args:
+        selections (dict[str, DataSourceSelection]): Selection of each target profile by its name
+        verbose (bool): If informational log messages should be printed
+
+    Returns:
+        int: Exit code, always 0
+    """
+    init_qgis(verbose)
+    for target_profile_name, selection in selections.items():
+        print_change_set(target_profile_name, compute_import_change_set(selection))
+    return 0
+
+
+def import_into_profiles(
+    selections: dict[str, DataSourceSelection], arguments: argparse.Namespace
+) -> int:
+    """Imports into the target profiles in parallel worker processes, printing the result of each.
+
+    Args:
+        selections (dict[str, DataSourceSelection]): Selection of each target profile by its name
+        arguments (argparse.Namespace): Parsed command line arguments
+
+    Returns:
+        int: Exit code, 0 if all imports succeeded
+    """
+    failed_profile_names = []
+    with ProcessPoolExecutor(
+        max_workers=arguments.jobs,
+        initializer=init_qgis,
+        initargs=(arguments.verbose,),
+    ) as executor:
+        futures = {
+            executor.submit(
+                import_into_profile,
+                selection,
+                arguments.backup_path,
+                arguments.archive_backups,
+            ): target_profile_name
+            for target_profile_name, selection in selections.items()
+        }
+        for future in as_completed(futures):
+            target_profile_name = futures[future]
+            try:
+                success, error_messages, backup = future.result()
+            except Exception as e:
+                success, error_messages, backup = False, [str(e)], None
+
+            if success and not error_messages:
+                print(f"{target_profile_name}: imported (backup: {backup})")
+            else:
+                failed_profile_names.append(target_profile_name)
+                print(f"{target_profile_name}: failed", file=sys.stderr)
+                for error_message in error_messages:
+                    print(f"    {error_message}", file=sys.stderr)
+    return 1 if failed_profile_names else 0
+
+
+def create_argument_parser() -> argparse.ArgumentParser:
+    """Returns the parser of the command line arguments"""
+    parser = argparse.ArgumentParser(
+        prog="python -m profile_manager",
+        description="Imports data sources, plugins and other items of a QGIS profile into other "
+        "profiles.",
+    )
+    parser.add_argument(
+        "--recipe",
+        help="JSON or TOML recipe naming the source profile and the items to import, instead of "
+        "the options below",
+    )
+    parser.add_argument(
+        "--plan",
+        help="file to save the recipe's compiled import plan to and reuse it from while the recipe "
+        "and the source profile are unchanged",
+    )
+    parser.add_argument("--source", help="name of the profile to import from")
+    parser.add_argument(
+        "targets", nargs="+", help="names of the profiles to import into"
+    )
+    parser.add_argument(
+        "--data-source",
+        dest="data_sources",
+        action="append",
+        default=[],
+        metavar="PROVIDER/NAME",
+        help='data source connection to import, e.g. "PostgreSQL/My DB", NAME "*" for all '
+        'connections of the provider, PROVIDER "*" for all providers (repeatable)',
+    )
+    parser.add_argument(
+        "--plugin",
+        dest="plugins",
+        action="append",
+        default=[],
+        metavar="NAME",
+        help='directory name of a plugin to import, "*" for all but core plugins (repeatable)',
+    )
+    parser.add_argument(
+        "--update-plugins",
+        action="store_true",
+        help="update imported plugins already installed in a target profile, rewriting only "
+        "changed files, unless the target profile has a newer version",
+    )
+    for flag in RECIPE_ITEM_FLAGS:
+        parser.add_argument(f"--{flag}", action="store_true", help=f"import {flag}")
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="import bookmarks, favourites, models, scripts, styles, functions and customizations",
+    )
+    parser.add_argument(
+        "--profiles-path",
+        default=get_qgis_profiles_path(),
+        help="directory containing the profiles (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--backup-path",
+        default=get_backup_path(),
+        help="directory to store the backups of the target profiles in (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--archive-backups",
+        action="store_true",
+        help="store backups as compressed ZIP archives",
+    )
+    parser.add_argument(
+        "--prune",
+        action="store_true",
+        help="remove old backups afterwards, keeping the default number of recent, daily and "
+        "weekly backups",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=cpu_count(),
+        help="number of profiles imported into in parallel (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="only print the changes the import would make to each target profile, without writing "
+        "anything",
+    )
+    parser.add_argument(
+        "--verbose", action="store_true", help="print informational log messages"
+    )
+    return parser
+
+
+def print_change_set(target_profile_name: str, change_set: ChangeSet):
+    """Prints the changes an import would make to a target profile, leaving out unchanged items"""
+    print(f"{target_profile_name}:")
+    for change in change_set.changes:
+        if change.action != UNCHANGED:
+            print(f"    {change.action}: {change.category}: {change.item}")
+    for error_message in change_set.error_messages:
+        print(f"    {error_message}", file=sys.stderr)
+
+
+def init_qgis(verbose: bool):
+    """Initializes QGIS for a worker process or a dry run, printing its message log to stderr"""
+    global qgs_application
+    if qgs_application is not None:
+        return
+    qgs_application = QgsApplication.instance() or QgsApplication([], False)
+    minimum_level = Qgis.Info if verbose else Qgis.Warning
+    QgsApplication.messageLog().messageReceived.connect(
+        lambda message, tag, level: (
+            print(f"[{tag}] {message}", file=sys.stderr)
+            if level >= minimum_level
+            else None
+        )
+    )
+
+
+def import_into_profile(
+    selection: DataSourceSelection, backup_path: str, archive_backups: bool
+) -> tuple[bool, list[str], str]:
+    """Backs up the target profile and imports the selected items into it, run in a worker process.
+
+    Args:
+        selection (DataSourceSelection): Profiles and items to import
+        backup_path (str): Directory to store the backup of the target profile in
+        archive_backups (bool): If the backup should be a compressed archive
+
+    Returns:
+        tuple[bool, list[str], str]: If the import succeeded, error messages and the path of the
+            backup
+    """
+    target_profile_path = selection.target_profile_path.rstrip("/\\")
+    target_profile_name = path.basename(target_profile_path)
+    paths_to_back_up = (
+        selection.get_import_write_set() if DEFAULT_BACKUP_SETTINGS["scoped"] else None
+    )
+    if archive_backups:
+
+        def backup_function(is_canceled):
+            return create_backup_archive(
+                target_profile_path,
+                backup_path,
+                target_profile_name,
+                paths_to_back_up=paths_to_back_up,
+                is_canceled=is_canceled,
+            )
+
+    else:
+
+        def backup_function(is_canceled):
+            return create_backup(
+                target_profile_path,
+                backup_path,
+                target_profile_name,
+                incremental=DEFAULT_BACKUP_SETTINGS["incremental"],
+                paths_to_back_up=paths_to_back_up,
+                is_canceled=is_canceled,
+            )
+
+    task = ImportTask(selection, backup_function)
+    success = task.run()
+    error_messages = list(task.error_messages)
+    if isinstance(task.exception, ChangeSetOutdated):
+        error_messages.insert(0, str(task.exception))
+    elif task.exception is not None and task.backup is None:
+        error_messages.insert(0, f"Backup could not be created: {task.exception}")
+    elif task.exception is not None:
+        error_messages.insert(
+            0, f"Import failed, the profile has been restored: {task.exception}"
+        )
+    return success, error_messages, task.backup
+
+
+if __name__ == "__main__":
+    sys.exit(main())
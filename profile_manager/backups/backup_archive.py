@@ -0,0 +1,159 @@
+import json
+import time
+from os import makedirs, path, remove, walk
+from zipfile import ZIP_DEFLATED, ZipFile
+
+from qgis.core import Qgis, QgsMessageLog
+
+from profile_manager.backups.backup_creator import (
+    BACKUP_ARCHIVE_SUFFIX,
+    BACKUP_MANIFEST_FILE_NAME,
+    get_unused_backup_path,
+)
+
+
+def create_backup_archive(
+    profile_path: str,
+    backup_path: str,
+    profile_name: str,
+    paths_to_back_up: list[str] = None,
+    progress_callback=None,
+    is_canceled=None,
+) -> str:
+    """Creates a backup of a profile as a compressed ZIP archive named by its timestamp.
+
+    Files are streamed into the archive one by one, no temporary copy of the profile is made. The
+    archive's central directory serves as its index, so its contents can be listed (see
+    list_backup_archive) without reading the whole file. The backup manifest is stored as the first
+    member of the archive.
+
+    This does not touch the GUI and may be called from a worker thread.
+
+    Args:
+        profile_path (str): Path to the profile to back up
+        backup_path (str): Directory containing all backups
+        profile_name (str): Name of the profile, stored in the backup's manifest
+        paths_to_back_up (list[str]): Paths relative to the profile to back up, the whole profile if
+            None
+        progress_callback (Callable[[float], None]): Called with the progress in percent after each
+            file
+        is_canceled (Callable[[], bool]): Checked after each file, the incomplete archive is removed
+            if it returns True
+
+    Returns:
+        str: Path to the created archive, None if canceled
+
+    Raises:
+        OSError: If a file could not be read or the archive could not be written
+    """
+    makedirs(backup_path, exist_ok=True)
+    timestamp = time.time()
+    archive_path = (
+        get_unused_backup_path(backup_path, int(timestamp)) + BACKUP_ARCHIVE_SUFFIX
+    )
+
+    QgsMessageLog.logMessage(
+        f"Backing up profile '{profile_path}' to '{archive_path}'",
+        "Profile Manager",
+        level=Qgis.Info,
+    )
+
+    if paths_to_back_up is None:
+        paths_to_back_up_in_profile = [""]
+    else:
+        paths_to_back_up_in_profile = paths_to_back_up
+    entries, missing_paths = collect_archive_entries(
+        profile_path, paths_to_back_up_in_profile
+    )
+    total_bytes = sum(size for _, _, size in entries)
+
+    manifest = {
+        "profile": profile_name,
+        "created": timestamp,
+        "mode": "full",
+        "format": "archive",
+        "scope": "full" if paths_to_back_up is None else "scoped",
+        "paths": paths_to_back_up,
+        "missing_paths": missing_paths,
+        "file_count": len(entries),
+        "total_bytes": total_bytes,
+    }
+
+    written_bytes = 0
+    try:
+        with ZipFile(archive_path, "x", compression=ZIP_DEFLATED) as archive:
+            archive.writestr(BACKUP_MANIFEST_FILE_NAME, json.dumps(manifest, indent=2))
+            for source_path, archive_name, size in entries:
+                archive.write(source_path, archive_name)
+                written_bytes += size
+                if progress_callback:
+                    progress_callback(100 * written_bytes / max(total_bytes, 1))
+                if is_canceled and is_canceled():
+                    break
+    except OSError:
+        if path.exists(archive_path):
+            remove(archive_path)
+        raise
+
+    if is_canceled and is_canceled():
+        remove(archive_path)
+        return None
+    return archive_path
+
+
+def collect_archive_entries(
+    profile_path: str, paths_to_back_up: list[str]
+) -> tuple[list[tuple[str, str, int]], list[str]]:
+    """Returns the files and directories to put into a backup archive.
+
+    Args:
+        profile_path (str): Path to the profile to back up
+        paths_to_back_up (list[str]): Paths relative to the profile, "" for the whole profile
+
+    Returns:
+        tuple: List of (path on disk, name in archive, size in bytes) and list of the paths that do
+            not exist
+    """
+    entries = []
+    missing_paths = []
+    for path_to_back_up in paths_to_back_up:
+        source = path.join(profile_path, path_to_back_up)
+        if path.isfile(source):
+            entries.append((source, path_to_back_up, path.getsize(source)))
+        elif path.isdir(source):
+            for directory, directory_names, file_names in walk(source):
+                relative_directory = path.relpath(directory, profile_path)
+                if not directory_names and not file_names:
+                    # keep empty directories
+                    entries.append((directory, relative_directory, 0))
+                for file_name in file_names:
+                    file_path = path.join(directory, file_name)
+                    entries.append(
+                        (
+                            file_path,
+                            path.normpath(path.join(relative_directory, file_name)),
+                            path.getsize(file_path),
+                        )
+                    )
+        else:
+            missing_paths.append(path_to_back_up)
+    return entries, missing_paths
+
+
+def list_backup_archive(archive_path: str) -> list[tuple[str, int]]:
+    """Returns the names and sizes of all files in a backup archive.
+
+    Only the archive's central directory is read, not the compressed files.
+
+    Args:
+        archive_path (str): Path to the backup archive
+
+    Returns:
+        list[tuple[str, int]]: Names and uncompressed sizes of the archived files
+    """
+    with ZipFile(archive_path) as archive:
+        return [
+            (info.filename, info.file_size)
+            for info in archive.infolist()
+            if info.filename != BACKUP_MANIFEST_FILE_NAME
+        ]
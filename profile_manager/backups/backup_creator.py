@@ -0,0 +1,221 @@
+import json
+import time
+from os import link, listdir, makedirs, path, remove, stat
+from shutil import copy2, copytree, rmtree
+from zipfile import BadZipFile, ZipFile
+
+from qgis.core import Qgis, QgsMessageLog
+
+# Written into the root of every backup to identify the backed up profile
+BACKUP_MANIFEST_FILE_NAME = "profile_manager_backup.json"
+# Suffix of backups stored as archive instead of a directory
+BACKUP_ARCHIVE_SUFFIX = ".zip"
+
+
+class BackupCanceled(Exception):
+    """Raised by the copy function of a backup to stop copytree when the backup was canceled"""
+
+
+def create_backup(
+    profile_path: str,
+    backup_path: str,
+    profile_name: str,
+    incremental: bool = True,
+    paths_to_back_up: list[str] = None,
+    is_canceled=None,
+) -> str:
+    """Creates a backup of a profile in a new timestamped directory.
+
+    In incremental mode, files that are unchanged (same size and modification time) since the
+    previous backup of the same profile are hardlinked to that backup instead of being copied again.
+    Every backup is still a complete directory tree of the backed up paths. Files are never modified
+    in place in a backup, so sharing them is safe. If the file system does not support hardlinks,
+    files are copied.
+
+    A scoped backup only contains the given paths of the profile, e.g. the files an import is about
+    to write. Its manifest lists these paths and which of them did not exist at backup time.
+
+    Args:
+        profile_path (str): Path to the profile to back up
+        backup_path (str): Directory containing all backups
+        profile_name (str): Name of the profile, stored in the backup's manifest
+        incremental (bool): If unchanged files should be hardlinked to the previous backup
+        paths_to_back_up (list[str]): Paths relative to the profile to back up, the whole profile if
+            None
+        is_canceled (Callable[[], bool]): Checked before each file, the incomplete backup is removed
+            if it returns True
+
+    Returns:
+        str: Path to the created backup, None if canceled
+
+    Raises:
+        OSError: If copytree raises something
+    """
+    timestamp = time.time()
+    target_path = get_unused_backup_path(backup_path, int(timestamp))
+
+    previous_backup_path = None
+    if incremental:
+        previous_backup_path = find_latest_backup(backup_path, profile_name)
+
+    QgsMessageLog.logMessage(
+        f"Backing up profile '{profile_path}' to '{target_path}'"
+        + (
+            f" (incremental to '{previous_backup_path}')"
+            if previous_backup_path
+            else ""
+        ),
+        "Profile Manager",
+        level=Qgis.Info,
+    )
+
+    if previous_backup_path:
+        copy_file = IncrementalCopier(previous_backup_path, target_path)
+    else:
+        copy_file = copy2
+
+    def copy_function(source_file: str, target_file: str) -> str:
+        if is_canceled and is_canceled():
+            raise BackupCanceled()
+        return copy_file(source_file, target_file)
+
+    missing_paths = []
+    try:
+        if paths_to_back_up is None:
+            copytree(profile_path, target_path, copy_function=copy_function)
+        else:
+            makedirs(target_path)
+            for path_to_back_up in paths_to_back_up:
+                source = path.join(profile_path, path_to_back_up)
+                target = path.join(target_path, path_to_back_up)
+                if path.isdir(source):
+                    copytree(source, target, copy_function=copy_function)
+                elif path.isfile(source):
+                    makedirs(path.dirname(target), exist_ok=True)
+                    copy_function(source, target)
+                else:
+                    missing_paths.append(path_to_back_up)
+    except BackupCanceled:
+        rmtree(target_path, ignore_errors=True)
+        return None
+
+    write_backup_manifest(
+        target_path,
+        {
+            "profile": profile_name,
+            "created": timestamp,
+            "mode": "incremental" if previous_backup_path else "full",
+            "previous": (
+                path.basename(previous_backup_path) if previous_backup_path else None
+            ),
+            "scope": "full" if paths_to_back_up is None else "scoped",
+            "paths": paths_to_back_up,
+            "missing_paths": missing_paths,
+            "format": "directory",
+        },
+    )
+    return target_path
+
+
+class IncrementalCopier:
+    """Copy function for copytree hardlinking files that are unchanged since a previous backup."""
+
+    def __init__(self, previous_backup_path: str, target_path: str):
+        self.previous_backup_path = previous_backup_path
+        self.target_path = target_path
+        # set to False on the first failed link, e.g. on FAT file systems
+        self.can_link = True
+
+    def __call__(self, source_file: str, target_file: str) -> str:
+        if self.can_link:
+            previous_file = path.join(
+                self.previous_backup_path, path.relpath(target_file, self.target_path)
+            )
+            if is_unchanged(source_file, previous_file):
+                try:
+                    link(previous_file, target_file)
+                    return target_file
+                except OSError:
+                    self.can_link = False
+        return copy2(source_file, target_file)
+
+
+def is_unchanged(source_file: str, previous_file: str) -> bool:
+    """Returns if the previous copy of a file has the same size and modification time as the file"""
+    try:
+        source_stat = stat(source_file)
+        previous_stat = stat(previous_file)
+    except OSError:
+        return False
+    return (
+        source_stat.st_size == previous_stat.st_size
+        and source_stat.st_mtime_ns == previous_stat.st_mtime_ns
+    )
+
+
+def get_unused_backup_path(backup_path: str, timestamp: int) -> str:
+    """Returns the path for a new backup, named by its timestamp and suffixed if that name is taken.
+
+    The returned path is also unused as archive, i.e. with BACKUP_ARCHIVE_SUFFIX appended.
+    """
+    target_path = backup_path + str(timestamp)
+    suffix = 1
+    while path.exists(target_path) or path.exists(target_path + BACKUP_ARCHIVE_SUFFIX):
+        target_path = f"{backup_path}{timestamp}_{suffix}"
+        suffix += 1
+    return target_path
+
+
+def find_latest_backup(backup_path: str, profile_name: str) -> str:
+    """Returns the path to the most recent directory backup of a profile or None if there is none.
+
+    Only backups with a manifest are considered, older backups do not record which profile they
+    contain.
+    """
+    latest_backup_path = None
+    latest_timestamp = None
+    for manifest_backup_path, manifest in read_backup_manifests(backup_path):
+        if manifest.get("profile") != profile_name:
+            continue
+        if manifest.get("format") == "archive":
+            continue  # files in archives can not be hardlinked
+        if latest_timestamp is None or manifest.get("created", 0) > latest_timestamp:
+            latest_backup_path = manifest_backup_path
+            latest_timestamp = manifest.get("created", 0)
+    return latest_backup_path
+
+
+def read_backup_manifests(backup_path: str) -> list[tuple[str, dict]]:
+    """Returns the paths and manifests of all backups with a readable manifest"""
+    if not path.isdir(backup_path):
+        return []
+
+    manifests = []
+    for backup_name in listdir(backup_path):
+        backup_dir = path.join(backup_path, backup_name)
+        manifest = read_backup_manifest(backup_dir)
+        if manifest is not None:
+            manifests.append((backup_dir, manifest))
+    return manifests
+
+
+def read_backup_manifest(backup_dir: str) -> dict:
+    """Returns the manifest of a backup directory or archive or None if it has none"""
+    try:
+        if backup_dir.endswith(BACKUP_ARCHIVE_SUFFIX):
+            with ZipFile(backup_dir) as archive:
+                return json.loads(archive.read(BACKUP_MANIFEST_FILE_NAME))
+        with open(path.join(backup_dir, BACKUP_MANIFEST_FILE_NAME)) as manifest_file:
+            return json.load(manifest_file)
+    except (OSError, KeyError, ValueError, BadZipFile):
+        return None
+
+
+def write_backup_manifest(backup_dir: str, manifest: dict):
+    """Writes the manifest into the root of a backup"""
+    manifest_path = path.join(backup_dir, BACKUP_MANIFEST_FILE_NAME)
+    if path.exists(manifest_path):
+        # might be hardlinked to another backup if a restored backup was backed up again
+        remove(manifest_path)
+    with open(manifest_path, "w") as manifest_file:
+        json.dump(manifest, manifest_file, indent=2)
@@ -0,0 +1,72 @@
+from os import makedirs, path, remove, sep
+from shutil import copy2, copytree, ignore_patterns, rmtree
+from zipfile import ZipFile
+
+from qgis.core import Qgis, QgsMessageLog
+
+from profile_manager.backups.backup_creator import (
+    BACKUP_ARCHIVE_SUFFIX,
+    BACKUP_MANIFEST_FILE_NAME,
+)
+
+
+def restore_backup(backup: str, profile_path: str, paths_to_restore: list[str]):
+    """Restores paths of a profile from a backup, e.g. to undo a canceled import.
+
+    Each path is replaced by its copy from the backup. Paths that are not in the backup did not
+    exist when it was created and are removed from the profile. The paths must be covered by the
+    backup's scope.
+
+    Files are copied, never hardlinked, so later changes to the profile can not modify the backup.
+
+    This does not touch the GUI and may be called from a worker thread.
+
+    Args:
+        backup (str): Path to the backup directory or archive
+        profile_path (str): Path to the profile to restore
+        paths_to_restore (list[str]): Paths relative to the profile to restore, "" for the whole
+            profile
+
+    Raises:
+        OSError: If a path could not be removed or restored
+    """
+    QgsMessageLog.logMessage(
+        f"Restoring {paths_to_restore} of profile '{profile_path}' from '{backup}'",
+        "Profile Manager",
+        level=Qgis.Info,
+    )
+
+    if backup.endswith(BACKUP_ARCHIVE_SUFFIX):
+        with ZipFile(backup) as archive:
+            archive_names = [
+                name for name in archive.namelist() if name != BACKUP_MANIFEST_FILE_NAME
+            ]
+            for path_to_restore in paths_to_restore:
+                remove_path(path.join(profile_path, path_to_restore))
+                archive_path = path_to_restore.replace(sep, "/")
+                for name in archive_names:
+                    if (
+                        not archive_path
+                        or name == archive_path
+                        or name.startswith(archive_path + "/")
+                    ):
+                        archive.extract(name, profile_path)
+        return
+
+    for path_to_restore in paths_to_restore:
+        source = path.join(backup, path_to_restore)
+        target = path.join(profile_path, path_to_restore)
+        remove_path(target)
+        if path.isdir(source):
+            copytree(source, target, ignore=ignore_patterns(BACKUP_MANIFEST_FILE_NAME))
+        elif path.isfile(source):
+            makedirs(path.dirname(target), exist_ok=True)
+            copy2(source, target)
+
+
+def remove_path(path_to_remove: str):
+    """Removes a file or directory tree if it exists"""
+    if path.isdir(path_to_remove) and not path.islink(path_to_remove):
+        rmtree(path_to_remove)
+    elif path.lexists(path_to_remove):
+        remove(path_to_remove)
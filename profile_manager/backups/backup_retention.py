@@ -0,0 +1,181 @@
+from collections import Counter
+from datetime import datetime
+from os import lstat, path, remove, walk
+from shutil import rmtree
+
+from qgis.core import Qgis, QgsMessageLog
+
+from profile_manager.backups.backup_creator import read_backup_manifests
+
+
+def prune_backups(
+    backup_path: str,
+    keep_last: int,
+    keep_daily: int,
+    keep_weekly: int,
+    max_total_bytes: int = 0,
+    is_canceled=None,
+) -> list[str]:
+    """Removes backups that are not covered by the retention policy.
+
+    Per profile, the most recent keep_last backups are kept, plus the most recent backup of each of
+    the last keep_daily days and of each of the last keep_weekly weeks that have backups. If
+    max_total_bytes is set, the oldest remaining backups are removed until the backups fit into that
+    budget, but the most recent backup of a profile is never removed.
+
+    Only backups with a manifest are considered, backups of older versions of this plugin are left
+    untouched. Files hardlinked between incremental backups are counted once, a backup is only
+    charged for the space that removing it actually frees, see select_backups_over_budget.
+
+    This does not touch the GUI and may be called from a worker thread.
+
+    Args:
+        backup_path (str): Directory containing all backups
+        keep_last (int): Number of most recent backups to keep per profile, at least 1
+        keep_daily (int): Number of days to keep the most recent backup of, per profile
+        keep_weekly (int): Number of weeks to keep the most recent backup of, per profile
+        max_total_bytes (int): Size budget for all backups, 0 for no budget
+        is_canceled (Callable[[], bool]): Checked before removing each backup
+
+    Returns:
+        list[str]: Paths of the removed backups
+    """
+    backups_per_profile = {}
+    for backup, manifest in read_backup_manifests(backup_path):
+        backups_per_profile.setdefault(manifest.get("profile"), []).append(
+            (manifest.get("created", 0), backup)
+        )
+
+    backups_to_keep = []
+    backups_to_remove = []
+    for backups in backups_per_profile.values():
+        backups.sort(reverse=True)  # most recent first
+        kept = select_backups_to_keep(backups, keep_last, keep_daily, keep_weekly)
+        for created, backup in backups:
+            if backup in kept:
+                backups_to_keep.append((created, backup))
+            else:
+                backups_to_remove.append(backup)
+
+    if max_total_bytes:
+        latest_backups = {backups[0][1] for backups in backups_per_profile.values()}
+        backups_to_remove += select_backups_over_budget(
+            backups_to_keep, latest_backups, max_total_bytes
+        )
+
+    removed_backups = []
+    for backup in backups_to_remove:
+        if is_canceled and is_canceled():
+            break
+        try:
+            if path.isdir(backup):
+                rmtree(backup)
+            else:
+                remove(backup)
+        except OSError as e:
+            QgsMessageLog.logMessage(
+                f"Could not remove backup '{backup}': {e}",
+                "Profile Manager",
+                level=Qgis.Warning,
+            )
+            continue
+        removed_backups.append(backup)
+        QgsMessageLog.logMessage(
+            f"Removed backup '{backup}' due to retention policy",
+            "Profile Manager",
+            level=Qgis.Info,
+        )
+
+    return removed_backups
+
+
+def select_backups_to_keep(
+    backups: list[tuple[float, str]], keep_last: int, keep_daily: int, keep_weekly: int
+) -> set[str]:
+    """Returns the backups of a profile that are covered by the retention policy.
+
+    Args:
+        backups (list[tuple[float, str]]): Creation timestamps and paths of the backups, most recent
+            first
+        keep_last (int): Number of most recent backups to keep, at least 1
+        keep_daily (int): Number of days to keep the most recent backup of
+        keep_weekly (int): Number of weeks to keep the most recent backup of
+
+    Returns:
+        set[str]: Paths of the backups to keep
+    """
+    kept = {backup for _, backup in backups[: max(keep_last, 1)]}
+
+    days = set()
+    weeks = set()
+    for created, backup in backups:
+        date = datetime.fromtimestamp(created).date()
+        if date not in days and len(days) < keep_daily:
+            days.add(date)
+            kept.add(backup)
+        week = date.isocalendar()[:2]
+        if week not in weeks and len(weeks) < keep_weekly:
+            weeks.add(week)
+            kept.add(backup)
+    return kept
+
+
+def select_backups_over_budget(
+    backups: list[tuple[float, str]], latest_backups: set[str], max_total_bytes: int
+) -> list[str]:
+    """Returns the oldest backups to remove so that the remaining ones fit into a size budget.
+
+    Incremental backups hardlink unchanged files to the previous backup, so a file's data is counted
+    once no matter how many backups link to it. Removing a backup only frees the files no remaining
+    backup links to.
+
+    Args:
+        backups (list[tuple[float, str]]): Creation timestamps and paths of the backups that may be
+            removed
+        latest_backups (set[str]): Paths of the most recent backup of each profile, these are never
+            removed
+        max_total_bytes (int): Size budget for the backups
+
+    Returns:
+        list[str]: Paths of the backups to remove, oldest first
+    """
+    backup_files = {backup: get_backup_files(backup) for _, backup in backups}
+    link_counts = Counter(
+        file_id for files in backup_files.values() for file_id in files
+    )
+    file_sizes = {}
+    for files in backup_files.values():
+        file_sizes.update(files)
+    total_bytes = sum(file_sizes.values())
+
+    backups_to_remove = []
+    for _, backup in sorted(backups):  # oldest first
+        if total_bytes <= max_total_bytes:
+            break
+        if backup in latest_backups:
+            continue
+        backups_to_remove.append(backup)
+        for file_id, size in backup_files[backup].items():
+            link_counts[file_id] -= 1
+            if not link_counts[file_id]:
+                total_bytes -= size
+    return backups_to_remove
+
+
+def get_backup_files(backup: str) -> dict[tuple[int, int], int]:
+    """Returns the size of each file of a backup directory or archive by device and inode number"""
+    file_paths = [backup]
+    if path.isdir(backup):
+        file_paths = [
+            path.join(directory, file_name)
+            for directory, _, file_names in walk(backup)
+            for file_name in file_names
+        ]
+    files = {}
+    for file_path in file_paths:
+        try:
+            file_stat = lstat(file_path)
+        except OSError:
+            continue
+        files[file_stat.st_dev, file_stat.st_ino] = file_stat.st_size
+    return files
@@ -0,0 +1,30 @@
+from qgis.PyQt.QtCore import QSettings
+
+# The backup behaviour can be tuned in QGIS' advanced settings editor below this group
+SETTINGS_GROUP = "profile_manager/backup"
+
+DEFAULT_BACKUP_SETTINGS = {
+    "incremental": True,  # hardlink files unchanged since the previous backup of the profile
+    "scoped": True,  # only back up the paths an import or removal of data sources writes to
+    "format": "directory",  # "directory" or "archive" for a compressed ZIP archive per backup
+    "prune": True,  # remove backups not covered by the retention settings below after each backup
+    "keep_last": 10,  # number of most recent backups kept per profile
+    "keep_daily": 7,  # number of days the most recent backup per profile is kept of
+    "keep_weekly": 4,  # number of weeks the most recent backup per profile is kept of
+    "max_total_megabytes": 0,  # size budget for all backups, 0 for unlimited
+}
+
+
+def get_backup_setting(name: str):
+    """Returns the value of a backup setting, falling back to its default.
+
+    Args:
+        name (str): Name of the setting, must be a key of DEFAULT_BACKUP_SETTINGS
+
+    Returns:
+        The stored value, converted to the type of the default value
+    """
+    default_value = DEFAULT_BACKUP_SETTINGS[name]
+    return QSettings().value(
+        f"{SETTINGS_GROUP}/{name}", default_value, type=type(default_value)
+    )
@@ -0,0 +1,131 @@
+from math import isfinite
+
+from qgis.PyQt.QtCore import Qt
+from qgis.PyQt.QtWidgets import QListWidgetItem
+
+from profile_manager.datasources.bookmarks.bookmark_index import BookmarkIndex
+from profile_manager.datasources.bookmarks.bookmark_preview_model import (
+    BookmarkPreviewModel,
+)
+from profile_manager.utils import tr
+
+
+class BookmarkDisplayer:
+    """Shows the source profile's bookmark groups and previews the bookmarks passing the filter.
+
+    Checking no group means all groups, an empty extent means any extent. An invalid extent lets no
+    bookmark through and the import is refused until it is corrected.
+    """
+
+    def __init__(self, profile_manager):
+        self.profile_manager = profile_manager
+        self.bookmark_index: BookmarkIndex = None
+        self.filtered_positions = []
+        # message telling why the entered extent is invalid, None if it is valid or empty
+        self.extent_error: str = None
+        self.preview_model = BookmarkPreviewModel(self.profile_manager.dlg)
+        self.profile_manager.dlg.bookmarkPreviewList.setModel(self.preview_model)
+
+    def populate_bookmark_filter(self, bookmark_file: str):
+        """Shows the groups of the bookmarks of a source profile and previews them
+
+        Args:
+            bookmark_file (str): Path to the source profile's bookmarks.xml
+        """
+        self.bookmark_index = self.profile_manager.scan_cache.get_bookmark_index(
+            bookmark_file
+        )
+
+        group_list_widget = self.profile_manager.dlg.bookmarkGroupList
+        group_list_widget.blockSignals(True)
+        group_list_widget.clear()
+        for group in self.bookmark_index.get_groups():
+            item = QListWidgetItem(group or tr("(No group)"))
+            item.setData(Qt.UserRole, group)
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            item.setCheckState(Qt.Unchecked)
+            group_list_widget.addItem(item)
+        group_list_widget.blockSignals(False)
+
+        self.update_preview()
+
+    def update_preview(self):
+        """Filters the bookmarks by the checked groups and entered extent and previews the result"""
+        if self.bookmark_index is None:
+            return
+
+        extent_edit = self.profile_manager.dlg.bookmarkExtentEdit
+        try:
+            extent = parse_extent(extent_edit.text())
+        except ValueError as e:
+            self.extent_error = str(e)
+            self.filtered_positions = []
+        else:
+            self.extent_error = None
+            self.filtered_positions = self.bookmark_index.filter(
+                self.get_filter_groups(), extent
+            )
+        extent_edit.setStyleSheet("color: red" if self.extent_error else "")
+        self.preview_model.set_bookmarks(self.bookmark_index, self.filtered_positions)
+        self.profile_manager.dlg.bookmarkPreviewLabel.setText(
+            self.extent_error
+            or tr("{0} of {1} bookmark(s) will be imported").format(
+                len(self.filtered_positions), self.bookmark_index.count()
+            )
+        )
+
+    def get_filter_groups(self) -> list[str]:
+        """Returns the checked groups, None if no group is checked"""
+        group_list_widget = self.profile_manager.dlg.bookmarkGroupList
+        groups = [
+            group_list_widget.item(row).data(Qt.UserRole)
+            for row in range(group_list_widget.count())
+            if group_list_widget.item(row).checkState() == Qt.Checked
+        ]
+        return groups or None
+
+    def get_filtered_positions(self) -> frozenset[int]:
+        """Returns the positions of the bookmarks to import, None if the filter lets all bookmarks
+        through"""
+        if self.bookmark_index is None or (
+            not self.extent_error
+            and len(self.filtered_positions) == self.bookmark_index.count()
+        ):
+            return None
+        return frozenset(self.filtered_positions)
+
+
+def parse_extent(text: str) -> tuple[float, float, float, float]:
+    """Parses an extent entered as "xmin, ymin, xmax, ymax", in any order of the corners.
+
+    Args:
+        text (str): Entered extent, empty for any extent
+
+    Returns:
+        tuple[float, float, float, float]: Minimum x, minimum y, maximum x and maximum y, None if
+            the text is empty
+
+    Raises:
+        ValueError: If the text is not four finite numbers separated by commas
+    """
+    if not text.strip():
+        return None
+    try:
+        min_x, min_y, max_x, max_y = (float(number) for number in text.split(","))
+    except ValueError:
+        min_x = min_y = max_x = max_y = None
+    if not all(
+        number is not None and isfinite(number)
+        for number in (min_x, min_y, max_x, max_y)
+    ):
+        raise ValueError(
+            tr(
+                "Invalid extent '{}', expected four numbers: xmin, ymin, xmax, ymax"
+            ).format(text)
+        )
+    return (
+        min(min_x, max_x),
+        min(min_y, max_y),
+        max(min_x, max_x),
+        max(min_y, max_y),
+    )
@@ -1,10 +1,17 @@
-from pathlib import Path
+from hashlib import sha256
+from os import path, remove, replace
+from shutil import copymode
+from tempfile import NamedTemporaryFile
 
 from lxml import etree as et
 from qgis.core import Qgis, QgsMessageLog
 
 
-def import_bookmarks(source_bookmark_file: str, target_bookmark_file: str):
+def import_bookmarks(
+    source_bookmark_file: str,
+    target_bookmark_file: str,
+    bookmark_positions: frozenset[int] = None,
+):
     """Imports spatial bookmarks from source to target profile.
 
     Spatial bookmarks are stored in bookmarks.xml, e.g.:
@@ -17,73 +24,146 @@ def import_bookmarks(source_bookmark_file: str, target_bookmark_file: str):
         ...
     </Bookmarks>
 
+    Bookmarks whose content (name, group, extent and CRS) equals a bookmark of the target file are
+    skipped, using a set of content hashes so the merge takes linear time. Bookmarks that only share
+    their name are both kept.
+
+    Both files are streamed: bookmarks are parsed, written to a new target file and discarded one by
+    one, so memory use only grows by a hash per bookmark. The new file replaces the target file when
+    it is complete.
+
     Args:
-        TODO
+        source_bookmark_file (str): Path to the source profile's bookmarks.xml
+        target_bookmark_file (str): Path to the target profile's bookmarks.xml, created if it does
+            not exist
+        bookmark_positions (frozenset[int]): Positions in the source file of the bookmarks to
+            import, e.g. filtered with a BookmarkIndex, None to import all bookmarks
 
     Returns:
         error_message (str): An error message, if something XML related failed.
     """
-    # get the element tree of the source file
-    QgsMessageLog.logMessage("import_bookmarks", "Profile Manager", level=Qgis.Critical)
+    temporary_file = NamedTemporaryFile(
+        dir=path.dirname(target_bookmark_file) or None,
+        prefix=".bookmarks.xml.",
+        suffix=".tmp",
+        delete=False,
+    )
     try:
-        source_tree = et.parse(
-            source_bookmark_file, et.XMLParser(remove_blank_text=True)
-        )
-
-        # check if target file exists
-        create_bookmark_file_if_not_exist(target_bookmark_file)
-        # get the element tree of the target file
-        # fill if empty
-        target_tree = et.parse(
-            target_bookmark_file, et.XMLParser(remove_blank_text=True)
-        )
-
-        # find all bookmark elements
-        source_root_tag = source_tree.findall("Bookmark")
-
-        # get the root element "Bookmarks"
-        target_tree_root = target_tree.getroot()
-
-        # Remove duplicate entries to prevent piling data
-        target_tree_root = remove_duplicates(
-            source_root_tag, target_tree, target_tree_root
-        )
-
-        # append the elements
-        for element in source_root_tag:
-            target_tree_root.append(element)
-
-        # overwrite the xml file
-        et.ElementTree(target_tree_root).write(
-            target_bookmark_file,
-            pretty_print=True,
-            encoding="utf-8",
-            xml_declaration=True,
-        )
-    except et.Error as e:
+        with temporary_file, et.xmlfile(temporary_file, encoding="utf-8") as xml_file:
+            xml_file.write_declaration()
+            with xml_file.element("Bookmarks"):
+                bookmark_hashes = set()
+                # the target's bookmarks first, keeping their order
+                if path.isfile(target_bookmark_file):
+                    for bookmark in iterate_bookmarks(target_bookmark_file):
+                        bookmark_hashes.add(get_bookmark_hash(bookmark))
+                        write_bookmark(xml_file, bookmark)
+                # then the source's bookmarks missing in the target, to prevent piling data
+                for position, bookmark in enumerate(
+                    iterate_bookmarks(source_bookmark_file)
+                ):
+                    if (
+                        bookmark_positions is not None
+                        and position not in bookmark_positions
+                    ):
+                        continue
+                    bookmark_hash = get_bookmark_hash(bookmark)
+                    if bookmark_hash not in bookmark_hashes:
+                        bookmark_hashes.add(bookmark_hash)
+                        write_bookmark(xml_file, bookmark)
+                xml_file.write("\n")
+        if path.isfile(target_bookmark_file):
+            copymode(target_bookmark_file, temporary_file.name)
+        replace(temporary_file.name, target_bookmark_file)
+    except (et.Error, OSError) as e:
+        if path.exists(temporary_file.name):
+            remove(temporary_file.name)
         # TODO: It would be nice to have a smaller and more specific try block but until then we except broadly
         error = f"{type(e)}: {str(e)}"
         QgsMessageLog.logMessage(error, "Profile Manager", level=Qgis.Warning)
         return error
 
 
-def remove_duplicates(source_root_tag, target_tree, target_tree_root):
-    """Removes bookmarks from target that exist in the (to be imported) source too."""
-    # TODO FIXME this only checks the name of the bookmarks which will lead to false positives
-    #            it is ok and supported by QGIS to have the same name for multiple bookmarks
-    #            TODO compare the complete content of the xml node!
-    target_root_tag = target_tree.findall("Bookmark")
-    for s_element in source_root_tag:
-        for t_element in target_root_tag:
-            if s_element.attrib["name"] == t_element.attrib["name"]:
-                target_tree_root.remove(t_element)
+def plan_bookmark_import(
+    source_bookmark_file: str,
+    target_bookmark_file: str,
+    bookmark_positions: frozenset[int] = None,
+) -> tuple[list[tuple[int, str]], list[tuple[int, str]]]:
+    """Returns which bookmarks import_bookmarks would add to the target file, writing nothing.
+
+    Args:
+        source_bookmark_file (str): Path to the source profile's bookmarks.xml
+        target_bookmark_file (str): Path to the target profile's bookmarks.xml
+        bookmark_positions (frozenset[int]): Positions in the source file of the bookmarks to
+            consider, None for all
+
+    Returns:
+        tuple[list[tuple[int, str]], list[tuple[int, str]]]: Position and name of the new bookmarks
+            and of the bookmarks that already exist in the target file
 
-    return target_tree_root
+    Raises:
+        lxml.etree.Error: If a file is not valid XML
+    """
+    bookmark_hashes = set()
+    if path.isfile(target_bookmark_file):
+        for bookmark in iterate_bookmarks(target_bookmark_file):
+            bookmark_hashes.add(get_bookmark_hash(bookmark))
+
+    new_bookmarks = []
+    existing_bookmarks = []
+    if not path.isfile(source_bookmark_file):
+        return new_bookmarks, existing_bookmarks
+    for position, bookmark in enumerate(iterate_bookmarks(source_bookmark_file)):
+        if bookmark_positions is not None and position not in bookmark_positions:
+            continue
+        bookmark_hash = get_bookmark_hash(bookmark)
+        if bookmark_hash in bookmark_hashes:
+            existing_bookmarks.append((position, bookmark.get("name", "")))
+        else:
+            bookmark_hashes.add(bookmark_hash)
+            new_bookmarks.append((position, bookmark.get("name", "")))
+    return new_bookmarks, existing_bookmarks
+
+
+def iterate_bookmarks(bookmark_file: str):
+    """Yields the bookmark elements of a bookmarks.xml file one by one.
+
+    Each element is cleared and removed from the parsed tree after it was processed, so memory use
+    does not grow with the number of bookmarks.
 
+    Args:
+        bookmark_file (str): Path to the bookmarks.xml file
 
-def create_bookmark_file_if_not_exist(bookmark_file):
-    """Checks if file exists and creates it if not"""
-    target_file = Path(bookmark_file)
-    if not target_file.is_file():
-        with open(bookmark_file, "w") as new_file:
-            new_file.write("<Bookmarks></Bookmarks>")
+    Yields:
+        Element: <Bookmark> element
+    """
+    for _, bookmark in et.iterparse(
+        bookmark_file, tag="Bookmark", remove_blank_text=True
+    ):
+        yield bookmark
+        bookmark.clear()
+        while bookmark.getprevious() is not None:
+            del bookmark.getparent()[0]
+
+
+def write_bookmark(xml_file, bookmark):
+    """Writes an indented copy of a bookmark into the <Bookmarks> element of a file being written"""
+    bookmark.tail = None
+    et.indent(bookmark, space="  ", level=1)
+    xml_file.write("\n  ")
+    xml_file.write(bookmark)
+
+
+def get_bookmark_hash(bookmark) -> str:
+    """Returns a hash of the content of a bookmark element, identical for duplicates.
+
+    The content consists of the name, group, extent and the canonical XML of the CRS. The id is
+    ignored, duplicates might have been created with different ids.
+    """
+    bookmark_hash = sha256()
+    for attribute in ("name", "group", "extent"):
+        bookmark_hash.update(bookmark.get(attribute, "").encode("utf-8"))
+        bookmark_hash.update(b"\0")
+    for crs in bookmark.iterchildren("spatialrefsys"):
+        bookmark_hash.update(et.tostring(crs, method="c14n"))
+    return bookmark_hash.hexdigest()
@@ -0,0 +1,172 @@
+import re
+import sqlite3
+from pathlib import Path
+
+from lxml import etree as et
+from qgis.core import Qgis, QgsMessageLog
+
+from profile_manager.datasources.bookmarks.bookmark_handler import (
+    get_bookmark_hash,
+    iterate_bookmarks,
+)
+
+# Numbers in the WKT of a bookmark's extent
+COORDINATE_PATTERN = re.compile(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+
+
+class BookmarkIndex:
+    """In-memory SQLite index of a bookmarks.xml file to filter the bookmarks by group and extent.
+
+    The file is parsed once, bookmarks are identified by their position in the file. Their bounding
+    boxes are stored in an R-tree, so filtering by extent does not scan all bookmarks. If the SQLite
+    library was built without the R-tree module, a plain table is used instead.
+
+    Extents are compared in the coordinates of each bookmark's own CRS, they are not reprojected.
+
+    The index must only be used on the thread that created it.
+    """
+
+    def __init__(self, bookmark_file: str):
+        """
+        Args:
+            bookmark_file (str): Path to the bookmarks.xml, an empty index is created if it does not
+                exist
+        """
+        self.db = sqlite3.connect(":memory:")
+        self.db.execute(
+            "CREATE TABLE bookmark "
+            "(position INTEGER PRIMARY KEY, name TEXT, group_name TEXT, content_hash TEXT)"
+        )
+        self.db.execute("CREATE INDEX bookmark_group ON bookmark (group_name)")
+        try:
+            self.db.execute(
+                "CREATE VIRTUAL TABLE bookmark_extent "
+                "USING rtree(position, min_x, max_x, min_y, max_y)"
+            )
+        except sqlite3.OperationalError:
+            self.db.execute(
+                "CREATE TABLE bookmark_extent "
+                "(position INTEGER PRIMARY KEY, min_x REAL, max_x REAL, min_y REAL, max_y REAL)"
+            )
+
+        if Path(bookmark_file).is_file():
+            self.load(bookmark_file)
+
+    def load(self, bookmark_file: str):
+        """Adds the bookmarks of a bookmarks.xml file to the index"""
+        bookmarks = []
+        extents = []
+        try:
+            for position, bookmark in enumerate(iterate_bookmarks(bookmark_file)):
+                bookmarks.append(
+                    (
+                        position,
+                        bookmark.get("name", ""),
+                        bookmark.get("group", ""),
+                        get_bookmark_hash(bookmark),
+                    )
+                )
+                extent = get_bounding_box(bookmark.get("extent", ""))
+                if extent:
+                    extents.append((position, *extent))
+        except et.Error as e:
+            QgsMessageLog.logMessage(
+                f"Could not index bookmarks in '{bookmark_file}': {e}",
+                "Profile Manager",
+                level=Qgis.Warning,
+            )
+        with self.db:
+            self.db.executemany("INSERT INTO bookmark VALUES (?, ?, ?, ?)", bookmarks)
+            self.db.executemany(
+                "INSERT INTO bookmark_extent VALUES (?, ?, ?, ?, ?)", extents
+            )
+
+    def count(self) -> int:
+        """Returns the number of indexed bookmarks"""
+        return self.db.execute("SELECT COUNT(*) FROM bookmark").fetchone()[0]
+
+    def get_groups(self) -> list[str]:
+        """Returns the distinct groups of the bookmarks, "" for bookmarks without group"""
+        return [
+            row[0]
+            for row in self.db.execute(
+                "SELECT DISTINCT group_name FROM bookmark ORDER BY group_name"
+            )
+        ]
+
+    def filter(
+        self,
+        groups: list[str] = None,
+        extent: tuple[float, float, float, float] = None,
+    ) -> list[int]:
+        """Returns the positions of the bookmarks in any of the groups and intersecting the extent.
+
+        Args:
+            groups (list[str]): Groups to filter by, None for all groups
+            extent (tuple[float, float, float, float]): Minimum x, minimum y, maximum x and maximum
+                y to filter by, None for any extent. Bookmarks without a valid extent never
+                intersect it.
+
+        Returns:
+            list[int]: Positions of the matching bookmarks in the file, in ascending order
+        """
+        query = "SELECT b.position FROM bookmark b"
+        conditions = []
+        parameters = []
+        if extent is not None:
+            min_x, min_y, max_x, max_y = extent
+            query += " JOIN bookmark_extent e ON e.position = b.position"
+            conditions.append(
+                "e.max_x >= ? AND e.min_x <= ? AND e.max_y >= ? AND e.min_y <= ?"
+            )
+            parameters.extend((min_x, max_x, min_y, max_y))
+        if groups is not None:
+            conditions.append(
+                "b.group_name IN ({})".format(", ".join("?" * len(groups)))
+            )
+            parameters.extend(groups)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY b.position"
+        return [row[0] for row in self.db.execute(query, parameters)]
+
+    def get_content_hashes(self) -> list[tuple[str, str, str]]:
+        """Returns name, group and content hash (see get_bookmark_hash) of the bookmarks in order"""
+        return self.db.execute(
+            "SELECT name, group_name, content_hash FROM bookmark ORDER BY position"
+        ).fetchall()
+
+    def get_bookmarks(self, positions: list[int]) -> list[tuple[str, str]]:
+        """Returns the name and group of the bookmarks at the positions, in the same order"""
+        bookmarks = {}
+        for position, name, group in self.db.execute(
+            "SELECT position, name, group_name FROM bookmark WHERE position IN ({})".format(
+                ", ".join("?" * len(positions))
+            ),
+            positions,
+        ):
+            bookmarks[position] = (name, group)
+        return [bookmarks[position] for position in positions]
+
+
+def get_bounding_box(extent_wkt: str) -> tuple[float, float, float, float]:
+    """Returns the bounding box of a bookmark's extent given as WKT, e.g. "POLYGON((...))".
+
+    Args:
+        extent_wkt (str): WKT of a 2D geometry
+
+    Returns:
+        tuple[float, float, float, float]: Minimum x, maximum x, minimum y and maximum y, None if
+            the WKT contains no coordinates
+    """
+    coordinates = [float(number) for number in COORDINATE_PATTERN.findall(extent_wkt)]
+    if len(coordinates) < 2:
+        return None
+    x_coordinates = coordinates[0::2]
+    y_coordinates = coordinates[1::2]
+    return (
+        min(x_coordinates),
+        max(x_coordinates),
+        min(y_coordinates),
+        max(y_coordinates),
+    )
@@ -0,0 +1,56 @@
+from qgis.PyQt.QtCore import QAbstractListModel, QModelIndex, Qt
+
+from profile_manager.datasources.bookmarks.bookmark_index import BookmarkIndex
+
+# Number of bookmarks loaded from the index whenever the view scrolls to the end of the loaded ones
+PREVIEW_BATCH_SIZE = 100
+
+
+class BookmarkPreviewModel(QAbstractListModel):
+    """List model of the bookmarks to import, loading them from the index in batches on scrolling"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.bookmark_index: BookmarkIndex = None
+        self.positions = []
+        self.loaded_bookmarks = []
+
+    def set_bookmarks(self, bookmark_index: BookmarkIndex, positions: list[int]):
+        """Replaces the previewed bookmarks, only loading the first batch of them.
+
+        Args:
+            bookmark_index (BookmarkIndex): Index the bookmarks are loaded from
+            positions (list[int]): Positions of the bookmarks to preview
+        """
+        self.beginResetModel()
+        self.bookmark_index = bookmark_index
+        self.positions = positions
+        self.loaded_bookmarks = []
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self.loaded_bookmarks)
+
+    def data(self, index: QModelIndex, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+        name, group = self.loaded_bookmarks[index.row()]
+        return f"{name} ({group})" if group else name
+
+    def canFetchMore(self, parent=QModelIndex()) -> bool:
+        if parent.isValid():
+            return False
+        return len(self.loaded_bookmarks) < len(self.positions)
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        first_row = len(self.loaded_bookmarks)
+        bookmarks = self.bookmark_index.get_bookmarks(
+            self.positions[first_row : first_row + PREVIEW_BATCH_SIZE]
+        )
+        self.beginInsertRows(QModelIndex(), first_row, first_row + len(bookmarks) - 1)
+        self.loaded_bookmarks.extend(bookmarks)
+        self.endInsertRows()
@@ -2,10 +2,18 @@ from configparser import RawConfigParser
 from os import path
 from shutil import copy2
 
+from profile_manager.datasources.dataservices.ini_session import (
+    IniSession,
+    open_ini_session,
+)
 from profile_manager.utils import adjust_to_operating_system
 
 
-def import_customizations(source_profile_path: str, target_profile_path: str):
+def import_customizations(
+    source_profile_path: str,
+    target_profile_path: str,
+    target_session: IniSession = None,
+):
     """Imports UI customizations from source to target profile.
 
     Copies the whole QGISCUSTOMIZATION3.ini file and also transfers the [UI] section from QGIS3.ini if available
@@ -19,18 +27,41 @@ def import_customizations(source_profile_path: str, target_profile_path: str):
     ...
 
     Args:
-        TODO
+        source_profile_path (str): Path to the source profile
+        target_profile_path (str): Path to the target profile
+        target_session (IniSession): Session to apply the changes to, the target INI file is written
+            directly if None
     """
-    # Copy (overwrite) the QGISCUSTOMIZATION3.ini if exist
-    source_customini_path = adjust_to_operating_system(
-        source_profile_path + "QGIS/QGISCUSTOMIZATION3.ini"
-    )
-    target_customini_path = adjust_to_operating_system(
-        target_profile_path + "QGIS/QGISCUSTOMIZATION3.ini"
-    )
+    import_customization_file(source_profile_path, target_profile_path)
+    import_ui_settings(source_profile_path, target_profile_path, target_session)
+
+
+def import_customization_file(source_profile_path: str, target_profile_path: str):
+    """Copies (overwrites) the QGISCUSTOMIZATION3.ini from source to target profile if it exists"""
+    source_customini_path = get_customization_file(source_profile_path)
+    target_customini_path = get_customization_file(target_profile_path)
     if path.exists(source_customini_path):
         copy2(source_customini_path, target_customini_path)
 
+
+def get_customization_file(profile_path: str) -> str:
+    """Returns the path to the QGISCUSTOMIZATION3.ini of a profile"""
+    return adjust_to_operating_system(profile_path + "QGIS/QGISCUSTOMIZATION3.ini")
+
+
+def import_ui_settings(
+    source_profile_path: str,
+    target_profile_path: str,
+    target_session: IniSession = None,
+):
+    """Copies the [UI] section from the source profile's QGIS3.ini to the target's
+
+    Args:
+        source_profile_path (str): Path to the source profile
+        target_profile_path (str): Path to the target profile
+        target_session (IniSession): Session to apply the changes to, the target INI file is written
+            directly if None
+    """
     # Copy [UI] section from QGIS3.ini
     source_qgis3ini_path = adjust_to_operating_system(
         source_profile_path + "QGIS/QGIS3.ini"
@@ -47,15 +78,11 @@ def import_customizations(source_profile_path: str, target_profile_path: str):
     if source_ini_parser.has_section("UI"):
         ui_data = dict(source_ini_parser.items("UI"))
 
-        target_ini_parser = RawConfigParser()
-        target_ini_parser.optionxform = str  # str = case-sensitive option names
-        target_ini_parser.read(target_qgis3ini_path)
-
-        for setting in ui_data:
-            if not target_ini_parser.has_section("UI"):
-                target_ini_parser["UI"] = {}
-
-            target_ini_parser.set("UI", setting, ui_data[setting])
+        with open_ini_session(
+            target_qgis3ini_path, target_session
+        ) as target_ini_parser:
+            for setting in ui_data:
+                if not target_ini_parser.has_section("UI"):
+                    target_ini_parser["UI"] = {}
 
-        with open(target_qgis3ini_path, "w") as qgisconf:
-            target_ini_parser.write(qgisconf, space_around_delimiters=False)
+                target_ini_parser.set("UI", setting, ui_data[setting])
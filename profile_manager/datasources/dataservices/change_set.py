@@ -0,0 +1,501 @@
+import sqlite3
+from configparser import RawConfigParser
+from dataclasses import dataclass, field
+from os import path
+
+from lxml import etree as et
+
+from profile_manager.datasources.bookmarks.bookmark_handler import plan_bookmark_import
+from profile_manager.datasources.customizations.customization_handler import (
+    get_customization_file,
+    import_ui_settings,
+)
+from profile_manager.datasources.dataservices.datasource_distributor import (
+    import_data_sources,
+    remove_data_sources,
+)
+from profile_manager.datasources.dataservices.datasource_handler import (
+    DataSourceSelection,
+)
+from profile_manager.datasources.dataservices.datasource_provider import ProfileSnapshot
+from profile_manager.datasources.dataservices.directory_sync import (
+    SyncSummary,
+    get_file_hash,
+)
+from profile_manager.datasources.dataservices.ini_session import IniSession
+from profile_manager.datasources.favourites.favourites_handler import import_favourites
+from profile_manager.datasources.functions.function_handler import (
+    import_expression_functions,
+)
+from profile_manager.datasources.models.model_handler import import_models
+from profile_manager.datasources.models.script_handler import import_scripts
+from profile_manager.datasources.plugins.plugin_catalog import get_plugin_version
+from profile_manager.datasources.plugins.plugin_importer import (
+    is_plugin_downgrade,
+    sync_plugin,
+)
+from profile_manager.datasources.styles.style_handler import (
+    StyleMergeSummary,
+    plan_style_import,
+)
+from profile_manager.utils import (
+    adjust_to_operating_system,
+    get_directory_state,
+    get_file_state,
+    tr,
+)
+
+# Actions of a change, in the order they are listed in
+ADDED = "added"
+OVERWRITTEN = "overwritten"
+RENAMED = "renamed"
+REMOVED = "removed"
+CONFLICT = "conflict"
+MISSING = "missing"
+UNCHANGED = "unchanged"
+CHANGE_ACTIONS = [ADDED, OVERWRITTEN, RENAMED, REMOVED, CONFLICT, MISSING, UNCHANGED]
+
+
+class ChangeSetOutdated(Exception):
+    """Raised when a change set is applied although the files it was computed from changed since"""
+
+
+@dataclass
+class Change:
+    """An item an import or removal changes, or leaves unchanged, in a profile"""
+
+    category: str
+    item: str
+    action: str
+
+
+class RecordingConfigParser(RawConfigParser):
+    """RawConfigParser remembering which options were set.
+
+    Options set to their current value can be told apart from untouched ones.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.optionxform = str  # str = case-sensitive option names
+        self.set_options = set()
+
+    def set(self, section, option, value=None):
+        super().set(section, option, value)
+        self.set_options.add((section, option))
+
+
+@dataclass
+class ChangeSet:
+    """The exact changes an import or removal makes to a profile, computed without writing anything.
+
+    The INI changes are already applied to ini_session, which only has to be committed. The files
+    the change set was computed from are recorded, a change set whose files changed since must be
+    computed again, see is_current.
+    """
+
+    changes: list[Change] = field(default_factory=list)
+    error_messages: list[str] = field(default_factory=list)
+    ini_session: IniSession = None
+    # positions of the source bookmarks that are not in the target profile yet
+    bookmark_positions: frozenset[int] = frozenset()
+    model_sync: SyncSummary = None
+    script_sync: SyncSummary = None
+    style_summary: StyleMergeSummary = None
+    copy_customization_file: bool = False
+    # modification time and size of the files read, None for missing files
+    file_states: dict[str, list[int]] = field(default_factory=dict)
+    # digest of the directory trees read, e.g. plugins, None for missing directories
+    directory_states: dict[str, str] = field(default_factory=dict)
+
+    def add(self, category: str, item: str, action: str):
+        """Adds a change"""
+        self.changes.append(Change(category, item, action))
+
+    def count(self, action: str) -> int:
+        """Returns the number of changes with the action"""
+        return sum(1 for change in self.changes if change.action == action)
+
+    def record_file_states(self, *file_paths: str):
+        """Records the current state of files the change set is computed from"""
+        for file_path in file_paths:
+            self.file_states[file_path] = get_file_state(file_path)
+
+    def record_directory_states(self, *directories: str):
+        """Records the current state of directory trees the change set is computed from"""
+        for directory in directories:
+            self.directory_states[directory] = get_directory_state(directory)
+
+    def check_current(self):
+        """Raises ChangeSetOutdated if a file or directory it was computed from changed since"""
+        if not self.is_current():
+            raise ChangeSetOutdated(
+                tr(
+                    "The profiles changed since the changes were computed, nothing was written. "
+                    "Please review the changes again."
+                )
+            )
+
+    def is_current(self) -> bool:
+        """Returns if none of the files and directories it was computed from changed since"""
+        return all(
+            get_file_state(file_path) == state
+            for file_path, state in self.file_states.items()
+        ) and all(
+            get_directory_state(directory) == state
+            for directory, state in self.directory_states.items()
+        )
+
+
+def compute_import_change_set(selection: DataSourceSelection) -> ChangeSet:
+    """Computes the changes importing the selection makes to the target profile, writing nothing.
+
+    The INI importers run against a session of the target INI file that is never committed here,
+    files and databases are only read.
+
+    Args:
+        selection (DataSourceSelection): Profiles and checked items
+
+    Returns:
+        ChangeSet: Changes of the import, ready to be applied by ImportTask
+    """
+    change_set = ChangeSet()
+    change_set.record_file_states(
+        selection.source_qgis_ini_file, selection.target_qgis_ini_file
+    )
+
+    ini_parser = RecordingConfigParser()
+    ini_parser.read(selection.target_qgis_ini_file)
+    original_ini_items = get_ini_items(ini_parser)
+    change_set.ini_session = IniSession(selection.target_qgis_ini_file, ini_parser)
+
+    run_ini_imports(selection, change_set)
+    add_plugin_changes(selection, original_ini_items, change_set)
+    if selection.bookmarks:
+        add_bookmark_changes(selection, change_set)
+    if selection.models:
+        change_set.model_sync = import_models(
+            selection.source_profile_path, selection.target_profile_path, dry_run=True
+        )
+        add_sync_changes(
+            tr("Models"),
+            change_set.model_sync,
+            selection.source_profile_path + "processing/models/",
+            selection.target_profile_path + "processing/models/",
+            change_set,
+        )
+    if selection.scripts:
+        change_set.script_sync = import_scripts(
+            selection.source_profile_path, selection.target_profile_path, dry_run=True
+        )
+        add_sync_changes(
+            tr("Scripts"),
+            change_set.script_sync,
+            selection.source_profile_path + "processing/scripts/",
+            selection.target_profile_path + "processing/scripts/",
+            change_set,
+        )
+    if selection.styles:
+        add_style_changes(selection, change_set)
+    if selection.customizations:
+        add_customization_file_change(selection, change_set)
+
+    add_ini_changes(original_ini_items, ini_parser, change_set)
+    return change_set
+
+
+def run_ini_imports(selection: DataSourceSelection, change_set: ChangeSet):
+    """Runs the selected INI importers against the change set's session of the target INI file"""
+    ini_steps = [
+        (
+            tr("Error while importing data sources"),
+            lambda: import_data_sources(
+                selection.source_qgis_ini_file,
+                selection.target_qgis_ini_file,
+                dictionary_of_checked_database_sources=selection.checked_database_sources,
+                dictionary_of_checked_web_sources=selection.checked_web_sources,
+                source_snapshot=selection.source_snapshot,
+                target_session=change_set.ini_session,
+            ),
+        )
+    ]
+    if selection.favourites:
+        ini_steps.append(
+            (
+                tr("Error while importing favourites"),
+                lambda: import_favourites(
+                    selection.source_qgis_ini_file,
+                    selection.target_qgis_ini_file,
+                    target_session=change_set.ini_session,
+                ),
+            )
+        )
+    if selection.functions:
+        ini_steps.append(
+            (
+                tr("Error while importing expression functions"),
+                lambda: import_expression_functions(
+                    selection.source_qgis_ini_file,
+                    selection.target_qgis_ini_file,
+                    target_session=change_set.ini_session,
+                ),
+            )
+        )
+    if selection.customizations:
+        ini_steps.append(
+            (
+                tr("Error while importing customizations"),
+                lambda: import_ui_settings(
+                    selection.source_profile_path,
+                    selection.target_profile_path,
+                    target_session=change_set.ini_session,
+                ),
+            )
+        )
+    for error_title, ini_step in ini_steps:
+        error_message = ini_step()
+        if error_message:
+            change_set.error_messages.append(
+                with_error_title(error_title, error_message)
+            )
+
+
+def add_plugin_changes(
+    selection: DataSourceSelection,
+    original_ini_items: dict[tuple[str, str], str],
+    change_set: ChangeSet,
+):
+    """Adds the selected plugins and their activation in the target profile to a change set.
+
+    The whole directory trees of the source and target plugin are recorded, so that ImportTask only
+    applies the change set if no plugin file changed since.
+    """
+    for plugin_name in selection.plugin_names:
+        source_plugin_dir = adjust_to_operating_system(
+            selection.source_profile_path + "python/plugins/" + plugin_name + "/"
+        )
+        target_plugin_dir = adjust_to_operating_system(
+            selection.target_profile_path + "python/plugins/" + plugin_name + "/"
+        )
+        change_set.record_directory_states(source_plugin_dir, target_plugin_dir)
+        if not path.isdir(source_plugin_dir):
+            change_set.add(tr("Plugins"), plugin_name, MISSING)
+            continue
+        if not path.isdir(target_plugin_dir):
+            change_set.add(tr("Plugins"), plugin_name, ADDED)
+        elif not selection.update_plugins:
+            # existing plugins are only activated, not updated
+            change_set.add(tr("Plugins"), plugin_name, UNCHANGED)
+        else:
+            add_plugin_update_changes(
+                plugin_name, source_plugin_dir, target_plugin_dir, change_set
+            )
+        # activated by import_plugins only once the plugin was copied, so the session is left
+        # untouched here
+        current_state = original_ini_items.get(("PythonPlugins", plugin_name))
+        if current_state is None:
+            activation_action = ADDED
+        elif current_state != "true":
+            activation_action = OVERWRITTEN
+        else:
+            activation_action = UNCHANGED
+        change_set.add(
+            tr("Settings"), f"[PythonPlugins] {plugin_name}", activation_action
+        )
+
+
+def compute_removal_change_set(selection: DataSourceSelection) -> ChangeSet:
+    """Computes the changes removing the selection makes to the source profile, writing nothing.
+
+    Args:
+        selection (DataSourceSelection): Profile and checked items
+
+    Returns:
+        ChangeSet: Changes of the removal, ready to be applied by RemoveDataSourcesTask
+    """
+    change_set = ChangeSet()
+    change_set.record_file_states(selection.source_qgis_ini_file)
+
+    ini_parser = RecordingConfigParser()
+    ini_parser.read(selection.source_qgis_ini_file)
+    original_ini_items = get_ini_items(ini_parser)
+    change_set.ini_session = IniSession(selection.source_qgis_ini_file, ini_parser)
+
+    remove_data_sources(
+        selection.source_qgis_ini_file,
+        dictionary_of_checked_database_sources=selection.checked_database_sources,
+        dictionary_of_checked_web_sources=selection.checked_web_sources,
+        snapshot=selection.source_snapshot
+        or ProfileSnapshot(selection.source_qgis_ini_file),
+        session=change_set.ini_session,
+    )
+
+    for plugin_name in selection.plugin_names:
+        plugin_dir = adjust_to_operating_system(
+            selection.source_profile_path + "python/plugins/" + plugin_name + "/"
+        )
+        change_set.record_file_states(plugin_dir)
+        change_set.add(
+            tr("Plugins"), plugin_name, REMOVED if path.isdir(plugin_dir) else MISSING
+        )
+        if ini_parser.has_option("PythonPlugins", plugin_name):
+            ini_parser.remove_option("PythonPlugins", plugin_name)
+
+    add_ini_changes(original_ini_items, ini_parser, change_set)
+    return change_set
+
+
+def with_error_title(error_title: str, error_message: str) -> str:
+    """Returns an error message prefixed by its title, None if there is no error message"""
+    if error_message:
+        return f"{error_title}:\n{error_message}"
+    return None
+
+
+def get_ini_items(ini_parser: RawConfigParser) -> dict[tuple[str, str], str]:
+    """Returns the values of all options of a parsed INI file by section and option"""
+    return {
+        (section, option): value
+        for section in ini_parser.sections()
+        for option, value in ini_parser.items(section, raw=True)
+    }
+
+
+def add_ini_changes(
+    original_ini_items: dict[tuple[str, str], str],
+    ini_parser: RecordingConfigParser,
+    change_set: ChangeSet,
+):
+    """Adds the options that were set or removed since the INI file was parsed to a change set"""
+    ini_items = get_ini_items(ini_parser)
+    for section, option in sorted(ini_parser.set_options):
+        if (section, option) not in ini_items:
+            continue  # set and removed again
+        if (section, option) not in original_ini_items:
+            action = ADDED
+        elif original_ini_items[section, option] != ini_items[section, option]:
+            action = OVERWRITTEN
+        else:
+            action = UNCHANGED
+        change_set.add(tr("Settings"), f"[{section}] {option}", action)
+    for section, option in sorted(original_ini_items.keys() - ini_items.keys()):
+        change_set.add(tr("Settings"), f"[{section}] {option}", REMOVED)
+
+
+def add_bookmark_changes(selection: DataSourceSelection, change_set: ChangeSet):
+    """Adds the bookmarks that are new to the target profile to a change set"""
+    change_set.record_file_states(
+        selection.source_bookmark_file, selection.target_bookmark_file
+    )
+    try:
+        new_bookmarks, existing_bookmarks = plan_bookmark_import(
+            selection.source_bookmark_file,
+            selection.target_bookmark_file,
+            selection.bookmark_positions,
+        )
+    except et.Error as e:
+        change_set.error_messages.append(
+            with_error_title(tr("Error while importing bookmarks"), str(e))
+        )
+        return
+    change_set.bookmark_positions = frozenset(position for position, _ in new_bookmarks)
+    for _, name in new_bookmarks:
+        change_set.add(tr("Bookmarks"), name, ADDED)
+    for _, name in existing_bookmarks:
+        change_set.add(tr("Bookmarks"), name, UNCHANGED)
+
+
+def add_sync_changes(
+    category: str,
+    summary: SyncSummary,
+    source_dir: str,
+    target_dir: str,
+    change_set: ChangeSet,
+):
+    """Adds the files of a directory sync's dry run to a change set"""
+    for relative_path in summary.copied:
+        target_file = path.join(target_dir, relative_path)
+        change_set.record_file_states(path.join(source_dir, relative_path), target_file)
+        change_set.add(
+            category,
+            relative_path,
+            OVERWRITTEN if path.lexists(target_file) else ADDED,
+        )
+    for relative_path in summary.conflicts:
+        change_set.add(category, relative_path, CONFLICT)
+    for relative_path in summary.removed:
+        change_set.record_file_states(path.join(target_dir, relative_path))
+        change_set.add(category, relative_path, REMOVED)
+    for relative_path in summary.skipped:
+        change_set.add(category, relative_path, UNCHANGED)
+
+
+def add_plugin_update_changes(
+    plugin_name: str,
+    source_plugin_dir: str,
+    target_plugin_dir: str,
+    change_set: ChangeSet,
+):
+    """Adds the files an update of an installed plugin rewrites or removes to a change set"""
+    if is_plugin_downgrade(source_plugin_dir, target_plugin_dir):
+        change_set.add(
+            tr("Plugins"),
+            tr("{0} (newer version {1} installed)").format(
+                plugin_name, get_plugin_version(target_plugin_dir)
+            ),
+            CONFLICT,
+        )
+        return
+    summary = sync_plugin(source_plugin_dir, target_plugin_dir, dry_run=True)
+    if not summary.copied and not summary.removed:
+        change_set.add(tr("Plugins"), plugin_name, UNCHANGED)
+        return
+    category = tr("Plugin {}").format(plugin_name)
+    add_sync_changes(
+        category, summary, source_plugin_dir, target_plugin_dir, change_set
+    )
+
+
+def add_style_changes(selection: DataSourceSelection, change_set: ChangeSet):
+    """Adds the style entries the import merges into the target profile to a change set"""
+    change_set.record_file_states(
+        selection.source_profile_path + "symbology-style.db",
+        selection.target_profile_path + "symbology-style.db",
+    )
+    try:
+        summary = plan_style_import(
+            selection.source_profile_path, selection.target_profile_path
+        )
+    except sqlite3.Error as e:
+        change_set.error_messages.append(
+            with_error_title(tr("Error while importing styles"), str(e))
+        )
+        return
+    change_set.style_summary = summary
+    for action, entries in (
+        (ADDED, summary.imported),
+        (RENAMED, summary.renamed),
+        (CONFLICT, summary.conflicts),
+        (UNCHANGED, summary.unchanged),
+    ):
+        for entry in entries:
+            change_set.add(tr("Styles"), entry, action)
+
+
+def add_customization_file_change(
+    selection: DataSourceSelection, change_set: ChangeSet
+):
+    """Adds the QGISCUSTOMIZATION3.ini to a change set if the import copies it"""
+    source_file = get_customization_file(selection.source_profile_path)
+    target_file = get_customization_file(selection.target_profile_path)
+    change_set.record_file_states(source_file, target_file)
+    if not path.exists(source_file):
+        return
+    if not path.exists(target_file):
+        action = ADDED
+    elif get_file_hash(source_file) == get_file_hash(target_file):
+        action = UNCHANGED
+    else:
+        action = OVERWRITTEN
+    change_set.copy_customization_file = action != UNCHANGED
+    change_set.add(tr("Customizations"), path.basename(source_file), action)
@@ -1,6 +1,13 @@
 from configparser import RawConfigParser
-from urllib.parse import quote
 
+from profile_manager.datasources.dataservices.datasource_provider import (
+    ProfileSnapshot,
+    index_connection_keys,
+)
+from profile_manager.datasources.dataservices.ini_session import (
+    IniSession,
+    open_ini_session,
+)
 from profile_manager.utils import adjust_to_operating_system
 
 KNOWN_WEB_SOURCES = [
@@ -20,8 +27,24 @@ def import_data_sources(
     target_qgis_ini_file: str,
     dictionary_of_checked_database_sources: dict,
     dictionary_of_checked_web_sources: dict,
+    source_snapshot: ProfileSnapshot = None,
+    target_session: IniSession = None,
 ):
-    """Handles data source import"""
+    """Handles data source import
+
+    The keys of the checked connections are looked up in the snapshot's connection index, so
+    importing N connections iterates each source section only once.
+
+    Args:
+        source_qgis_ini_file (str): Path to source INI file
+        target_qgis_ini_file (str): Path to target INI file
+        dictionary_of_checked_database_sources (dict): Checked database connection names by
+            provider
+        dictionary_of_checked_web_sources (dict): Checked web connection names per provider
+        source_snapshot (ProfileSnapshot): Already parsed source INI file, read from disk if None
+        target_session (IniSession): Session to apply the changes to, the target INI file is written
+            directly if None
+    """
     dictionary_of_checked_sources = {
         **dictionary_of_checked_database_sources,
         **dictionary_of_checked_web_sources,
@@ -31,50 +54,48 @@ def import_data_sources(
         source_qgis_ini_file = adjust_to_operating_system(source_qgis_ini_file)
         target_qgis_ini_file = adjust_to_operating_system(target_qgis_ini_file)
 
-        source_ini_parser = RawConfigParser()
-        source_ini_parser.optionxform = str  # str = case-sensitive option names
-        source_ini_parser.read(source_qgis_ini_file)
-
-        target_ini_parser = RawConfigParser()
-        target_ini_parser.optionxform = str  # str = case-sensitive option names
-        target_ini_parser.read(target_qgis_ini_file)
-
-        for key in dictionary_of_checked_sources:
-            iterator = 0
-
-            if key in KNOWN_WEB_SOURCES:
-                if source_ini_parser.has_section("qgis"):
-                    for element in range(len(dictionary_of_checked_web_sources[key])):
-                        import_web_sources(
-                            source_ini_parser,
-                            target_ini_parser,
-                            dictionary_of_checked_web_sources,
-                            key,
-                            iterator,
+        if source_snapshot is None:
+            source_snapshot = ProfileSnapshot(source_qgis_ini_file)
+        source_ini_parser = source_snapshot.ini_parser
+
+        with open_ini_session(
+            target_qgis_ini_file, target_session
+        ) as target_ini_parser:
+            for key, connection_names in dictionary_of_checked_sources.items():
+                section, key_filter = get_connection_section(key)
+                for connection_name in connection_names:
+                    for data_source in source_snapshot.get_connection_keys(
+                        section, connection_name, key_filter
+                    ):
+                        if not target_ini_parser.has_section(section):
+                            target_ini_parser[section] = {}
+                        target_ini_parser.set(
+                            section,
+                            data_source,
+                            source_ini_parser[section][data_source],
                         )
-                        iterator += 1
-            else:
-                # seems to be a database source
-                for element in range(len(dictionary_of_checked_database_sources[key])):
-                    import_db_sources(
-                        source_ini_parser,
-                        target_ini_parser,
-                        dictionary_of_checked_database_sources,
-                        key,
-                        iterator,
-                    )
-                    iterator += 1
-
-        with open(target_qgis_ini_file, "w") as qgisconf:
-            target_ini_parser.write(qgisconf, space_around_delimiters=False)
 
 
 def remove_data_sources(
     qgis_ini_file: str,
     dictionary_of_checked_database_sources: dict,
     dictionary_of_checked_web_sources: dict,
+    snapshot: ProfileSnapshot = None,
+    session: IniSession = None,
 ):
-    """Handles data source removal from file"""
+    """Handles data source removal from file
+
+    The snapshot is only used to look up the keys of the connections, it is never modified.
+
+    Args:
+        qgis_ini_file (str): Path to the INI file to remove data sources from
+        dictionary_of_checked_database_sources (dict): Checked database connection names by
+            provider
+        dictionary_of_checked_web_sources (dict): Checked web connection names per provider
+        snapshot (ProfileSnapshot): Already parsed INI file, read from disk if None
+        session (IniSession): Session to apply the changes to, the INI file is parsed again and
+            written directly if None
+    """
     dictionary_of_checked_sources = {
         **dictionary_of_checked_database_sources,
         **dictionary_of_checked_web_sources,
@@ -83,30 +104,36 @@ def remove_data_sources(
     qgis_ini_file = adjust_to_operating_system(qgis_ini_file)
 
     if dictionary_of_checked_sources:
-        parser = RawConfigParser()
-        parser.optionxform = str  # str = case-sensitive option names
-        parser.read(qgis_ini_file)
-
-        for key in dictionary_of_checked_sources:
-            iterator = 0
-
-            if key in KNOWN_WEB_SOURCES:
-                if parser.has_section("qgis"):
-                    for element in range(len(dictionary_of_checked_web_sources[key])):
-                        remove_web_sources(
-                            parser, dictionary_of_checked_web_sources, key, iterator
-                        )
-                        iterator += 1
-            else:
-                # seems to be a database source
-                for element in range(len(dictionary_of_checked_database_sources[key])):
-                    remove_db_sources(
-                        parser, dictionary_of_checked_database_sources, key, iterator
-                    )
-                    iterator += 1
-
-            with open(qgis_ini_file, "w") as qgisconf:
-                parser.write(qgisconf, space_around_delimiters=False)
+        if snapshot is None:
+            snapshot = ProfileSnapshot(qgis_ini_file)
+        with open_ini_session(qgis_ini_file, session) as parser:
+            for key, connection_names in dictionary_of_checked_sources.items():
+                section, key_filter = get_connection_section(key)
+                for connection_name in connection_names:
+                    for data_source in snapshot.get_connection_keys(
+                        section, connection_name, key_filter
+                    ):
+                        if parser.has_option(section, data_source):
+                            parser.remove_option(section, data_source)
+
+
+def get_connection_section(key: str) -> tuple[str, str]:
+    """Returns where the connections of a provider are stored in the INI file.
+
+    Args:
+        key (str): Provider key of the checked sources, e.g. WMS, PostgreSQL or providers (for
+            GeoPackage)
+
+    Returns:
+        tuple[str, str]: INI section and the string the keys of the provider contain (None for
+            database sources)
+    """
+    if key in KNOWN_WEB_SOURCES:
+        # FIXME store the key to lookup separately to allow different GUI display vs technical
+        # implementation
+        return "qgis", "connections-" + key.lower()
+    # seems to be a database source
+    return key, None
 
 
 def import_web_sources(
@@ -116,49 +143,18 @@ def import_web_sources(
     key: str,
     iterator: int,
 ):
-    """Imports web source strings to target file"""
-
-    # FIXME
-    # The code below uses the user-visible titles of data source groups for looking up the corresponding lines
-    # in the INI file. This obviously fails if we want to use nicely readable titles in the GUI.
-    # The following replacement is a temporary workaround to allow this without too much of a refactor.
-    # To be fixed when https://github.com/WhereGroup/profile-manager/issues/7 is solved.
-    key_replacements = {
-        "WMS/WMTS": "WMS",
-        "WFS / OGC API - Features": "WFS",
-        "XYZ Tiles": "XYZ",
-    }
-
-    # get the whole qgis section
-    to_be_imported_dictionary_sources = dict(source_ini_parser.items("qgis"))
-
-    # filter to all entries matching the provider key (e. g. wms)
-    to_be_imported_dictionary_sources = dict(
-        # FIXME store the key to lookup separately to allow different GUI display vs technical implementation
-        filter(
-            lambda item: str("connections-" + key.lower()) in item[0],
-            to_be_imported_dictionary_sources.items(),
-        )
-    )
-
-    # filter to all remaining entries matching the data source name
-    to_be_imported_dictionary_sources = dict(
-        filter(
-            lambda item: "\\"
-            + quote(dictionary_of_checked_web_sources[key][iterator].encode("latin-1"))
-            + "\\"
-            in item[0],
-            to_be_imported_dictionary_sources.items(),
-        )
+    """Imports web source strings to target file
+
+    Note: This indexes the whole section for a single connection, import_data_sources should be
+    preferred.
+    """
+    copy_connection_keys(
+        source_ini_parser,
+        target_ini_parser,
+        key,
+        dictionary_of_checked_web_sources[key][iterator],
     )
 
-    for data_source in to_be_imported_dictionary_sources:
-        if not target_ini_parser.has_section("qgis"):
-            target_ini_parser["qgis"] = {}
-        target_ini_parser.set(
-            "qgis", data_source, to_be_imported_dictionary_sources[data_source]
-        )
-
 
 def import_db_sources(
     source_ini_parser: RawConfigParser,
@@ -167,31 +163,18 @@ def import_db_sources(
     key: str,
     iterator: int,
 ):
-    """Imports data base strings to target file"""
-
-    # filter to all entries matching the provider key (e. g. PostgreSQL)
-    to_be_imported_dictionary_sources = dict(source_ini_parser.items(key))
-
-    # filter to all remaining entries matching the data source name
-    to_be_imported_dictionary_sources = dict(
-        filter(
-            lambda item: "\\"
-            + quote(
-                dictionary_of_checked_database_sources[key][iterator].encode("latin-1")
-            )
-            + "\\"
-            in item[0],
-            to_be_imported_dictionary_sources.items(),
-        )
+    """Imports data base strings to target file
+
+    Note: This indexes the whole section for a single connection, import_data_sources should be
+    preferred.
+    """
+    copy_connection_keys(
+        source_ini_parser,
+        target_ini_parser,
+        key,
+        dictionary_of_checked_database_sources[key][iterator],
     )
 
-    for data_source in to_be_imported_dictionary_sources:
-        if not target_ini_parser.has_section(key):
-            target_ini_parser[key] = {}
-        target_ini_parser.set(
-            key, data_source, to_be_imported_dictionary_sources[data_source]
-        )
-
 
 def remove_web_sources(
     parser: RawConfigParser,
@@ -199,31 +182,14 @@ def remove_web_sources(
     key: str,
     iterator: int,
 ):
-    """Removes web source strings from target file"""
-
-    # get the whole qgis section
-    to_be_deleted_dictionary_sources = dict(parser.items("qgis"))
-
-    # filter to all entries matching the provider key (e. g. wms)
-    to_be_deleted_dictionary_sources = dict(
-        filter(
-            lambda item: str("connections-" + key.lower()) in item[0],
-            to_be_deleted_dictionary_sources.items(),
-        )
-    )
-
-    # filter to all remaining entries matching the data source name
-    to_be_deleted_dictionary_sources = dict(
-        filter(
-            lambda item: "\\"
-            + quote(dictionary_of_checked_web_sources[key][iterator].encode("latin-1"))
-            + "\\"
-            in item[0],
-            to_be_deleted_dictionary_sources.items(),
-        )
-    )
-
-    for data_source in to_be_deleted_dictionary_sources:
+    """Removes web source strings from target file
+
+    Note: This indexes the whole section for a single connection, remove_data_sources should be
+    preferred.
+    """
+    for data_source in find_connection_keys(
+        parser, key, dictionary_of_checked_web_sources[key][iterator]
+    ):
         parser.remove_option("qgis", data_source)
 
 
@@ -233,23 +199,43 @@ def remove_db_sources(
     key: str,
     iterator: int,
 ):
-    """Remove data base sources from target file"""
-
-    # filter to all entries matching the provider key (e. g. PostgreSQL)
-    to_be_deleted_dictionary_sources = dict(parser.items(key))
-
-    # filter to all remaining entries matching the data source name
-    to_be_deleted_dictionary_sources = dict(
-        filter(
-            lambda item: "\\"
-            + quote(
-                dictionary_of_checked_database_sources[key][iterator].encode("latin-1")
-            )
-            + "\\"
-            in item[0],
-            to_be_deleted_dictionary_sources.items(),
+    """Remove data base sources from target file
+
+    Note: This indexes the whole section for a single connection, remove_data_sources should be
+    preferred.
+    """
+    for data_source in find_connection_keys(
+        parser, key, dictionary_of_checked_database_sources[key][iterator]
+    ):
+        parser.remove_option(key, data_source)
+
+
+def copy_connection_keys(
+    source_ini_parser: RawConfigParser,
+    target_ini_parser: RawConfigParser,
+    key: str,
+    connection_name: str,
+):
+    """Copies all INI keys of a single connection from source to target parser"""
+    section, _ = get_connection_section(key)
+    for data_source in find_connection_keys(source_ini_parser, key, connection_name):
+        if not target_ini_parser.has_section(section):
+            target_ini_parser[section] = {}
+        target_ini_parser.set(
+            section, data_source, source_ini_parser[section][data_source]
         )
-    )
 
-    for data_source in to_be_deleted_dictionary_sources:
-        parser.remove_option(key, data_source)
+
+def find_connection_keys(
+    parser: RawConfigParser, key: str, connection_name: str
+) -> list[str]:
+    """Returns all INI keys of a single connection of the provider"""
+    section, key_filter = get_connection_section(key)
+    connection_keys = index_connection_keys(parser, section).get(connection_name, [])
+    if key_filter:
+        connection_keys = [
+            connection_key
+            for connection_key in connection_keys
+            if key_filter in connection_key
+        ]
+    return connection_keys
@@ -1,22 +1,162 @@
-from qgis.PyQt.QtWidgets import QMessageBox
+from collections import defaultdict
+from dataclasses import dataclass
+from os import path
 
-from profile_manager.datasources.bookmarks.bookmark_handler import import_bookmarks
-from profile_manager.datasources.customizations.customization_handler import (
-    import_customizations,
-)
-from profile_manager.datasources.dataservices.datasource_distributor import (
-    import_data_sources,
-    remove_data_sources,
-)
-from profile_manager.datasources.favourites.favourites_handler import import_favourites
-from profile_manager.datasources.functions.function_handler import (
-    import_expression_functions,
-)
-from profile_manager.datasources.models.model_handler import import_models
-from profile_manager.datasources.models.script_handler import import_scripts
+from profile_manager.datasources.bookmarks.bookmark_displayer import BookmarkDisplayer
+from profile_manager.datasources.dataservices.datasource_provider import ProfileSnapshot
 from profile_manager.datasources.plugins.plugin_handler import PluginHandler
-from profile_manager.datasources.styles.style_handler import import_styles
-from profile_manager.utils import adjust_to_operating_system
+from profile_manager.utils import (
+    adjust_to_operating_system,
+    get_profile_ini_path,
+    get_profile_path,
+)
+
+
+@dataclass
+class DataSourceSelection:
+    """Paths of the source and target profile and the items checked for an import or removal.
+
+    Gathered from the dialog on the GUI thread so the import or removal can run in a background
+    task.
+    """
+
+    source_profile_path: str
+    target_profile_path: str
+    source_qgis_ini_file: str
+    target_qgis_ini_file: str
+    source_bookmark_file: str
+    target_bookmark_file: str
+    checked_database_sources: dict[str, list[str]]
+    checked_web_sources: dict[str, list[str]]
+    plugin_names: list[str]
+    bookmarks: bool = False
+    favourites: bool = False
+    models: bool = False
+    scripts: bool = False
+    styles: bool = False
+    functions: bool = False
+    customizations: bool = False
+    # if plugins already installed in the target profile are updated, see import_plugins
+    update_plugins: bool = False
+    source_snapshot: ProfileSnapshot = None
+    # positions of the source bookmarks to import, None for all
+    bookmark_positions: frozenset[int] = None
+
+    def get_import_write_set(self) -> list[str]:
+        """Returns the paths in the target profile that an import of the checked items writes to.
+
+        Returns:
+            list[str]: Paths relative to the target profile
+        """
+        target_ini_path = path.relpath(
+            self.target_qgis_ini_file, self.target_profile_path
+        )
+        write_set = [target_ini_path]
+        if self.bookmarks:
+            write_set.append("bookmarks.xml")
+        if self.models:
+            write_set.append(adjust_to_operating_system("processing/models"))
+        if self.scripts:
+            write_set.append(adjust_to_operating_system("processing/scripts"))
+        if self.styles:
+            write_set.append("symbology-style.db")
+        if self.customizations:
+            write_set.append(
+                path.join(path.dirname(target_ini_path), "QGISCUSTOMIZATION3.ini")
+            )
+        for plugin_name in self.plugin_names:
+            write_set.append(
+                adjust_to_operating_system("python/plugins/" + plugin_name)
+            )
+        return write_set
+
+    def get_removal_write_set(self) -> list[str]:
+        """Returns the paths in the source profile that a removal of the checked items writes to.
+
+        Returns:
+            list[str]: Paths relative to the source profile
+        """
+        write_set = [path.relpath(self.source_qgis_ini_file, self.source_profile_path)]
+        for plugin_name in self.plugin_names:
+            write_set.append(
+                adjust_to_operating_system("python/plugins/" + plugin_name)
+            )
+        return write_set
+
+
+def split_checked_sources(
+    checked_sources: dict[str, list[str]],
+) -> tuple[dict[str, list[str]], dict[str, list[str]]]:
+    """Splits checked data source connections into the web and database connections to import.
+
+    Args:
+        checked_sources (dict[str, list[str]]): Connection names per provider as shown in the data
+            source tree
+
+    Returns:
+        tuple[dict[str, list[str]], dict[str, list[str]]]: Web connections per provider, database
+            connections per INI section
+    """
+    # TODO why is the split between web and db necessary??
+    # TODO what titles does QGIS use in the GUI? can we use the same when needed in the plugin?
+    checked_web_sources = defaultdict(list)
+    checked_database_sources = defaultdict(list)
+    for provider, connection_names in checked_sources.items():
+        # FIXME hardcoded list of GUI titles
+        if provider in ["SpatiaLite", "PostgreSQL", "MSSQL", "DB2", "Oracle"]:
+            checked_database_sources[provider].extend(connection_names)
+        # GeoPackage connections are stored under [providers] in the ini
+        elif (
+            provider == "GeoPackage"
+        ):  # FIXME hardcoded relationship between GeoPackage and 'providers'
+            checked_database_sources["providers"].extend(connection_names)
+        else:
+            checked_web_sources[provider].extend(connection_names)
+    return checked_web_sources, checked_database_sources
+
+
+def create_selection(
+    qgis_profiles_path: str,
+    source_profile_name: str,
+    target_profile_name: str,
+    checked_sources: dict[str, list[str]] = None,
+    plugin_names: list[str] = None,
+    **checked_items,
+) -> DataSourceSelection:
+    """Returns a selection of items to import between two profiles, without reading the dialog.
+
+    Args:
+        qgis_profiles_path (str): Path to the directory containing the profiles
+        source_profile_name (str): Name of the profile to import from
+        target_profile_name (str): Name of the profile to import into
+        checked_sources (dict[str, list[str]]): Data source connection names per provider
+        plugin_names (list[str]): Directory names of the plugins
+        **checked_items: Flags of DataSourceSelection, e.g. bookmarks=True
+
+    Returns:
+        DataSourceSelection: Paths of the profiles and the items
+    """
+    checked_web_sources, checked_database_sources = split_checked_sources(
+        checked_sources or {}
+    )
+    source_profile_path = get_profile_path(qgis_profiles_path, source_profile_name)
+    target_profile_path = get_profile_path(qgis_profiles_path, target_profile_name)
+    return DataSourceSelection(
+        source_profile_path=source_profile_path,
+        target_profile_path=target_profile_path,
+        source_qgis_ini_file=get_profile_ini_path(
+            qgis_profiles_path, source_profile_name
+        ),
+        target_qgis_ini_file=get_profile_ini_path(
+            qgis_profiles_path, target_profile_name
+        ),
+        source_bookmark_file=source_profile_path + "bookmarks.xml",
+        target_bookmark_file=target_profile_path + "bookmarks.xml",
+        checked_database_sources=checked_database_sources,
+        checked_web_sources=checked_web_sources,
+        plugin_names=plugin_names or [],
+        **checked_items,
+    )
 
 
 class DataSourceHandler:
@@ -33,7 +173,10 @@ class DataSourceHandler:
         self.target_qgis_ini_file = ""
         self.source_bookmark_file = ""
         self.target_bookmark_file = ""
+        self.source_snapshot: ProfileSnapshot = None
+        self.target_snapshot: ProfileSnapshot = None
         self.plugin_handler = PluginHandler(self.profile_manager)
+        self.bookmark_displayer = BookmarkDisplayer(self.profile_manager)
 
     def set_data_sources(
         self, dictionary_of_checked_web_sources, dictionary_of_checked_data_base_sources
@@ -44,109 +187,58 @@ class DataSourceHandler:
             dictionary_of_checked_data_base_sources
         )
 
-    def import_all_the_things(self):
-        # TODO rename
-        """Handles the whole data import action.
-
-        Returns:
-            boolean: If errors were encountered.
-        """
-        had_errors = False
-
-        import_data_sources(
-            self.source_qgis_ini_file,
-            self.target_qgis_ini_file,
-            self.dictionary_of_checked_web_sources,
-            self.dictionary_of_checked_data_base_sources,
-        )
+    def set_snapshot(self, snapshot: ProfileSnapshot, is_source_profile: bool):
+        """Sets the parsed INI file of the source or target profile shown in the dialog"""
+        if is_source_profile:
+            self.source_snapshot = snapshot
+        else:
+            self.target_snapshot = snapshot
 
-        self.profile_manager.update_data_sources(
-            False
-        )  # TODO moved from DS_D.import_data_sources, do we really need it?!
-
-        if self.dlg.bookmark_check.isChecked():
-            error_message = import_bookmarks(
-                self.source_bookmark_file, self.target_bookmark_file
-            )
-            if error_message:
-                had_errors = True
-                QMessageBox.critical(
-                    None, "Error while importing bookmarks", error_message
-                )
-
-        if self.dlg.favourites_check.isChecked():
-            error_message = import_favourites(
-                self.source_qgis_ini_file, self.target_qgis_ini_file
-            )
-            if error_message:
-                had_errors = True
-                QMessageBox.critical(
-                    None, "Error while importing favourites", error_message
-                )
-
-        if self.dlg.models_check.isChecked():
-            import_models(
-                self.source_profile_path, self.target_profile_path
-            )  # currently has no error handling
-
-        if self.dlg.scripts_check.isChecked():
-            import_scripts(
-                self.source_profile_path, self.target_profile_path
-            )  # currently has no error handling
-
-        if self.dlg.styles_check.isChecked():
-            error_message = import_styles(
-                self.source_profile_path, self.target_profile_path
-            )
-            if error_message:
-                had_errors = True
-                QMessageBox.critical(
-                    None, "Error while importing styles", error_message
-                )
-
-        if self.dlg.functions_check.isChecked():
-            error_message = import_expression_functions(
-                self.source_qgis_ini_file, self.target_qgis_ini_file
-            )
-            if error_message:
-                had_errors = True
-                QMessageBox.critical(
-                    None, "Error while importing expression functions", error_message
-                )
-
-        if self.dlg.ui_check.isChecked():
-            import_customizations(
-                self.source_profile_path, self.target_profile_path
-            )  # currently has no error handling
-
-        # TODO why does data source import also import plugins again?
-        self.plugin_handler.import_selected_plugins()
-
-        return had_errors
-
-    def import_plugins(self):
-        self.plugin_handler.import_selected_plugins()
+    def get_source_snapshot(self) -> ProfileSnapshot:
+        """Returns the parsed INI file of the source profile if it is the current source INI file"""
+        if (
+            self.source_snapshot
+            and self.source_snapshot.ini_path == self.source_qgis_ini_file
+        ):
+            return self.source_snapshot
+        return None
 
     def display_plugins(self, only_for_target_profile=False):
-        """Displays plugins in treeWidget"""
+        """Displays plugins in the plugin lists"""
         self.plugin_handler.set_path_files()
         self.plugin_handler.populate_plugins_list(
             only_for_target_profile=only_for_target_profile
         )
 
-    def remove_datasources_and_plugins(self):
-        """Handles data removal"""
-        self.plugin_handler.remove_selected_plugins()
+    def get_selection(self) -> DataSourceSelection:
+        """Returns the paths and the items checked in the dialog for an import or removal.
 
-        remove_data_sources(
-            self.source_qgis_ini_file,
-            self.dictionary_of_checked_web_sources,
-            self.dictionary_of_checked_data_base_sources,
-        )
+        Must be called on the GUI thread, the returned selection can be handed to a background task.
 
-        self.profile_manager.update_data_sources(
-            False
-        )  # TODO moved from DS_D.remove_data_sources, do we really need it?!
+        Returns:
+            DataSourceSelection: Paths of the current profiles and the checked items
+        """
+        return DataSourceSelection(
+            source_profile_path=self.source_profile_path,
+            target_profile_path=self.target_profile_path,
+            source_qgis_ini_file=self.source_qgis_ini_file,
+            target_qgis_ini_file=self.target_qgis_ini_file,
+            source_bookmark_file=self.source_bookmark_file,
+            target_bookmark_file=self.target_bookmark_file,
+            checked_database_sources=self.dictionary_of_checked_data_base_sources,
+            checked_web_sources=self.dictionary_of_checked_web_sources,
+            plugin_names=self.plugin_handler.get_checked_plugin_names(),
+            bookmarks=self.dlg.bookmark_check.isChecked(),
+            favourites=self.dlg.favourites_check.isChecked(),
+            models=self.dlg.models_check.isChecked(),
+            scripts=self.dlg.scripts_check.isChecked(),
+            styles=self.dlg.styles_check.isChecked(),
+            functions=self.dlg.functions_check.isChecked(),
+            customizations=self.dlg.ui_check.isChecked(),
+            update_plugins=self.dlg.pluginUpdateCheck.isChecked(),
+            source_snapshot=self.get_source_snapshot(),
+            bookmark_positions=self.bookmark_displayer.get_filtered_positions(),
+        )
 
     def set_path_to_files(self, source_profile_name, target_profile_name):
         """Sets file paths"""
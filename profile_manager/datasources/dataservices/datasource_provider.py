@@ -1,11 +1,9 @@
+from collections import defaultdict
 from configparser import RawConfigParser
 from re import compile, search
+from threading import Lock
 from urllib.parse import unquote
 
-from qgis.core import Qgis, QgsMessageLog
-from qgis.PyQt.QtCore import Qt
-from qgis.PyQt.QtWidgets import QTreeWidgetItem
-
 # TODO document these! can we directly integrate them below somewhere?
 SERVICE_NAME_REGEX = compile(r"\\(.*?)\\")
 GPKG_SERVICE_NAME_REGEX = compile(r"\\(.+).\\")
@@ -108,55 +106,189 @@ DATA_SOURCE_SEARCH_LOCATIONS = {
 }
 
 
-def get_data_sources_tree(
-    ini_path: str, provider: str, make_checkable: bool
-) -> QTreeWidgetItem:
-    """Returns a tree of checkable items for all data sources of the specified provider in the INI file.
+class ReadOnlyConfigParser(RawConfigParser):
+    """A RawConfigParser refusing all changes except reading files, see ProfileSnapshot"""
+
+    def refuse_change(self, *args, **kwargs):
+        raise TypeError(
+            "The parsed INI file of a profile snapshot must not be modified"
+        )
+
+    set = add_section = remove_option = remove_section = refuse_change
+    __setitem__ = __delitem__ = refuse_change
+
+
+class ProfileSnapshot:
+    """A parsed QGIS3.ini of a profile with all data source connections classified.
+
+    The INI file is read only once and every key of the searched sections is matched against the
+    rules of all providers in a single pass. The snapshot is shared by the data source tree, the
+    plugin lists, the importer and the remover so that refreshing the dialog does not re-parse the
+    INI file for each provider.
+
+    As the cached snapshot is used by the GUI thread and background tasks at the same time, it is
+    immutable: its parser refuses changes, so writers parse the INI file into their own session, and
+    the connection keys are indexed under a lock.
+    """
+
+    def __init__(self, ini_path: str):
+        """Reads and classifies the INI file.
+
+        Args:
+            ini_path (str): Path to the INI file to read
+        """
+        self.ini_path = ini_path
+        self.ini_parser = ReadOnlyConfigParser()
+        self.ini_parser.optionxform = str  # str = case-sensitive option names
+        self.ini_parser.read(ini_path)
+
+        self.data_source_connections = classify_data_source_connections(self.ini_parser)
+        if self.ini_parser.has_section("PythonPlugins"):
+            self.plugins = dict(self.ini_parser.items("PythonPlugins"))
+        else:
+            self.plugins = {}
+        self.connection_key_indexes = {}  # section -> connection name -> keys
+        self.connection_key_indexes_lock = Lock()
+
+    def get_data_source_connections(self, provider: str) -> list[str]:
+        """Returns the names of all data source connections of the specified provider.
+
+        Args:
+            provider (str): Name of the provider to get connections of
+
+        Returns:
+            list[str]: Names of the found data source connections
+
+        Raises:
+            NotImplementedError: If the provider name is not (yet) known here
+        """
+        if provider not in DATA_SOURCE_SEARCH_LOCATIONS:
+            raise NotImplementedError(f"Unknown provider: {provider}")
+        return self.data_source_connections.get(provider, [])
+
+    def get_connection_keys(
+        self, section: str, connection_name: str, key_filter: str = None
+    ) -> list[str]:
+        """Returns all INI keys of a data source connection.
+
+        The keys of a section are indexed by connection name on first use, so looking up many
+        connections only iterates the section once.
+
+        Args:
+            section (str): INI section the connection is stored in, e.g. PostgreSQL or qgis
+            connection_name (str): Decoded name of the connection as shown in the data source tree
+            key_filter (str): Only return keys containing this string, e.g. connections-wms
+
+        Returns:
+            list[str]: INI keys of the connection in the section
+        """
+        with self.connection_key_indexes_lock:
+            if section not in self.connection_key_indexes:
+                self.connection_key_indexes[section] = index_connection_keys(
+                    self.ini_parser, section
+                )
+
+        connection_keys = self.connection_key_indexes[section].get(connection_name, [])
+        if key_filter:
+            connection_keys = [key for key in connection_keys if key_filter in key]
+        return connection_keys
+
 
-    The tree contains a checkable item per data source found.
+def classify_data_source_connections(
+    ini_parser: RawConfigParser,
+) -> dict[str, list[str]]:
+    """Returns the names of the data source connections of every known provider.
+
+    Each section is iterated once, matching its keys against the rules of all providers searching in
+    that section.
 
     Args:
-        ini_path (str): Path to the INI file to read
-        provider (str): Name of the provider to gather data sources for
-        make_checkable (bool): Flag to indicate if items should be checkable
+        ini_parser (RawConfigParser): Parser holding the INI file's content
+
+    Returns:
+        dict[str, list[str]]: Names of the found data source connections per provider
+    """
+    rules_per_section = defaultdict(list)
+    for provider, search_rules in DATA_SOURCE_SEARCH_LOCATIONS.items():
+        # TODO how to handle multiple finds? deduplicate?
+        for search_rule in search_rules:
+            rules_per_section[search_rule["section"]].append(
+                (provider, compile(search_rule["regex"]))
+            )
+
+    data_source_connections = defaultdict(list)
+    for section_to_search, rules in rules_per_section.items():
+        if not ini_parser.has_section(section_to_search):
+            continue
+        for key in ini_parser[section_to_search]:
+            for provider, regex_pattern in rules:
+                if regex_pattern.search(key):
+                    data_source_connections[provider].append(
+                        get_connection_name(provider, key)
+                    )
+
+    return dict(data_source_connections)
+
+
+def get_connection_name(provider: str, key: str) -> str:
+    """Returns the decoded name of the data source connection an INI key belongs to.
+
+    Args:
+        provider (str): Name of the provider the key was matched for
+        key (str): INI key, e.g. connections-wms\\My%20WMS\\url
 
     Returns:
-        QTreeWidgetItem: Tree widget item representing the data sources or None if none were found
+        str: Name of the connection, e.g. My WMS
     """
-    data_source_connections = gather_data_source_connections(ini_path, provider)
-    if not data_source_connections:
-        QgsMessageLog.logMessage(
-            f"- 0 {provider} connections found", "Profile Manager", Qgis.Info
+    if (
+        provider == "GeoPackage"
+    ):  # TODO move this logic/condition into the rules if possible?
+        source_name_raw = search(GPKG_SERVICE_NAME_REGEX, key)
+        source_name = (
+            source_name_raw.group(0)
+            .replace("\\GPKG\\connections\\", "")
+            .replace("\\", "")
         )
-        return None
     else:
-        QgsMessageLog.logMessage(
-            f"- {len(data_source_connections)} {provider} connections found",
-            "Profile Manager",
-            Qgis.Info,
-        )
+        source_name_raw = search(SERVICE_NAME_REGEX, key)
+        source_name = source_name_raw.group(0).replace("\\", "")
+    # TODO what are the replacements needed for?!
+
+    # TODO "Bing VirtualEarth 💩" is not rendered well, also fails to import to other profile...
+    return unquote(source_name, "latin-1")  # needed for e.g. %20 in connection names
 
-    tree_root_item = QTreeWidgetItem([provider])
-    if make_checkable:
-        tree_root_item.setFlags(
-            tree_root_item.flags() | Qt.ItemIsTristate | Qt.ItemIsUserCheckable
-        )
 
-    data_source_items = []
-    for data_source_connection in data_source_connections:
-        data_source_item = QTreeWidgetItem([data_source_connection])
-        if make_checkable:
-            data_source_item.setFlags(data_source_item.flags() | Qt.ItemIsUserCheckable)
-            data_source_item.setCheckState(0, Qt.Unchecked)
-        data_source_items.append(data_source_item)
+def index_connection_keys(
+    ini_parser: RawConfigParser, section: str
+) -> dict[str, list[str]]:
+    """Returns the keys of a section indexed by the decoded connection names they contain.
 
-    tree_root_item.addChildren(data_source_items)
-    return tree_root_item
+    Every inner path segment of a key is treated as a potential connection name, e.g.
+    connections-wms\\My%20WMS\\url is indexed as "My WMS".
+
+    Args:
+        ini_parser (RawConfigParser): Parser holding the INI file's content
+        section (str): Name of the section to index
+
+    Returns:
+        dict[str, list[str]]: INI keys per connection name, empty if the section does not exist
+    """
+    if not ini_parser.has_section(section):
+        return {}
+
+    connection_keys = defaultdict(list)
+    for key in ini_parser[section]:
+        for segment in set(key.split("\\")[1:-1]):
+            connection_keys[unquote(segment, "latin-1")].append(key)
+    return dict(connection_keys)
 
 
 def gather_data_source_connections(ini_path: str, provider: str) -> list[str]:
     """Returns the names of all data source connections of the specified provider in the INI file.
 
+    Note: This parses the whole INI file, use a ProfileSnapshot when gathering connections of
+    several providers.
+
     Args:
         ini_path (str): Path to the INI file to read
         provider (str): Name of the provider to gather connections of
@@ -167,46 +299,4 @@ def gather_data_source_connections(ini_path: str, provider: str) -> list[str]:
     Raises:
         NotImplementedError: If the provider name is not (yet) known here
     """
-    search_rules = DATA_SOURCE_SEARCH_LOCATIONS.get(provider)
-    if not search_rules:
-        raise NotImplementedError(f"Unknown provider: {provider}")
-
-    # TODO make iterating if more than 1 rule was found
-    # TODO how to handle multiple finds? deduplicate?
-    section_to_search = search_rules[0]["section"]
-    regex = search_rules[0]["regex"]
-
-    ini_parser = RawConfigParser()
-    ini_parser.optionxform = str  # str = case-sensitive option names
-    ini_parser.read(ini_path)
-
-    try:
-        section = ini_parser[section_to_search]
-    except KeyError:
-        return None
-
-    data_source_connections = []
-    regex_pattern = compile(regex)
-    for key in section:
-        if regex_pattern.search(key):
-            if (
-                provider == "GeoPackage"
-            ):  # TODO move this logic/condition into the rules if possible?
-                source_name_raw = search(GPKG_SERVICE_NAME_REGEX, key)
-                source_name = (
-                    source_name_raw.group(0)
-                    .replace("\\GPKG\\connections\\", "")
-                    .replace("\\", "")
-                )
-            else:
-                source_name_raw = search(SERVICE_NAME_REGEX, key)
-                source_name = source_name_raw.group(0).replace("\\", "")
-            # TODO what are the replacements needed for?!
-
-            # TODO "Bing VirtualEarth 💩" is not rendered well, also fails to import to other profile...
-            source_name = unquote(
-                source_name, "latin-1"
-            )  # needed for e.g. %20 in connection names
-            data_source_connections.append(source_name)
-
-    return data_source_connections
+    return ProfileSnapshot(ini_path).get_data_source_connections(provider)
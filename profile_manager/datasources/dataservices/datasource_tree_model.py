@@ -0,0 +1,212 @@
+from qgis.core import Qgis, QgsMessageLog
+from qgis.PyQt.QtCore import QAbstractItemModel, QModelIndex, Qt
+
+from profile_manager.datasources.dataservices.datasource_provider import (
+    DATA_SOURCE_SEARCH_LOCATIONS,
+    ProfileSnapshot,
+)
+
+# Number of connections a view gets per fetch when expanding or scrolling through a provider
+FETCH_BATCH_SIZE = 200
+
+
+class DataSourceTreeModel(QAbstractItemModel):
+    """A tree of the data source connections of a profile, grouped by provider.
+
+    The model is backed by the connection names of a ProfileSnapshot, no item is created per
+    connection. Connections are handed to the view in batches as a provider is expanded or scrolled
+    through, and the checked connections are kept as a set per provider so that (un)checking all of
+    them is a single change.
+    """
+
+    def __init__(self, checkable: bool, *args, **kwargs):
+        """Sets up an empty tree
+
+        Args:
+            checkable (bool): If the connections can be checked, e.g. for an import
+        """
+        super().__init__(*args, **kwargs)
+        self.checkable = checkable
+        self.header_label = ""
+        self.providers: list[str] = []
+        self.connections: dict[str, list[str]] = {}
+        self.fetched_counts: dict[str, int] = {}
+        self.checked: dict[str, set[str]] = {}
+
+    def populate(self, snapshot: ProfileSnapshot, header_label: str):
+        """Shows the data source connections of a profile, unchecking all of them
+
+        Args:
+            snapshot (ProfileSnapshot): Parsed INI file of the profile
+            header_label (str): Label of the tree's header, e.g. the profile name
+        """
+        self.beginResetModel()
+        self.header_label = header_label
+        self.providers = []
+        self.connections = {}
+        for provider in DATA_SOURCE_SEARCH_LOCATIONS:
+            data_source_connections = snapshot.get_data_source_connections(provider)
+            QgsMessageLog.logMessage(
+                f"- {len(data_source_connections)} {provider} connections found",
+                "Profile Manager",
+                Qgis.Info,
+            )
+            if data_source_connections:
+                self.providers.append(provider)
+                # a connection is listed once even if several of its keys matched
+                self.connections[provider] = list(
+                    dict.fromkeys(data_source_connections)
+                )
+        self.fetched_counts = {provider: 0 for provider in self.providers}
+        self.checked = {provider: set() for provider in self.providers}
+        self.endResetModel()
+
+    def set_all_checked(self, checked: bool):
+        """Checks or unchecks all connections, emitting one change per provider, not per item"""
+        if not self.checkable:
+            return
+        for provider in self.providers:
+            self.checked[provider] = (
+                set(self.connections[provider]) if checked else set()
+            )
+        for row, provider in enumerate(self.providers):
+            self.emit_check_state_changed(row, provider)
+
+    def get_checked_sources(self) -> dict[str, list[str]]:
+        """Returns the checked connection names per provider, in the order of the profile's INI"""
+        return {
+            provider: [
+                connection
+                for connection in self.connections[provider]
+                if connection in self.checked[provider]
+            ]
+            for provider in self.providers
+            if self.checked[provider]
+        }
+
+    def emit_check_state_changed(self, row: int, provider: str):
+        """Notifies views that the check states of a provider and its fetched connections changed"""
+        provider_index = self.index(row, 0)
+        self.dataChanged.emit(provider_index, provider_index, [Qt.CheckStateRole])
+        if self.fetched_counts[provider]:
+            self.dataChanged.emit(
+                self.index(0, 0, provider_index),
+                self.index(self.fetched_counts[provider] - 1, 0, provider_index),
+                [Qt.CheckStateRole],
+            )
+
+    def get_provider(self, index: QModelIndex) -> str:
+        """Returns the provider a connection index belongs to, None for provider indexes"""
+        return index.internalPointer()
+
+    def index(self, row: int, column: int, parent: QModelIndex = QModelIndex()):
+        if not self.hasIndex(row, column, parent):
+            return QModelIndex()
+        if not parent.isValid():
+            return self.createIndex(row, column, None)
+        # connections point to their provider's name, providers point to nothing
+        return self.createIndex(row, column, self.providers[parent.row()])
+
+    def parent(self, index: QModelIndex = QModelIndex()):
+        if not index.isValid():
+            return QModelIndex()
+        provider = self.get_provider(index)
+        if provider is None:
+            return QModelIndex()
+        return self.createIndex(self.providers.index(provider), 0, None)
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if parent.column() > 0:
+            return 0
+        if not parent.isValid():
+            return len(self.providers)
+        if self.get_provider(parent) is None:
+            return self.fetched_counts[self.providers[parent.row()]]
+        return 0
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 1
+
+    def hasChildren(self, parent: QModelIndex = QModelIndex()) -> bool:
+        if not parent.isValid():
+            return bool(self.providers)
+        return self.get_provider(parent) is None
+
+    def canFetchMore(self, parent: QModelIndex) -> bool:
+        if not parent.isValid() or self.get_provider(parent) is not None:
+            return False
+        provider = self.providers[parent.row()]
+        return self.fetched_counts[provider] < len(self.connections[provider])
+
+    def fetchMore(self, parent: QModelIndex):
+        if not self.canFetchMore(parent):
+            return
+        provider = self.providers[parent.row()]
+        fetched_count = self.fetched_counts[provider]
+        batch_size = min(
+            FETCH_BATCH_SIZE, len(self.connections[provider]) - fetched_count
+        )
+        self.beginInsertRows(parent, fetched_count, fetched_count + batch_size - 1)
+        self.fetched_counts[provider] += batch_size
+        self.endInsertRows()
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        provider = self.get_provider(index)
+        if provider is None:
+            provider = self.providers[index.row()]
+            if role == Qt.DisplayRole:
+                return provider
+            if role == Qt.CheckStateRole and self.checkable:
+                checked_count = len(self.checked[provider])
+                if checked_count == 0:
+                    return Qt.Unchecked
+                if checked_count == len(self.connections[provider]):
+                    return Qt.Checked
+                return Qt.PartiallyChecked
+            return None
+
+        connection = self.connections[provider][index.row()]
+        if role == Qt.DisplayRole:
+            return connection
+        if role == Qt.CheckStateRole and self.checkable:
+            return Qt.Checked if connection in self.checked[provider] else Qt.Unchecked
+        return None
+
+    def setData(self, index: QModelIndex, value, role: int = Qt.EditRole) -> bool:
+        if not index.isValid() or role != Qt.CheckStateRole or not self.checkable:
+            return False
+        checked = Qt.CheckState(value) == Qt.Checked
+        provider = self.get_provider(index)
+        if provider is None:
+            # (un)checking a provider (un)checks all of its connections
+            provider = self.providers[index.row()]
+            self.checked[provider] = (
+                set(self.connections[provider]) if checked else set()
+            )
+            self.emit_check_state_changed(index.row(), provider)
+            return True
+
+        connection = self.connections[provider][index.row()]
+        if checked:
+            self.checked[provider].add(connection)
+        else:
+            self.checked[provider].discard(connection)
+        self.dataChanged.emit(index, index, [Qt.CheckStateRole])
+        provider_index = index.parent()
+        self.dataChanged.emit(provider_index, provider_index, [Qt.CheckStateRole])
+        return True
+
+    def flags(self, index: QModelIndex):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        flags = Qt.ItemIsEnabled | Qt.ItemIsSelectable
+        if self.checkable:
+            flags |= Qt.ItemIsUserCheckable
+        return flags
+
+    def headerData(self, section: int, orientation, role: int = Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole and section == 0:
+            return self.header_label
+        return None
@@ -0,0 +1,238 @@
+from dataclasses import dataclass, field
+from hashlib import sha256
+from os import (
+    DirEntry,
+    close,
+    listdir,
+    makedirs,
+    path,
+    remove,
+    replace,
+    scandir,
+    stat,
+    stat_result,
+)
+from shutil import copy2, copystat, rmtree
+from tempfile import mkstemp
+
+# Size of the blocks files are read in for hashing
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+@dataclass
+class SyncSummary:
+    """Paths, relative to the synced directories, of the files handled by a directory sync"""
+
+    copied: list[str] = field(default_factory=list)
+    skipped: list[str] = field(default_factory=list)
+    conflicts: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+
+
+def sync_directory(
+    source_dir: str,
+    target_dir: str,
+    compare_hashes: bool = False,
+    dry_run: bool = False,
+    mirror: bool = False,
+) -> SyncSummary:
+    """Copies the new and changed files of a directory tree into another directory tree.
+
+    A file is unchanged if its copy in the target directory has the same size and modification time.
+    With compare_hashes, files of the same size are compared by their SHA-256 hash instead of their
+    modification time, which also catches changes that kept the modification time and skips files
+    that were only touched.
+
+    A changed file is a conflict instead of being copied if the target's copy was modified after the
+    source's, i.e. it was probably edited in the target profile, or if one of them is a directory
+    and the other one is not. Files in the target directory that do not exist in the source
+    directory are left untouched.
+
+    With mirror, the target directory becomes a copy of the source directory instead, e.g. to update
+    a plugin: there are no conflicts, files and directories that do not exist in the source
+    directory are removed and files of the same size but with different modification times are
+    compared by hash, so only files with changed content are copied.
+
+    Args:
+        source_dir (str): Directory to copy from
+        target_dir (str): Directory to copy to, created if it does not exist
+        compare_hashes (bool): If files of the same size should be compared by hash
+        dry_run (bool): If nothing should be written, only the summary of what would be copied is
+            returned
+        mirror (bool): If the target directory should become a copy of the source directory
+
+    Returns:
+        SyncSummary: Copied (or to be copied), skipped, conflicting and removed files
+    """
+    summary = SyncSummary()
+    if path.isdir(source_dir):
+        sync_subdirectory(
+            source_dir, target_dir, "", compare_hashes, dry_run, mirror, summary
+        )
+    return summary
+
+
+def copy_files(source_dir: str, target_dir: str, relative_paths: list[str]):
+    """Copies files between directory trees, e.g. those a sync_directory dry run found to copy.
+
+    Args:
+        source_dir (str): Directory to copy from
+        target_dir (str): Directory to copy to, missing subdirectories are created
+        relative_paths (list[str]): Paths of the files relative to both directories
+    """
+    for relative_path in relative_paths:
+        target_file = path.join(target_dir, relative_path)
+        makedirs(path.dirname(target_file), exist_ok=True)
+        replace_file(path.join(source_dir, relative_path), target_file)
+
+
+def sync_subdirectory(
+    source_dir: str,
+    target_dir: str,
+    relative_dir: str,
+    compare_hashes: bool,
+    dry_run: bool,
+    mirror: bool,
+    summary: SyncSummary,
+):
+    """Syncs a subdirectory of the source directory, see sync_directory"""
+    target_subdir = path.join(target_dir, relative_dir)
+    if path.lexists(target_subdir) and not path.isdir(target_subdir):
+        if not mirror:
+            summary.conflicts.append(relative_dir)
+            return
+        remove_path(target_subdir, relative_dir, dry_run, summary)
+    if not dry_run:
+        makedirs(target_subdir, exist_ok=True)
+
+    source_names = set()
+    with scandir(path.join(source_dir, relative_dir)) as entries:
+        for entry in entries:
+            source_names.add(entry.name)
+            relative_path = path.join(relative_dir, entry.name)
+            if entry.is_dir():
+                sync_subdirectory(
+                    source_dir,
+                    target_dir,
+                    relative_path,
+                    compare_hashes,
+                    dry_run,
+                    mirror,
+                    summary,
+                )
+                continue
+
+            sync_file(
+                entry,
+                path.join(target_dir, relative_path),
+                relative_path,
+                compare_hashes,
+                dry_run,
+                mirror,
+                summary,
+            )
+
+    if mirror and path.isdir(target_subdir):
+        for name in sorted(set(listdir(target_subdir)) - source_names):
+            remove_path(
+                path.join(target_subdir, name),
+                path.join(relative_dir, name),
+                dry_run,
+                summary,
+            )
+
+
+def sync_file(
+    entry: DirEntry,
+    target_file: str,
+    relative_path: str,
+    compare_hashes: bool,
+    dry_run: bool,
+    mirror: bool,
+    summary: SyncSummary,
+):
+    """Copies a file of the source directory unless unchanged or a conflict, see sync_directory"""
+    if path.isdir(target_file):
+        if not mirror:
+            summary.conflicts.append(relative_path)
+            return
+        remove_path(target_file, relative_path, dry_run, summary)
+    elif path.lexists(target_file):
+        source_stat = entry.stat()
+        target_stat = stat(target_file)
+        if is_unchanged_file(
+            entry.path, source_stat, target_file, target_stat, compare_hashes, mirror
+        ):
+            if not dry_run and source_stat.st_mtime_ns != target_stat.st_mtime_ns:
+                # lets later syncs without hashes skip the file, too
+                copystat(entry.path, target_file)
+            summary.skipped.append(relative_path)
+            return
+        if target_stat.st_mtime_ns > source_stat.st_mtime_ns and not mirror:
+            summary.conflicts.append(relative_path)
+            return
+
+    if not dry_run:
+        replace_file(entry.path, target_file)
+    summary.copied.append(relative_path)
+
+
+def is_unchanged_file(
+    source_file: str,
+    source_stat: stat_result,
+    target_file: str,
+    target_stat: stat_result,
+    compare_hashes: bool,
+    mirror: bool,
+) -> bool:
+    """Returns if the target's copy of a file has the same content, see sync_directory"""
+    if source_stat.st_size != target_stat.st_size:
+        return False
+    # a mirror only hashes files that were touched, as nothing is edited in its target directory
+    if source_stat.st_mtime_ns == target_stat.st_mtime_ns and (
+        mirror or not compare_hashes
+    ):
+        return True
+    if not compare_hashes and not mirror:
+        return False
+    return get_file_hash(source_file) == get_file_hash(target_file)
+
+
+def replace_file(source_file: str, target_file: str):
+    """Copies a file over another one by replacing it instead of rewriting it.
+
+    The file is copied to a temporary file next to the target file first, which is then renamed over
+    it. The existing file is never written to, so files hardlinked to it, e.g. in the profile a
+    target profile was cloned from, keep their content.
+    """
+    file_descriptor, temp_file = mkstemp(
+        prefix=".", suffix=".tmp", dir=path.dirname(target_file)
+    )
+    close(file_descriptor)
+    try:
+        copy2(source_file, temp_file)
+        replace(temp_file, target_file)
+    except OSError:
+        remove(temp_file)
+        raise
+
+
+def remove_path(
+    target_path: str, relative_path: str, dry_run: bool, summary: SyncSummary
+):
+    """Removes a file or directory tree from the target directory of a mirroring sync_directory"""
+    if not dry_run:
+        if path.isdir(target_path) and not path.islink(target_path):
+            rmtree(target_path)
+        else:
+            remove(target_path)
+    summary.removed.append(relative_path)
+
+
+def get_file_hash(file_path: str) -> str:
+    """Returns the SHA-256 hash of a file's content"""
+    file_hash = sha256()
+    with open(file_path, "rb") as file:
+        for block in iter(lambda: file.read(HASH_BLOCK_SIZE), b""):
+            file_hash.update(block)
+    return file_hash.hexdigest()
@@ -0,0 +1,325 @@
+import json
+from dataclasses import asdict, dataclass, field
+from os import path, replace
+
+from profile_manager.datasources.dataservices.datasource_handler import (
+    DataSourceSelection,
+    create_selection,
+)
+from profile_manager.datasources.dataservices.datasource_provider import (
+    DATA_SOURCE_SEARCH_LOCATIONS,
+    ProfileSnapshot,
+)
+from profile_manager.datasources.plugins.plugin_displayer import CORE_PLUGINS
+from profile_manager.utils import get_file_state, get_profile_ini_path
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    tomllib = None
+
+# Flags of DataSourceSelection that a recipe can set
+RECIPE_ITEM_FLAGS = [
+    "bookmarks",
+    "favourites",
+    "models",
+    "scripts",
+    "styles",
+    "functions",
+    "customizations",
+]
+# Flags of DataSourceSelection that a recipe can set to change how the items are imported
+RECIPE_OPTION_FLAGS = ["update_plugins"]
+# Version of the format of saved import plans, plans of other versions are compiled again
+IMPORT_PLAN_FORMAT_VERSION = 1
+
+
+@dataclass
+class ImportPlan:
+    """Explicit items to import from a source profile, compiled from a recipe.
+
+    Wildcards of the recipe are resolved against the source profile, so the plan lists every data
+    source connection and plugin by name. A plan can be saved and reused as long as the recipe and
+    the source profile's INI file are unchanged, see is_current.
+    """
+
+    source_profile_name: str
+    checked_sources: dict[str, list[str]] = field(default_factory=dict)
+    plugin_names: list[str] = field(default_factory=list)
+    items: dict[str, bool] = field(default_factory=dict)
+    # modification time and size of the recipe and the source INI file when the plan was compiled
+    recipe_state: list[int] = None
+    source_ini_state: list[int] = None
+
+    def create_selection(
+        self, qgis_profiles_path: str, target_profile_name: str
+    ) -> DataSourceSelection:
+        """Returns the selection importing the planned items into a target profile"""
+        return create_selection(
+            qgis_profiles_path,
+            self.source_profile_name,
+            target_profile_name,
+            checked_sources=self.checked_sources,
+            plugin_names=self.plugin_names,
+            **self.items,
+        )
+
+    def is_current(self, recipe_file: str, qgis_profiles_path: str) -> bool:
+        """Returns if the recipe and the source profile's INI file did not change since compiling"""
+        source_ini_file = get_profile_ini_path(
+            qgis_profiles_path, self.source_profile_name
+        )
+        return self.recipe_state == get_file_state(
+            recipe_file
+        ) and self.source_ini_state == get_file_state(source_ini_file)
+
+    def save(self, plan_file: str):
+        """Writes the plan to a JSON file, atomically replacing an existing one"""
+        temporary_plan_file = plan_file + ".tmp"
+        with open(temporary_plan_file, "w", encoding="utf-8") as file:
+            json.dump(
+                {"format": IMPORT_PLAN_FORMAT_VERSION, **asdict(self)}, file, indent=2
+            )
+        replace(temporary_plan_file, plan_file)
+
+    @classmethod
+    def load(cls, plan_file: str) -> "ImportPlan":
+        """Reads a plan written by save, None if missing, unreadable or of another format version"""
+        try:
+            with open(plan_file, encoding="utf-8") as file:
+                plan_dict = json.load(file)
+            if plan_dict.pop("format", None) != IMPORT_PLAN_FORMAT_VERSION:
+                return None
+            return cls(**plan_dict)
+        except (OSError, ValueError, TypeError):
+            return None
+
+
+def read_recipe(recipe_file: str) -> dict:
+    """Reads a recipe from a JSON or, with Python 3.11 or newer, TOML file.
+
+    A recipe names the source profile and the items to import from it, e.g.:
+    {
+        "source": "template",
+        "data_sources": ["PostgreSQL/My DB", "WMS/*"],
+        "plugins": ["*"],
+        "update_plugins": true,
+        "bookmarks": true,
+        "styles": true
+    }
+
+    Args:
+        recipe_file (str): Path to the recipe, TOML if it ends with .toml
+
+    Returns:
+        dict: The recipe
+
+    Raises:
+        OSError: If the file can not be read
+        ValueError: If the file is not valid JSON or TOML or TOML is not supported
+    """
+    if recipe_file.lower().endswith(".toml"):
+        if tomllib is None:
+            raise ValueError("TOML recipes require Python 3.11 or newer")
+        with open(recipe_file, "rb") as file:
+            return tomllib.load(file)
+    with open(recipe_file, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def compile_recipe(recipe: dict, qgis_profiles_path: str) -> ImportPlan:
+    """Compiles a recipe into an import plan, resolving its wildcards against the source profile.
+
+    Args:
+        recipe (dict): Recipe as read by read_recipe
+        qgis_profiles_path (str): Path to the directory containing the profiles
+
+    Returns:
+        ImportPlan: Plan listing all items to import explicitly
+
+    Raises:
+        ValueError: If the recipe is invalid or names items that do not exist in the source profile
+    """
+    if not isinstance(recipe, dict):
+        raise ValueError("A recipe must be an object/table")
+    unknown_keys = (
+        set(recipe)
+        - {"source", "data_sources", "plugins"}
+        - set(RECIPE_ITEM_FLAGS + RECIPE_OPTION_FLAGS)
+    )
+    if unknown_keys:
+        raise ValueError(f"Unknown recipe keys: {', '.join(sorted(unknown_keys))}")
+
+    source_profile_name = recipe.get("source")
+    if not isinstance(source_profile_name, str) or not source_profile_name:
+        raise ValueError("A recipe must name its source profile")
+    source_ini_file = get_profile_ini_path(qgis_profiles_path, source_profile_name)
+    if not path.isfile(source_ini_file):
+        raise ValueError(f"Source profile '{source_profile_name}' not found")
+
+    for list_key in ("data_sources", "plugins"):
+        if not isinstance(recipe.get(list_key, []), list):
+            raise ValueError(f"'{list_key}' must be a list of strings")
+    items = {}
+    for flag in RECIPE_ITEM_FLAGS + RECIPE_OPTION_FLAGS:
+        if not isinstance(recipe.get(flag, False), bool):
+            raise ValueError(f"'{flag}' must be true or false")
+        items[flag] = recipe.get(flag, False)
+
+    source_ini_state = get_file_state(source_ini_file)
+    snapshot = ProfileSnapshot(source_ini_file)
+    return ImportPlan(
+        source_profile_name=source_profile_name,
+        checked_sources=select_data_sources(snapshot, recipe.get("data_sources", [])),
+        plugin_names=select_plugins(snapshot, recipe.get("plugins", [])),
+        items=items,
+        source_ini_state=source_ini_state,
+    )
+
+
+def load_import_plan(
+    recipe_file: str, qgis_profiles_path: str, plan_file: str = None
+) -> ImportPlan:
+    """Returns the import plan of a recipe, reusing the saved plan if it is still current.
+
+    Args:
+        recipe_file (str): Path to the recipe
+        qgis_profiles_path (str): Path to the directory containing the profiles
+        plan_file (str): Path the compiled plan is saved to and reused from, None to always compile
+
+    Returns:
+        ImportPlan: Saved or freshly compiled plan
+
+    Raises:
+        OSError: If the recipe can not be read or the plan can not be saved
+        ValueError: If the recipe is invalid
+    """
+    if plan_file:
+        plan = ImportPlan.load(plan_file)
+        if plan and plan.is_current(recipe_file, qgis_profiles_path):
+            return plan
+
+    recipe_state = get_file_state(recipe_file)
+    plan = compile_recipe(read_recipe(recipe_file), qgis_profiles_path)
+    plan.recipe_state = recipe_state
+    if plan_file:
+        plan.save(plan_file)
+    return plan
+
+
+def create_recipe(selection: DataSourceSelection, source_profile_name: str) -> dict:
+    """Returns a recipe importing the items of a selection made in the dialog.
+
+    Args:
+        selection (DataSourceSelection): Checked items
+        source_profile_name (str): Name of the selection's source profile
+
+    Returns:
+        dict: Recipe listing the checked items by name
+    """
+    data_sources = [
+        f"{provider}/{connection_name}"
+        for provider, connection_names in selection.checked_web_sources.items()
+        for connection_name in connection_names
+    ]
+    for section, connection_names in selection.checked_database_sources.items():
+        # GeoPackage connections are stored under [providers] in the ini
+        provider = "GeoPackage" if section == "providers" else section
+        data_sources.extend(
+            f"{provider}/{connection_name}" for connection_name in connection_names
+        )
+
+    recipe = {
+        "source": source_profile_name,
+        "data_sources": sorted(data_sources),
+        "plugins": list(selection.plugin_names),
+    }
+    for flag in RECIPE_ITEM_FLAGS + RECIPE_OPTION_FLAGS:
+        recipe[flag] = getattr(selection, flag)
+    return recipe
+
+
+def save_recipe(recipe: dict, recipe_file: str):
+    """Writes a recipe to a JSON file
+
+    Raises:
+        OSError: If the file can not be written
+    """
+    with open(recipe_file, "w", encoding="utf-8") as file:
+        json.dump(recipe, file, indent=2)
+
+
+def select_data_sources(
+    snapshot: ProfileSnapshot, selectors: list[str]
+) -> dict[str, list[str]]:
+    """Returns the data source connections of the source profile matching the selectors.
+
+    Args:
+        snapshot (ProfileSnapshot): Parsed INI file of the source profile
+        selectors (list[str]): "PROVIDER/NAME", where both can be "*"
+
+    Returns:
+        dict[str, list[str]]: Connection names per provider
+
+    Raises:
+        ValueError: If a selector is malformed, names an unknown provider or a connection that
+            exists in none of the selected providers
+    """
+    checked_sources = {}
+    for selector in selectors:
+        if not isinstance(selector, str):
+            raise ValueError(f"Data source '{selector}' is not PROVIDER/NAME")
+        provider, separator, connection_name = selector.partition("/")
+        if not separator:
+            raise ValueError(f"Data source '{selector}' is not PROVIDER/NAME")
+        if provider == "*":
+            providers = list(DATA_SOURCE_SEARCH_LOCATIONS)
+        elif provider in DATA_SOURCE_SEARCH_LOCATIONS:
+            providers = [provider]
+        else:
+            raise ValueError(
+                f"Unknown provider '{provider}', known providers: "
+                + ", ".join(DATA_SOURCE_SEARCH_LOCATIONS)
+            )
+
+        is_found = False
+        for provider in providers:
+            connection_names = snapshot.get_data_source_connections(provider)
+            if connection_name == "*":
+                selected_names = connection_names
+            elif connection_name in connection_names:
+                selected_names = [connection_name]
+            else:
+                continue
+            is_found = True
+            if not selected_names:
+                continue
+            provider_sources = checked_sources.setdefault(provider, [])
+            provider_sources.extend(
+                name for name in selected_names if name not in provider_sources
+            )
+        if not is_found:
+            raise ValueError(
+                f"Data source '{selector}' not found in the source profile"
+            )
+    return checked_sources
+
+
+def select_plugins(snapshot: ProfileSnapshot, selectors: list[str]) -> list[str]:
+    """Returns the plugin names of the selectors, "*" selecting all but the core plugins"""
+    plugin_names = []
+    for selector in selectors:
+        if not isinstance(selector, str):
+            raise ValueError(f"Plugin '{selector}' is not a plugin name")
+        if selector == "*":
+            selected_names = [
+                plugin_name
+                for plugin_name in snapshot.plugins
+                if plugin_name not in CORE_PLUGINS
+            ]
+        elif selector in snapshot.plugins:
+            selected_names = [selector]
+        else:
+            raise ValueError(f"Plugin '{selector}' not found in the source profile")
+        plugin_names.extend(name for name in selected_names if name not in plugin_names)
+    return plugin_names
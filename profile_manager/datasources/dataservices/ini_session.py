@@ -0,0 +1,80 @@
+from configparser import RawConfigParser
+from contextlib import contextmanager
+from os import fsync, path, remove, replace
+from shutil import copymode
+from tempfile import NamedTemporaryFile
+
+
+class IniSession:
+    """A parsed INI file that is modified by several importers and written back once.
+
+    The INI file is parsed when the session is opened. Importers apply their changes to the
+    session's parser and commit() writes the result atomically by writing a temporary file next to
+    the INI file and renaming it, so an aborted import never leaves a half-written INI file behind.
+    """
+
+    def __init__(self, ini_path: str, ini_parser: RawConfigParser = None):
+        """Opens the session.
+
+        Args:
+            ini_path (str): Path to the INI file to modify
+            ini_parser (RawConfigParser): Already parsed INI file, read from disk if None
+        """
+        self.ini_path = ini_path
+        if ini_parser is None:
+            ini_parser = RawConfigParser()
+            ini_parser.optionxform = str  # str = case-sensitive option names
+            ini_parser.read(ini_path)
+        self.ini_parser = ini_parser
+
+    def commit(self):
+        """Writes the INI file atomically.
+
+        Raises:
+            OSError: If the temporary file could not be written or renamed
+        """
+        temporary_file = NamedTemporaryFile(
+            "w",
+            dir=path.dirname(self.ini_path) or None,
+            prefix=".QGIS3.ini.",
+            suffix=".tmp",
+            delete=False,
+        )
+        try:
+            with temporary_file as qgisconf:
+                self.ini_parser.write(qgisconf, space_around_delimiters=False)
+                qgisconf.flush()
+                fsync(qgisconf.fileno())
+            if path.exists(self.ini_path):
+                copymode(self.ini_path, temporary_file.name)
+            replace(temporary_file.name, self.ini_path)
+        except OSError:
+            if path.exists(temporary_file.name):
+                remove(temporary_file.name)
+            raise
+
+
+@contextmanager
+def open_ini_session(
+    ini_path: str, session: IniSession = None, ini_parser: RawConfigParser = None
+):
+    """Yields the parser of an INI session.
+
+    If no session is given, a session is opened for the INI file and committed when the block
+    finishes without raising. A given session is left to be committed by its owner.
+
+    Args:
+        ini_path (str): Path to the INI file to modify if no session is given
+        session (IniSession): Session shared by several importers
+        ini_parser (RawConfigParser): Already parsed content of the INI file if no session is given
+
+    Yields:
+        RawConfigParser: Parser to apply changes to
+    """
+    if session is not None:
+        yield session.ini_parser
+        return
+
+    session = IniSession(ini_path, ini_parser)
+    yield session.ini_parser
+    session.commit()
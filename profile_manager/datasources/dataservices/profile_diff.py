@@ -0,0 +1,341 @@
+import json
+import sqlite3
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field
+from hashlib import sha256
+from os import path, scandir, walk
+from pathlib import Path
+
+from profile_manager.datasources.bookmarks.bookmark_index import BookmarkIndex
+from profile_manager.datasources.dataservices.datasource_distributor import (
+    get_connection_section,
+)
+from profile_manager.datasources.dataservices.datasource_provider import (
+    DATA_SOURCE_SEARCH_LOCATIONS,
+    ProfileSnapshot,
+)
+from profile_manager.datasources.dataservices.directory_sync import get_file_hash
+from profile_manager.datasources.plugins.plugin_catalog import get_plugin_version
+from profile_manager.datasources.styles.style_handler import (
+    STYLE_ENTRY_TABLES,
+    get_table_names,
+    get_xml_hash,
+)
+from profile_manager.utils import adjust_to_operating_system
+
+# Categories compared by diff_profiles, in the order they are listed in
+DIFF_CATEGORIES = [
+    "connections",
+    "plugins",
+    "favourites",
+    "functions",
+    "bookmarks",
+    "styles",
+    "models",
+    "scripts",
+]
+# Version of the format of exported diffs
+PROFILE_DIFF_FORMAT_VERSION = 1
+
+
+@dataclass
+class CategoryDiff:
+    """Differences of two profiles in one category.
+
+    Items are described by a detail where it helps telling them apart, e.g. a plugin's version,
+    otherwise by "".
+    """
+
+    only_in_a: dict[str, str] = field(default_factory=dict)
+    only_in_b: dict[str, str] = field(default_factory=dict)
+    # item -> details in profile A and profile B
+    changed: dict[str, tuple[str, str]] = field(default_factory=dict)
+    unchanged: int = 0
+
+    def count(self) -> int:
+        """Returns the number of differing items"""
+        return len(self.only_in_a) + len(self.only_in_b) + len(self.changed)
+
+
+@dataclass
+class ProfileDiff:
+    """Differences of two profiles per category, see DIFF_CATEGORIES"""
+
+    profile_a: str
+    profile_b: str
+    categories: dict[str, CategoryDiff] = field(default_factory=dict)
+
+    def count(self) -> int:
+        """Returns the number of differing items of all categories"""
+        return sum(category_diff.count() for category_diff in self.categories.values())
+
+    def save_json(self, json_file: str):
+        """Writes the diff to a JSON file
+
+        Raises:
+            OSError: If the file can not be written
+        """
+        with open(json_file, "w", encoding="utf-8") as file:
+            json.dump(
+                {"format": PROFILE_DIFF_FORMAT_VERSION, **asdict(self)},
+                file,
+                indent=2,
+                ensure_ascii=False,
+            )
+
+
+def diff_profiles(profile_path_a: str, profile_path_b: str, scan=None) -> ProfileDiff:
+    """Compares two profiles item by item.
+
+    Each item is reduced to a hash of its content, e.g. all settings of a connection or the XML of a
+    style entry, so only the hashes of the two profiles are compared.
+
+    Args:
+        profile_path_a (str): Path to the first profile
+        profile_path_b (str): Path to the second profile
+        scan (Callable[[str, Callable, str], object]): Scans a file with a function, optionally
+            named by a kind of scan, e.g. ScanCache.get to reuse the scan results of unchanged
+            files. None to scan all files.
+
+    Returns:
+        ProfileDiff: Differences per category
+    """
+    fingerprint_a = get_profile_fingerprint(profile_path_a, scan)
+    fingerprint_b = get_profile_fingerprint(profile_path_b, scan)
+    profile_diff = ProfileDiff(profile_path_a, profile_path_b)
+    for category in DIFF_CATEGORIES:
+        profile_diff.categories[category] = diff_fingerprints(
+            fingerprint_a[category], fingerprint_b[category]
+        )
+    return profile_diff
+
+
+def diff_fingerprints(
+    items_a: dict[str, tuple[str, str]], items_b: dict[str, tuple[str, str]]
+) -> CategoryDiff:
+    """Compares the hashed items of a category of two profiles, see get_profile_fingerprint"""
+    category_diff = CategoryDiff()
+    for item, (item_hash, detail) in sorted(items_a.items()):
+        if item not in items_b:
+            category_diff.only_in_a[item] = detail
+        elif items_b[item][0] != item_hash:
+            category_diff.changed[item] = (detail, items_b[item][1])
+        else:
+            category_diff.unchanged += 1
+    for item, (_, detail) in sorted(items_b.items()):
+        if item not in items_a:
+            category_diff.only_in_b[item] = detail
+    return category_diff
+
+
+def get_profile_fingerprint(
+    profile_path: str, scan=None
+) -> dict[str, dict[str, tuple[str, str]]]:
+    """Returns the hash and detail of every item of a profile per category.
+
+    Args:
+        profile_path (str): Path to the profile
+        scan (Callable[[str, Callable, str], object]): Scans a file with a function, see
+            diff_profiles
+
+    Returns:
+        dict[str, dict[str, tuple[str, str]]]: Hash and detail per item name per category of
+            DIFF_CATEGORIES
+    """
+    if scan is None:
+
+        def scan(file_path, scan_function, kind=None):
+            return scan_function(file_path)
+
+    ini_path = adjust_to_operating_system(profile_path + "QGIS/QGIS3.ini")
+    snapshot = scan(ini_path, ProfileSnapshot)
+    ini_fingerprint = scan(
+        ini_path,
+        lambda file_path: get_ini_fingerprint(snapshot),
+        "fingerprint",
+    )
+    bookmark_file = adjust_to_operating_system(profile_path + "bookmarks.xml")
+    style_db_path = adjust_to_operating_system(profile_path + "symbology-style.db")
+    return {
+        **ini_fingerprint,
+        "plugins": get_plugin_fingerprint(profile_path, snapshot),
+        "bookmarks": scan(
+            bookmark_file,
+            lambda file_path: get_bookmark_fingerprint(scan(file_path, BookmarkIndex)),
+            "fingerprint",
+        ),
+        "styles": (
+            scan(style_db_path, get_style_fingerprint, "fingerprint")
+            if path.isfile(style_db_path)
+            else {}
+        ),
+        "models": get_directory_fingerprint(
+            adjust_to_operating_system(profile_path + "processing/models/"), scan
+        ),
+        "scripts": get_directory_fingerprint(
+            adjust_to_operating_system(profile_path + "processing/scripts/"), scan
+        ),
+    }
+
+
+def get_ini_fingerprint(
+    snapshot: ProfileSnapshot,
+) -> dict[str, dict[str, tuple[str, str]]]:
+    """Returns the hashed connections, favourites and expression functions of an INI, by category"""
+    return {
+        "connections": get_connection_fingerprint(snapshot),
+        "favourites": get_favourite_fingerprint(snapshot),
+        "functions": get_function_fingerprint(snapshot),
+    }
+
+
+def get_connection_fingerprint(
+    snapshot: ProfileSnapshot,
+) -> dict[str, tuple[str, str]]:
+    """Returns a hash of all settings of each data source connection, by "PROVIDER/NAME" """
+    items = {}
+    section_values = {}
+    for provider in DATA_SOURCE_SEARCH_LOCATIONS:
+        # GeoPackage connections are stored under [providers] in the ini
+        section, key_filter = get_connection_section(
+            "providers" if provider == "GeoPackage" else provider
+        )
+        for connection_name in snapshot.get_data_source_connections(provider):
+            if section not in section_values:
+                section_values[section] = dict(
+                    snapshot.ini_parser.items(section, raw=True)
+                )
+            items[f"{provider}/{connection_name}"] = (
+                get_settings_hash(
+                    section_values[section],
+                    snapshot.get_connection_keys(section, connection_name, key_filter),
+                ),
+                "",
+            )
+    return items
+
+
+def get_plugin_fingerprint(
+    profile_path: str, snapshot: ProfileSnapshot
+) -> dict[str, tuple[str, str]]:
+    """Returns the version and active state of each plugin in the profile, by directory name"""
+    items = {}
+    plugins_dir = adjust_to_operating_system(profile_path + "python/plugins/")
+    if not path.isdir(plugins_dir):
+        return items
+    with scandir(plugins_dir) as entries:
+        for entry in entries:
+            if not entry.is_dir() or entry.name.startswith("__"):
+                continue
+            detail = get_plugin_version(entry.path)
+            if snapshot.plugins.get(entry.name, "false").lower() != "true":
+                detail = f"{detail} (inactive)".strip()
+            items[entry.name] = (sha256(detail.encode("utf-8")).hexdigest(), detail)
+    return items
+
+
+def get_favourite_fingerprint(
+    snapshot: ProfileSnapshot,
+) -> dict[str, tuple[str, str]]:
+    """Returns the browser favourites, see import_favourites, by path and title"""
+    favourites = snapshot.ini_parser.get("browser", "favourites", fallback="")
+    return {
+        favourite: ("", "")
+        for favourite in (entry.strip() for entry in favourites.split(", "))
+        if favourite
+    }
+
+
+def get_function_fingerprint(snapshot: ProfileSnapshot) -> dict[str, tuple[str, str]]:
+    """Returns a hash of the expression and help text of each custom expression function, by name"""
+    if not snapshot.ini_parser.has_section("expressions"):
+        return {}
+    function_keys = defaultdict(list)
+    for key in snapshot.ini_parser["expressions"]:
+        segments = key.split("\\")
+        if len(segments) == 3 and segments[0] == "user":
+            function_keys[segments[1]].append(key)
+    function_values = dict(snapshot.ini_parser.items("expressions", raw=True))
+    return {
+        function_name: (get_settings_hash(function_values, keys), "")
+        for function_name, keys in function_keys.items()
+    }
+
+
+def get_bookmark_fingerprint(
+    bookmark_index: BookmarkIndex,
+) -> dict[str, tuple[str, str]]:
+    """Returns a hash of the content of each bookmark, by name and group.
+
+    Bookmarks with the same name and group are hashed together.
+    """
+    bookmark_hashes = defaultdict(list)
+    for name, group, content_hash in bookmark_index.get_content_hashes():
+        bookmark_hashes[f"{group}/{name}" if group else name].append(content_hash)
+    return {
+        item: (sha256("".join(sorted(content_hashes)).encode()).hexdigest(), "")
+        for item, content_hashes in bookmark_hashes.items()
+    }
+
+
+def get_style_fingerprint(style_db_path: str) -> dict[str, tuple[str, str]]:
+    """Returns a hash of the XML of each style entry, by "table: name", see STYLE_ENTRY_TABLES.
+
+    The database is opened read-only, an unreadable database has no entries.
+    """
+    items = {}
+    try:
+        style_db = sqlite3.connect(
+            Path(style_db_path).absolute().as_uri() + "?mode=ro", uri=True
+        )
+        try:
+            tables = get_table_names(style_db, "main")
+            for table in STYLE_ENTRY_TABLES:
+                if table not in tables:
+                    continue
+                for name, xml in style_db.execute(f"SELECT name, xml FROM {table}"):
+                    items[f"{table}: {name}"] = (get_xml_hash(xml), "")
+        finally:
+            style_db.close()
+    except sqlite3.Error:
+        return {}
+    return items
+
+
+def get_directory_fingerprint(directory: str, scan) -> dict[str, tuple[str, str]]:
+    """Returns the hash of each file in a directory tree, by path relative to the directory
+
+    Args:
+        directory (str): Directory to hash the files of, no files if it does not exist
+        scan (Callable[[str, Callable, str], object]): Scans a file with a function, see
+            diff_profiles
+
+    Returns:
+        dict[str, tuple[str, str]]: Hash and (empty) detail per relative path
+    """
+    items = {}
+    for current_dir, _, file_names in walk(directory):
+        for file_name in file_names:
+            file_path = path.join(current_dir, file_name)
+            relative_path = path.relpath(file_path, directory).replace("\\", "/")
+            items[relative_path] = (scan(file_path, get_file_hash), "")
+    return items
+
+
+def get_settings_hash(values: dict[str, str], keys: list[str]) -> str:
+    """Returns a hash of the keys and values of settings, independent of their order
+
+    Args:
+        values (dict[str, str]): Raw values of the settings of an INI section by key
+        keys (list[str]): Keys of the settings to hash
+
+    Returns:
+        str: Hash of the settings
+    """
+    settings_hash = sha256()
+    for key in sorted(keys):
+        settings_hash.update(key.encode("utf-8"))
+        settings_hash.update(b"\0")
+        settings_hash.update(values[key].encode("utf-8"))
+        settings_hash.update(b"\0")
+    return settings_hash.hexdigest()
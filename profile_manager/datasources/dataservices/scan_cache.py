@@ -0,0 +1,146 @@
+from os import path, stat
+
+from qgis.PyQt.QtCore import QFileSystemWatcher, QObject
+
+from profile_manager.datasources.bookmarks.bookmark_index import BookmarkIndex
+from profile_manager.datasources.dataservices.datasource_provider import ProfileSnapshot
+from profile_manager.datasources.dataservices.import_plan import (
+    ImportPlan,
+    load_import_plan,
+)
+
+
+class ScanCache(QObject):
+    """Caches the results of scanning profile files, so switching profiles does not rescan them.
+
+    Entries are keyed on the path of the scanned file and the kind of scan and only reused while the
+    file's modification time and size are unchanged. A file system watcher on the scanned files and
+    the directories containing them drops entries as soon as something changes on disk.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.entries = {}  # path -> kind of scan -> (mtime, size, scan result)
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.fileChanged.connect(self.invalidate)
+        self.watcher.directoryChanged.connect(self.invalidate_directory)
+
+    def get_snapshot(self, ini_path: str) -> ProfileSnapshot:
+        """Returns the parsed INI file, i.e. data source connections and plugins, of a profile.
+
+        The snapshot is shared with background tasks and immutable, see ProfileSnapshot.
+
+        Args:
+            ini_path (str): Path to the profile's QGIS3.ini
+
+        Returns:
+            ProfileSnapshot: Cached or freshly parsed INI file
+        """
+        return self.get(ini_path, ProfileSnapshot)
+
+    def get_bookmark_index(self, bookmark_file: str) -> BookmarkIndex:
+        """Returns the index of the spatial bookmarks of a profile for counting and filtering them.
+
+        Args:
+            bookmark_file (str): Path to the profile's bookmarks.xml
+
+        Returns:
+            BookmarkIndex: Cached or freshly built index of the bookmarks
+        """
+        return self.get(bookmark_file, BookmarkIndex)
+
+    def get_bookmark_count(self, bookmark_file: str) -> int:
+        """Returns the number of spatial bookmarks of a profile.
+
+        Args:
+            bookmark_file (str): Path to the profile's bookmarks.xml
+
+        Returns:
+            int: Cached or freshly counted number of bookmarks
+        """
+        return self.get_bookmark_index(bookmark_file).count()
+
+    def get_import_plan(self, recipe_file: str, qgis_profiles_path: str) -> ImportPlan:
+        """Returns the import plan of a recipe, compiling it again if the source profile changed.
+
+        Args:
+            recipe_file (str): Path to the recipe
+            qgis_profiles_path (str): Path to the directory containing the profiles
+
+        Returns:
+            ImportPlan: Cached or freshly compiled plan
+
+        Raises:
+            OSError: If the recipe can not be read
+            ValueError: If the recipe is invalid
+        """
+        plan = self.get(
+            recipe_file,
+            lambda file_path: load_import_plan(file_path, qgis_profiles_path),
+        )
+        if not plan.is_current(recipe_file, qgis_profiles_path):
+            self.invalidate(recipe_file)
+            plan = self.get(
+                recipe_file,
+                lambda file_path: load_import_plan(file_path, qgis_profiles_path),
+            )
+        return plan
+
+    def get(self, file_path: str, scan_function, kind: str = None):
+        """Returns a file's cached scan result, scanning it if it changed since the last scan.
+
+        Args:
+            file_path (str): Path to the file to scan
+            scan_function (Callable): Function scanning the file, called with the path
+            kind (str): Distinguishes different scans of the same file, e.g. a parsed file and
+                hashes derived from it
+
+        Returns:
+            The scan result of the file
+        """
+        try:
+            file_stat = stat(file_path)
+            file_state = (file_stat.st_mtime_ns, file_stat.st_size)
+        except OSError:
+            # missing files are scanned but not cached, they might be created later
+            file_state = None
+
+        entry = self.entries.get(file_path, {}).get(kind)
+        if entry is not None and entry[:2] == file_state:
+            return entry[2]
+
+        scan_result = scan_function(file_path)
+        if file_state is not None:
+            self.entries.setdefault(file_path, {})[kind] = (*file_state, scan_result)
+        self.watch(file_path)
+        return scan_result
+
+    def watch(self, file_path: str):
+        """Watches a file and its directory for changes"""
+        paths_to_watch = [
+            path_to_watch
+            for path_to_watch in (file_path, path.dirname(file_path))
+            if path.exists(path_to_watch)
+            and path_to_watch not in self.watcher.files()
+            and path_to_watch not in self.watcher.directories()
+        ]
+        if paths_to_watch:
+            self.watcher.addPaths(paths_to_watch)
+
+    def invalidate(self, file_path: str):
+        """Drops the cached scan result of a file"""
+        self.entries.pop(file_path, None)
+
+    def invalidate_directory(self, directory_path: str):
+        """Drops the cached scan results of all files in a directory"""
+        for file_path in list(self.entries):
+            if path.dirname(file_path) == directory_path.rstrip("/\\"):
+                del self.entries[file_path]
+
+    def clear(self):
+        """Drops all cached scan results and stops watching"""
+        self.entries.clear()
+        watched_paths = self.watcher.files() + self.watcher.directories()
+        if watched_paths:
+            self.watcher.removePaths(watched_paths)
@@ -2,8 +2,15 @@ from configparser import RawConfigParser
 
 from qgis.core import Qgis, QgsMessageLog
 
+from profile_manager.datasources.dataservices.ini_session import (
+    IniSession,
+    open_ini_session,
+)
 
-def import_favourites(source_qgis_ini_file, target_qgis_ini_file):
+
+def import_favourites(
+    source_qgis_ini_file, target_qgis_ini_file, target_session: IniSession = None
+):
     """Imports browser favourites from source to target profile.
 
     Favourites are stored in QGIS/QGIS3.ini's [browser] section, e.g.:
@@ -13,7 +20,10 @@ def import_favourites(source_qgis_ini_file, target_qgis_ini_file):
     ...
 
     Args:
-        TODO
+        source_qgis_ini_file (str): Path to source INI file
+        target_qgis_ini_file (str): Path to target INI file
+        target_session (IniSession): Session to apply the changes to, the target INI file is written
+            directly if None
 
     Returns:
         error_message (str): An error message, if something XML related failed.
@@ -32,25 +42,23 @@ def import_favourites(source_qgis_ini_file, target_qgis_ini_file):
             if entry == "favourites":
                 favourites_to_be_imported[entry] = get_favourites[entry]
 
-        target_ini_parser = RawConfigParser()
-        target_ini_parser.optionxform = str  # str = case-sensitive option names
-        target_ini_parser.read(target_qgis_ini_file)
-
-        if not target_ini_parser.has_section("browser"):
-            target_ini_parser["browser"] = {}
-        elif target_ini_parser.has_option("browser", "favourites"):
-            favourites_to_be_preserved = target_ini_parser.get("browser", "favourites")
-
-        import_string = favourites_to_be_imported["favourites"].replace(
-            favourites_to_be_preserved, ""
-        )
+        with open_ini_session(
+            target_qgis_ini_file, target_session
+        ) as target_ini_parser:
+            if not target_ini_parser.has_section("browser"):
+                target_ini_parser["browser"] = {}
+            elif target_ini_parser.has_option("browser", "favourites"):
+                favourites_to_be_preserved = target_ini_parser.get(
+                    "browser", "favourites"
+                )
 
-        target_ini_parser.set(
-            "browser", "favourites", favourites_to_be_preserved + import_string
-        )
+            import_string = favourites_to_be_imported["favourites"].replace(
+                favourites_to_be_preserved, ""
+            )
 
-        with open(target_qgis_ini_file, "w") as qgisconf:
-            target_ini_parser.write(qgisconf, space_around_delimiters=False)
+            target_ini_parser.set(
+                "browser", "favourites", favourites_to_be_preserved + import_string
+            )
     except Exception as e:
         # TODO: It would be nice to have a smaller and more specific try block but until then we except broadly
         error = f"{type(e)}: {str(e)}"
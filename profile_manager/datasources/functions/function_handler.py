@@ -2,8 +2,17 @@ from configparser import RawConfigParser
 
 from qgis.core import Qgis, QgsMessageLog
 
+from profile_manager.datasources.dataservices.ini_session import (
+    IniSession,
+    open_ini_session,
+)
 
-def import_expression_functions(source_qgis_ini_file: str, target_qgis_ini_file: str):
+
+def import_expression_functions(
+    source_qgis_ini_file: str,
+    target_qgis_ini_file: str,
+    target_session: IniSession = None,
+):
     """Imports custom expression functions from source to target profile.
 
     Custom expression functions are stored in QGIS/QGIS3.ini's [expressions] section, e.g.:
@@ -19,6 +28,8 @@ def import_expression_functions(source_qgis_ini_file: str, target_qgis_ini_file:
     Args:
         source_qgis_ini_file (str): Path to source INI file
         target_qgis_ini_file (str): Path to target INI file
+        target_session (IniSession): Session to apply the changes to, the target INI file is written
+            directly if None
 
     Returns:
         error_message (str): An error message, if something failed.
@@ -34,22 +45,18 @@ def import_expression_functions(source_qgis_ini_file: str, target_qgis_ini_file:
     try:
         get_functions = dict(source_ini_parser.items("expressions"))
 
-        target_ini_parser = RawConfigParser()
-        target_ini_parser.optionxform = str  # str = case-sensitive option names
-        target_ini_parser.read(target_qgis_ini_file)
-
-        if not target_ini_parser.has_section("expressions"):
-            target_ini_parser["expressions"] = {}
-
-        for entry in get_functions:
-            if "expression" in entry or "helpText" in entry:
-                target_ini_parser.set("expressions", entry, get_functions[entry])
-                QgsMessageLog.logMessage(
-                    f"Found '{entry}'", "Profile Manager", Qgis.Info
-                )
+        with open_ini_session(
+            target_qgis_ini_file, target_session
+        ) as target_ini_parser:
+            if not target_ini_parser.has_section("expressions"):
+                target_ini_parser["expressions"] = {}
 
-        with open(target_qgis_ini_file, "w") as qgisconf:
-            target_ini_parser.write(qgisconf, space_around_delimiters=False)
+            for entry in get_functions:
+                if "expression" in entry or "helpText" in entry:
+                    target_ini_parser.set("expressions", entry, get_functions[entry])
+                    QgsMessageLog.logMessage(
+                        f"Found '{entry}'", "Profile Manager", Qgis.Info
+                    )
     except Exception as e:
         # TODO: It would be nice to have a smaller and more specific try block but until then we except broadly
         error = f"{type(e)}: {str(e)}"
@@ -1,12 +1,20 @@
-from os import listdir, path
-from pathlib import Path
-from shutil import copy2
+from profile_manager.datasources.dataservices.directory_sync import (
+    SyncSummary,
+    sync_directory,
+)
 
 
-def import_models(source_profile_path: str, target_profile_path: str):
+def import_models(
+    source_profile_path: str,
+    target_profile_path: str,
+    compare_hashes: bool = False,
+    dry_run: bool = False,
+) -> SyncSummary:
     """Imports Processing models from source to target profile.
 
-    Note: Existing models with identical filenames will be overwritten!
+    Only new and changed models are copied, including those in subdirectories. Existing models with
+    identical filenames are overwritten, unless they were modified in the target profile after the
+    source's version. These are reported as conflicts.
 
     Models are stored in the processing/models/ subdirectory of a profile, e.g.:
     ...
@@ -15,20 +23,18 @@ def import_models(source_profile_path: str, target_profile_path: str):
     ...
 
     Args:
-        TODO
-    """
-    source_models_dir = source_profile_path + "processing/models/"
-    target_models_dir = target_profile_path + "processing/models/"
+        source_profile_path (str): Path to the source profile
+        target_profile_path (str): Path to the target profile
+        compare_hashes (bool): If models should be compared by hash instead of modification time
+        dry_run (bool): If nothing should be copied, only the models that would be copied are
+            returned
 
-    if path.exists(source_models_dir):
-        if not path.exists(target_models_dir):
-            Path(target_models_dir).mkdir(parents=True, exist_ok=True)
-        for item in listdir(source_models_dir):
-            source = path.join(source_models_dir, item)
-            dest = path.join(target_models_dir, item)
-            if path.isdir(source):
-                continue
-            else:
-                copy2(source, dest)
-    else:
-        pass
+    Returns:
+        SyncSummary: Copied (or to be copied), skipped and conflicting models
+    """
+    return sync_directory(
+        source_profile_path + "processing/models/",
+        target_profile_path + "processing/models/",
+        compare_hashes=compare_hashes,
+        dry_run=dry_run,
+    )
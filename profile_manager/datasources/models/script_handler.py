@@ -1,12 +1,20 @@
-from os import listdir, path
-from pathlib import Path
-from shutil import copy2
+from profile_manager.datasources.dataservices.directory_sync import (
+    SyncSummary,
+    sync_directory,
+)
 
 
-def import_scripts(source_profile_path: str, target_profile_path: str):
+def import_scripts(
+    source_profile_path: str,
+    target_profile_path: str,
+    compare_hashes: bool = False,
+    dry_run: bool = False,
+) -> SyncSummary:
     """Imports Processing scripts from source to target profile.
 
-    Note: Existing scripts with identical filenames will be overwritten!
+    Only new and changed scripts are copied, including those in subdirectories. Existing scripts
+    with identical filenames are overwritten, unless they were modified in the target profile after
+    the source's version. These are reported as conflicts.
 
     Scripts are stored in the processing/scripts/ subdirectory of a profile, e.g.:
     ...
@@ -15,19 +23,18 @@ def import_scripts(source_profile_path: str, target_profile_path: str):
     ...
 
     Args:
-        TODO
+        source_profile_path (str): Path to the source profile
+        target_profile_path (str): Path to the target profile
+        compare_hashes (bool): If scripts should be compared by hash instead of modification time
+        dry_run (bool): If nothing should be copied, only the scripts that would be copied are
+            returned
+
+    Returns:
+        SyncSummary: Copied (or to be copied), skipped and conflicting scripts
     """
-    source_scripts_dir = source_profile_path + "processing/scripts/"
-    target_scripts_dir = target_profile_path + "processing/scripts/"
-    if path.exists(source_scripts_dir):
-        if not path.exists(target_scripts_dir):
-            Path(target_scripts_dir).mkdir(parents=True, exist_ok=True)
-        for item in listdir(source_scripts_dir):
-            source = path.join(source_scripts_dir, item)
-            dest = path.join(target_scripts_dir, item)
-            if path.isdir(source):
-                continue
-            else:
-                copy2(source, dest)
-    else:
-        pass
+    return sync_directory(
+        source_profile_path + "processing/scripts/",
+        target_profile_path + "processing/scripts/",
+        compare_hashes=compare_hashes,
+        dry_run=dry_run,
+    )
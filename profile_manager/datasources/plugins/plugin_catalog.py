@@ -0,0 +1,178 @@
+from concurrent.futures import ThreadPoolExecutor
+from configparser import Error as ConfigParserError
+from configparser import RawConfigParser
+from dataclasses import dataclass, field, replace
+from os import path, scandir
+from re import findall
+
+from profile_manager.utils import get_file_state
+
+# Reading metadata and summing up file sizes is mostly waiting for the disk, threads keep it busy
+MAX_PLUGIN_CATALOG_WORKERS = 8
+
+
+@dataclass
+class PluginInfo:
+    """A plugin listed in a profile's [PythonPlugins] section, described by its metadata.txt"""
+
+    directory_name: str
+    name: str = ""
+    version: str = ""
+    size: int = 0  # bytes of all files in the plugin's directory
+    dependencies: list[str] = field(default_factory=list)
+    installed: bool = False  # if the plugin's directory exists in the profile
+    active: bool = False
+
+
+class PluginCatalog:
+    """Reads the metadata of the plugins of profiles, keeping the result of each plugin directory.
+
+    A plugin is read again if the modification time of its directory or of its metadata.txt changed,
+    e.g. because it was updated or reinstalled.
+    """
+
+    def __init__(self):
+        # plugin directory -> (state of the directory, state of its metadata.txt, PluginInfo)
+        self.entries = {}
+
+    def get_plugins(
+        self, plugins_dir: str, plugin_states: dict[str, str]
+    ) -> list[PluginInfo]:
+        """Returns the plugins of a profile, reading the metadata of changed ones in parallel.
+
+        Args:
+            plugins_dir (str): Path to the profile's python/plugins/ directory
+            plugin_states (dict[str, str]): Active state ("true"/"false") per plugin directory name,
+                as in the profile's [PythonPlugins] section
+
+        Returns:
+            list[PluginInfo]: The plugins in the order of plugin_states
+        """
+        plugin_dirs = {
+            plugin_name: path.join(plugins_dir, plugin_name)
+            for plugin_name in plugin_states
+        }
+        file_states = {
+            plugin_dir: (
+                get_file_state(plugin_dir),
+                get_file_state(path.join(plugin_dir, "metadata.txt")),
+            )
+            for plugin_dir in plugin_dirs.values()
+        }
+        stale_plugin_dirs = [
+            plugin_dir
+            for plugin_dir, states in file_states.items()
+            if plugin_dir not in self.entries or self.entries[plugin_dir][:2] != states
+        ]
+        if stale_plugin_dirs:
+            with ThreadPoolExecutor(max_workers=MAX_PLUGIN_CATALOG_WORKERS) as executor:
+                for plugin_dir, plugin_info in zip(
+                    stale_plugin_dirs,
+                    executor.map(read_plugin_info, stale_plugin_dirs),
+                ):
+                    self.entries[plugin_dir] = (*file_states[plugin_dir], plugin_info)
+
+        return [
+            replace(
+                self.entries[plugin_dirs[plugin_name]][2],
+                active=active.lower() == "true",
+            )
+            for plugin_name, active in plugin_states.items()
+        ]
+
+    def clear(self):
+        """Drops the metadata of all plugins"""
+        self.entries.clear()
+
+
+def read_plugin_info(plugin_dir: str) -> PluginInfo:
+    """Returns the name, version, size and dependencies of an installed plugin.
+
+    Args:
+        plugin_dir (str): Path to the plugin's directory
+
+    Returns:
+        PluginInfo: Description of the plugin, only the directory name if the directory does not
+            exist
+    """
+    plugin_info = PluginInfo(path.basename(path.normpath(plugin_dir)))
+    if not path.isdir(plugin_dir):
+        return plugin_info
+
+    metadata = read_plugin_metadata(path.join(plugin_dir, "metadata.txt"))
+    plugin_info.name = metadata.get("name", "")
+    plugin_info.version = metadata.get("version", "")
+    plugin_info.dependencies = [
+        dependency.strip()
+        for dependency in metadata.get("plugin_dependencies", "").split(",")
+        if dependency.strip()
+    ]
+    plugin_info.size = get_directory_size(plugin_dir)
+    plugin_info.installed = True
+    return plugin_info
+
+
+def read_plugin_metadata(metadata_file: str) -> dict[str, str]:
+    """Returns the [general] section of a plugin's metadata.txt, empty if it can not be read"""
+    metadata_parser = RawConfigParser(strict=False)
+    try:
+        metadata_parser.read(metadata_file, encoding="utf-8")
+    except (ConfigParserError, UnicodeDecodeError):
+        return {}
+    if not metadata_parser.has_section("general"):
+        return {}
+    return dict(metadata_parser.items("general"))
+
+
+def get_plugin_version(plugin_dir: str) -> str:
+    """Returns the version from a plugin's metadata.txt, "" if it is missing or unreadable"""
+    return read_plugin_metadata(path.join(plugin_dir, "metadata.txt")).get(
+        "version", ""
+    )
+
+
+def compare_plugin_versions(version_a: str, version_b: str) -> int:
+    """Compares two plugin versions, e.g. 1.10.0 > 1.9 > 1.9rc1 > 1.9beta
+
+    Numbers are compared numerically, other parts alphabetically and as pre-releases, i.e. before
+    any number.
+
+    Returns:
+        int: -1 if version_a is older, 1 if it is newer and 0 if both are equal
+    """
+    key_a = get_version_key(version_a)
+    key_b = get_version_key(version_b)
+    # pads the shorter version with zeros, e.g. 1.0 equals 1.0.0
+    length = max(len(key_a), len(key_b))
+    key_a += [(1, 0, "")] * (length - len(key_a))
+    key_b += [(1, 0, "")] * (length - len(key_b))
+    return (key_a > key_b) - (key_a < key_b)
+
+
+def get_version_key(version: str) -> list[tuple[int, int, str]]:
+    """Returns a comparable key of a version's parts, see compare_plugin_versions"""
+    return [
+        (1, int(part), "") if part.isdigit() else (0, 0, part.lower())
+        # e.g. v1.2 is 1.2
+        for part in findall(r"\d+|[a-zA-Z]+", version.strip().lstrip("vV"))
+    ]
+
+
+def get_directory_size(directory: str) -> int:
+    """Returns the size in bytes of all files in a directory tree, skipping unreadable entries"""
+    size = 0
+    directories = [directory]
+    while directories:
+        try:
+            with scandir(directories.pop()) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            directories.append(entry.path)
+                        elif entry.is_file():
+                            size += entry.stat().st_size
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    return size
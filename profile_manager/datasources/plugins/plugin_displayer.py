@@ -1,7 +1,22 @@
-from configparser import NoSectionError, RawConfigParser
-
-from qgis.PyQt.QtCore import Qt
-from qgis.PyQt.QtWidgets import QListWidgetItem
+from qgis.PyQt.QtCore import QSortFilterProxyModel, Qt
+
+from profile_manager.datasources.plugins.plugin_catalog import PluginCatalog
+from profile_manager.datasources.plugins.plugin_list_model import (
+    NAME_COLUMN,
+    PluginListModel,
+)
+from profile_manager.utils import adjust_to_operating_system
+
+# Via QGIS/python/plugins/CMakeLists.txt
+CORE_PLUGINS = [
+    "db_manager",
+    "GdalTools",  # not a plugin anymore since QGIS 3.0
+    "grassprovider",  # plugin since 3.22
+    "MetaSearch",
+    "otbprovider",  # plugin since 3.22
+    "processing",
+    "sagaprovider",  # removed in 3.30
+]
 
 
 class PluginDisplayer:
@@ -11,61 +26,70 @@ class PluginDisplayer:
         self.source_qgis_ini_file = ""
         self.target_qgis_ini_file = ""
 
-        # Via QGIS/python/plugins/CMakeLists.txt
-        self.core_plugins = [
-            "db_manager",
-            "GdalTools",  # not a plugin anymore since QGIS 3.0
-            "grassprovider",  # plugin since 3.22
-            "MetaSearch",
-            "otbprovider",  # plugin since 3.22
-            "processing",
-            "sagaprovider",  # removed in 3.30
-        ]
+        self.core_plugins = CORE_PLUGINS
+        self.plugin_catalog = PluginCatalog()
+
+        dlg = self.profile_manager.dlg
+        self.source_plugin_model = PluginListModel(True, self.core_plugins, dlg)
+        self.target_plugin_model = PluginListModel(False, self.core_plugins, dlg)
+        self.source_filter_model = create_filter_model(self.source_plugin_model)
+        self.target_filter_model = create_filter_model(self.target_plugin_model)
+        for view, filter_model in (
+            (dlg.treeViewPlugins, self.source_filter_model),
+            (dlg.treeViewPluginsTarget, self.target_filter_model),
+        ):
+            view.setModel(filter_model)
+            view.sortByColumn(NAME_COLUMN, Qt.AscendingOrder)
+            view.setColumnWidth(NAME_COLUMN, 250)
 
     def populate_plugins_list(self, only_populate_target_profile=False):
-        """Gets plugins from ini file and add them to treeWidget using their directory name
+        """Shows the plugins listed in the ini files with the metadata of the plugin catalog
 
         Args:
             only_populate_target_profile (bool): If only the target list should be populated
         """
-        ini_parser = RawConfigParser()
-        ini_parser.optionxform = str  # str = case-sensitive option names
-
-        if only_populate_target_profile:
-            ini_parser.read(self.target_qgis_ini_file)
-            plugin_list_widget = self.profile_manager.dlg.list_plugins_target
-        else:
-            ini_parser.read(self.source_qgis_ini_file)
-            plugin_list_widget = self.profile_manager.dlg.list_plugins
-
-        plugin_list_widget.clear()
-
-        try:
-            plugins_in_profile = dict(ini_parser.items("PythonPlugins"))
-        except NoSectionError:
-            ini_parser["PythonPlugins"] = {}
-            plugins_in_profile = dict(ini_parser.items("PythonPlugins"))
-
-        # add an item to the list for each non-core plugin
-        for plugin_name in plugins_in_profile:
-            item = QListWidgetItem()
-
-            if not only_populate_target_profile:
-                item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
-                item.setCheckState(Qt.Unchecked)
-            else:
-                item.setFlags(item.flags() & ~Qt.ItemIsSelectable)
-
-            if plugin_name in self.core_plugins:
-                item.setFlags(item.flags() & ~Qt.ItemIsEnabled)
-                plugin_name = f"{plugin_name} (Core Plugin)"
-
-            item.setText(str(plugin_name))
-            plugin_list_widget.addItem(item)
-
+        source_profile_path, target_profile_path = (
+            self.profile_manager.get_profile_paths()
+        )
+        plugin_lists = [
+            (self.target_qgis_ini_file, target_profile_path, self.target_plugin_model)
+        ]
         if not only_populate_target_profile:
-            self.populate_plugins_list(only_populate_target_profile=True)
+            plugin_lists.insert(
+                0,
+                (
+                    self.source_qgis_ini_file,
+                    source_profile_path,
+                    self.source_plugin_model,
+                ),
+            )
+
+        for qgis_ini_file, profile_path, plugin_model in plugin_lists:
+            plugins_in_profile = self.profile_manager.scan_cache.get_snapshot(
+                qgis_ini_file
+            ).plugins
+            plugin_model.set_plugins(
+                self.plugin_catalog.get_plugins(
+                    adjust_to_operating_system(profile_path + "python/plugins/"),
+                    plugins_in_profile,
+                )
+            )
+
+    def set_filter_text(self, text: str):
+        """Shows only the plugins whose name, version or dependencies contain the text"""
+        self.source_filter_model.setFilterFixedString(text)
+        self.target_filter_model.setFilterFixedString(text)
 
     def set_ini_paths(self, source, target):
         self.source_qgis_ini_file = source
         self.target_qgis_ini_file = target
+
+
+def create_filter_model(plugin_model: PluginListModel) -> QSortFilterProxyModel:
+    """Returns a proxy model filtering the plugins by the text of any column, case-insensitively"""
+    filter_model = QSortFilterProxyModel(plugin_model)
+    filter_model.setSourceModel(plugin_model)
+    filter_model.setFilterKeyColumn(-1)
+    filter_model.setFilterCaseSensitivity(Qt.CaseInsensitive)
+    filter_model.setSortRole(Qt.UserRole)
+    return filter_model
@@ -1,8 +1,4 @@
-from qgis.PyQt.QtCore import Qt
-
 from profile_manager.datasources.plugins.plugin_displayer import PluginDisplayer
-from profile_manager.datasources.plugins.plugin_importer import import_plugins
-from profile_manager.datasources.plugins.plugin_remover import remove_plugins
 
 
 class PluginHandler:
@@ -14,7 +10,7 @@ class PluginHandler:
         self.target_qgis_ini_file = ""
 
     def populate_plugins_list(self, only_for_target_profile=False):
-        """Gets active plugins from ini file and displays them in treeWidget"""
+        """Gets plugins from ini file and displays them with their metadata"""
         self.set_path_files()
         self.plugin_displayer.set_ini_paths(
             self.source_qgis_ini_file, self.target_qgis_ini_file
@@ -23,40 +19,13 @@ class PluginHandler:
             only_populate_target_profile=only_for_target_profile
         )
 
-    def import_selected_plugins(self):
-        """Import selected plugins into target profile"""
-        source_profile_path, target_profile_path = (
-            self.profile_manager.get_profile_paths()
-        )
-
-        plugin_names = []
-        for item in self.profile_manager.dlg.list_plugins.findItems(
-            "", Qt.MatchContains | Qt.MatchRecursive
-        ):
-            if item.checkState() == Qt.Checked:
-                plugin_names.append(item.text())
-
-        import_plugins(
-            source_profile_path,
-            target_profile_path,
-            self.target_qgis_ini_file,
-            plugin_names,
-        )
-        self.populate_plugins_list()
-
-    def remove_selected_plugins(self):
-        """Removes selected plugins from source profile"""
-        source_profile_path, _ = self.profile_manager.get_profile_paths()
-
-        plugin_names = []
-        for item in self.profile_manager.dlg.list_plugins.findItems(
-            "", Qt.MatchContains | Qt.MatchRecursive
-        ):
-            if item.checkState() == Qt.Checked:
-                plugin_names.append(item.text())
+    def get_checked_plugin_names(self) -> list[str]:
+        """Returns the directory names of the plugins checked in the source plugin list"""
+        return self.plugin_displayer.source_plugin_model.get_checked_plugin_names()
 
-        remove_plugins(source_profile_path, self.source_qgis_ini_file, plugin_names)
-        self.populate_plugins_list()
+    def set_all_plugins_checked(self, checked: bool):
+        """Checks or unchecks all plugins of the source plugin list"""
+        self.plugin_displayer.source_plugin_model.set_all_checked(checked)
 
     def set_path_files(self):
         """Sets file paths"""
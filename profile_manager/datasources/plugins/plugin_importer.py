@@ -1,9 +1,24 @@
-from configparser import RawConfigParser
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from os import path
 from pathlib import Path
-from shutil import copytree
+from shutil import copy2, copytree, rmtree
 
-from profile_manager.utils import adjust_to_operating_system
+from profile_manager.datasources.dataservices.directory_sync import (
+    SyncSummary,
+    sync_directory,
+)
+from profile_manager.datasources.dataservices.ini_session import (
+    IniSession,
+    open_ini_session,
+)
+from profile_manager.datasources.plugins.plugin_catalog import (
+    compare_plugin_versions,
+    get_plugin_version,
+)
+from profile_manager.utils import adjust_to_operating_system, tr
+
+# Copying is mostly waiting for the disk, so a few threads are enough to keep it busy
+MAX_PLUGIN_COPY_WORKERS = 4
 
 
 def import_plugins(
@@ -11,7 +26,11 @@ def import_plugins(
     target_profile_path: str,
     target_qgis_ini_file: str,
     plugin_names: list[str],
-):
+    target_session: IniSession = None,
+    progress_callback=None,
+    is_canceled=None,
+    update_existing: bool = False,
+) -> list[str]:
     """Copies the specified plugins from source to target profile.
 
     Copies the files and sets the INI options accordingly.
@@ -29,35 +48,179 @@ def import_plugins(
     BaZ=false
     ...
 
+    Plugins already installed in the target profile are left as they are, unless update_existing is
+    set. Then they are synced with the source's plugin directory, see sync_plugin, unless the target
+    has a newer version.
+
+    The plugin directories are copied concurrently by a bounded thread pool. The INI options are
+    only set for the plugins that were copied (or already existed in the target profile), in the
+    calling thread.
+
     Args:
-        TODO
-    """
-    ini_parser = RawConfigParser()
-    ini_parser.optionxform = str  # str = case-sensitive option names
-    ini_parser.read(target_qgis_ini_file)
+        source_profile_path (str): Path to the source profile
+        target_profile_path (str): Path to the target profile
+        target_qgis_ini_file (str): Path to target INI file
+        plugin_names (list[str]): Directory names of the plugins to import
+        target_session (IniSession): Session to apply the changes to, the target INI file is written
+            directly if None
+        progress_callback (Callable[[str, int], None]): Called in the calling thread with the name
+            and size in bytes of each finished plugin
+        is_canceled (Callable[[], bool]): Checked before each plugin is copied, remaining plugins
+            are skipped
+        update_existing (bool): If plugins already installed in the target profile should be updated
 
-    if not ini_parser.has_section("PythonPlugins"):
-        ini_parser["PythonPlugins"] = {}
+    Returns:
+        list[str]: Error messages of the plugins that could not be imported
+    """
+    if not plugin_names:
+        return []
 
-    for plugin_name in plugin_names:
-        ini_parser.set("PythonPlugins", plugin_name, "true")
+    target_plugins_dir = adjust_to_operating_system(
+        target_profile_path + "python/plugins/"
+    )
+    Path(target_plugins_dir).mkdir(parents=True, exist_ok=True)
 
-        source_plugin_dir = adjust_to_operating_system(
-            source_profile_path + "python/plugins/" + plugin_name + "/"
-        )
-        target_plugin_dir = adjust_to_operating_system(
-            target_profile_path + "python/plugins/" + plugin_name + "/"
+    def copy_plugin(plugin_name: str) -> tuple[int, str]:
+        if is_canceled and is_canceled():
+            return 0, None
+        return import_plugin(
+            source_profile_path, target_profile_path, plugin_name, update_existing
         )
 
-        if path.exists(source_plugin_dir):
-            if not path.exists(target_profile_path + "python/plugins/"):
-                Path(target_profile_path + "python/plugins/").mkdir(
-                    parents=True, exist_ok=True
+    error_messages = []
+    imported_plugin_names = []
+    with ThreadPoolExecutor(max_workers=MAX_PLUGIN_COPY_WORKERS) as executor:
+        futures = {
+            executor.submit(copy_plugin, plugin_name): plugin_name
+            for plugin_name in plugin_names
+        }
+        for future in as_completed(futures):
+            plugin_name = futures[future]
+            try:
+                copied_bytes, error_message = future.result()
+            except OSError as e:
+                error_messages.append(
+                    tr("Plugin '{0}' could not be imported due to error:\n{1}").format(
+                        plugin_name, e
+                    )
                 )
-            if not path.isdir(target_plugin_dir):
-                copytree(source_plugin_dir, target_plugin_dir)
-        else:
-            continue  # TODO error, dont skip silently!
+                continue
+            if error_message:
+                error_messages.append(error_message)
+            imported_plugin_names.append(plugin_name)
+            if progress_callback:
+                progress_callback(plugin_name, copied_bytes)
+
+    if is_canceled and is_canceled():
+        return error_messages
+
+    with open_ini_session(target_qgis_ini_file, target_session) as ini_parser:
+        if not ini_parser.has_section("PythonPlugins"):
+            ini_parser["PythonPlugins"] = {}
+
+        # keep the order of the selection
+        for plugin_name in plugin_names:
+            if plugin_name in imported_plugin_names:
+                ini_parser.set("PythonPlugins", plugin_name, "true")
+
+    return error_messages
+
+
+def import_plugin(
+    source_profile_path: str,
+    target_profile_path: str,
+    plugin_name: str,
+    update_existing: bool,
+) -> tuple[int, str]:
+    """Copies a plugin directory into the target profile or updates it, see import_plugins
+
+    Returns:
+        tuple[int, str]: Number of bytes copied and a message if an installed plugin was not updated
+
+    Raises:
+        FileNotFoundError: If the plugin does not exist in the source profile
+        OSError: If the plugin could not be copied, a partial copy is removed
+    """
+    source_plugin_dir = adjust_to_operating_system(
+        source_profile_path + "python/plugins/" + plugin_name + "/"
+    )
+    target_plugin_dir = adjust_to_operating_system(
+        target_profile_path + "python/plugins/" + plugin_name + "/"
+    )
+    if not path.exists(source_plugin_dir):
+        raise FileNotFoundError(tr("Plugin does not exist in the source profile."))
+    if not path.isdir(target_plugin_dir):
+        return copy_plugin_directory(source_plugin_dir, target_plugin_dir), None
+    if not update_existing:
+        return 0, None
+    if is_plugin_downgrade(source_plugin_dir, target_plugin_dir):
+        return 0, tr(
+            "Plugin '{0}' was not updated, the target profile has the newer version {1}."
+        ).format(plugin_name, get_plugin_version(target_plugin_dir))
+    summary = sync_plugin(source_plugin_dir, target_plugin_dir)
+    return (
+        sum(
+            path.getsize(path.join(source_plugin_dir, relative_path))
+            for relative_path in summary.copied
+        ),
+        None,
+    )
 
-    with open(target_qgis_ini_file, "w") as qgisconf:
-        ini_parser.write(qgisconf, space_around_delimiters=False)
+
+def copy_plugin_directory(source_plugin_dir: str, target_plugin_dir: str) -> int:
+    """Copies a plugin directory, returns the number of bytes copied
+
+    Raises:
+        OSError: If a file could not be copied, the partial copy is removed
+    """
+    copied_bytes = 0
+
+    def copy_file(source_file, target_file):
+        nonlocal copied_bytes
+        copy2(source_file, target_file)
+        copied_bytes += path.getsize(target_file)
+        return target_file
+
+    try:
+        copytree(source_plugin_dir, target_plugin_dir, copy_function=copy_file)
+    except OSError:
+        # a partial copy would be mistaken for an installed plugin by the next import
+        rmtree(target_plugin_dir, ignore_errors=True)
+        raise
+    return copied_bytes
+
+
+def sync_plugin(
+    source_plugin_dir: str, target_plugin_dir: str, dry_run: bool = False
+) -> SyncSummary:
+    """Updates an installed plugin to the files of the source's plugin directory.
+
+    Only files whose size, modification time and content differ are rewritten and files that no
+    longer exist in the source are removed, so updating a plugin writes only the changed files.
+
+    Args:
+        source_plugin_dir (str): Plugin directory to update from
+        target_plugin_dir (str): Plugin directory to update
+        dry_run (bool): If nothing should be written, only the summary of what would be changed is
+            returned
+
+    Returns:
+        SyncSummary: Copied (or to be copied), skipped and removed files
+
+    Raises:
+        OSError: If a file can not be copied or removed
+    """
+    return sync_directory(
+        source_plugin_dir, target_plugin_dir, dry_run=dry_run, mirror=True
+    )
+
+
+def is_plugin_downgrade(source_plugin_dir: str, target_plugin_dir: str) -> bool:
+    """Returns if the installed plugin's metadata.txt has a newer version than the source's"""
+    return (
+        compare_plugin_versions(
+            get_plugin_version(source_plugin_dir),
+            get_plugin_version(target_plugin_dir),
+        )
+        < 0
+    )
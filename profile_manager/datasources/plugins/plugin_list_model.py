@@ -0,0 +1,181 @@
+from qgis.PyQt.QtCore import QAbstractTableModel, QModelIndex, Qt
+from qgis.PyQt.QtGui import QFont
+
+from profile_manager.datasources.plugins.plugin_catalog import PluginInfo
+
+# Columns of the plugin lists
+NAME_COLUMN, VERSION_COLUMN, SIZE_COLUMN, DEPENDENCIES_COLUMN = range(4)
+
+
+class PluginListModel(QAbstractTableModel):
+    """A table of the plugins of a profile with their version, size and dependencies.
+
+    The model is backed by the PluginInfo list of the plugin catalog, the checked plugins are kept
+    as a set of directory names. Views filter and sort it through a QSortFilterProxyModel, sorting
+    by Qt.UserRole.
+    """
+
+    def __init__(self, checkable: bool, core_plugins: list[str], *args, **kwargs):
+        """Sets up an empty plugin list
+
+        Args:
+            checkable (bool): If the plugins can be checked, e.g. for an import
+            core_plugins (list[str]): Directory names of the plugins shipped with QGIS, these can
+                not be checked
+        """
+        super().__init__(*args, **kwargs)
+        self.checkable = checkable
+        self.core_plugins = core_plugins
+        self.plugins: list[PluginInfo] = []
+        self.checked: set[str] = set()
+        self.column_labels = [
+            self.tr("Plugin"),
+            self.tr("Version"),
+            self.tr("Size"),
+            self.tr("Dependencies"),
+        ]
+        # data of a cell by role, see data
+        self.role_data = {
+            Qt.DisplayRole: self.get_display_data,
+            Qt.UserRole: self.get_sort_data,
+            Qt.CheckStateRole: self.get_check_state,
+            Qt.ToolTipRole: self.get_tooltip_data,
+            Qt.FontRole: self.get_font,
+        }
+
+    def set_plugins(self, plugins: list[PluginInfo]):
+        """Shows the plugins of a profile, unchecking all of them"""
+        self.beginResetModel()
+        self.plugins = plugins
+        self.checked = set()
+        self.endResetModel()
+
+    def set_all_checked(self, checked: bool):
+        """Checks or unchecks all plugins but the core plugins, emitting a single change"""
+        if not self.checkable or not self.plugins:
+            return
+        if checked:
+            self.checked = {
+                plugin.directory_name
+                for plugin in self.plugins
+                if plugin.directory_name not in self.core_plugins
+            }
+        else:
+            self.checked = set()
+        self.dataChanged.emit(
+            self.index(0, NAME_COLUMN),
+            self.index(len(self.plugins) - 1, NAME_COLUMN),
+            [Qt.CheckStateRole],
+        )
+
+    def get_checked_plugin_names(self) -> list[str]:
+        """Returns the directory names of the checked plugins, in the order of the profile's INI"""
+        return [
+            plugin.directory_name
+            for plugin in self.plugins
+            if plugin.directory_name in self.checked
+        ]
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.plugins)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.column_labels)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        role_data = self.role_data.get(role)
+        if not index.isValid() or role_data is None:
+            return None
+        return role_data(self.plugins[index.row()], index.column())
+
+    def get_display_data(self, plugin: PluginInfo, column: int) -> str:
+        """Returns the text of a plugin's cell"""
+        if column == NAME_COLUMN:
+            return self.get_label(plugin)
+        if column == VERSION_COLUMN:
+            return plugin.version
+        if column == SIZE_COLUMN:
+            return format_size(plugin.size) if plugin.installed else ""
+        return ", ".join(plugin.dependencies)
+
+    def get_sort_data(self, plugin: PluginInfo, column: int):
+        """Returns the sort key of a plugin's cell, e.g. the size in bytes instead of its label"""
+        if column == SIZE_COLUMN:
+            return plugin.size
+        return self.get_display_data(plugin, column).lower()
+
+    def get_check_state(self, plugin: PluginInfo, column: int):
+        """Returns the check state of a plugin's name cell if the plugins can be checked"""
+        if column != NAME_COLUMN or not self.checkable:
+            return None
+        return Qt.Checked if plugin.directory_name in self.checked else Qt.Unchecked
+
+    def get_tooltip_data(self, plugin: PluginInfo, column: int):
+        """Returns the tooltip of a plugin's name cell"""
+        return self.get_tooltip(plugin) if column == NAME_COLUMN else None
+
+    def get_font(self, plugin: PluginInfo, column: int):
+        """Returns an italic font for the cells of inactive plugins"""
+        if plugin.active:
+            return None
+        font = QFont()
+        font.setItalic(True)
+        return font
+
+    def setData(self, index: QModelIndex, value, role: int = Qt.EditRole) -> bool:
+        if (
+            not index.isValid()
+            or index.column() != NAME_COLUMN
+            or role != Qt.CheckStateRole
+            or not self.checkable
+        ):
+            return False
+        plugin = self.plugins[index.row()]
+        if Qt.CheckState(value) == Qt.Checked:
+            self.checked.add(plugin.directory_name)
+        else:
+            self.checked.discard(plugin.directory_name)
+        self.dataChanged.emit(index, index, [Qt.CheckStateRole])
+        return True
+
+    def flags(self, index: QModelIndex):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        plugin = self.plugins[index.row()]
+        if plugin.directory_name in self.core_plugins:
+            return Qt.NoItemFlags
+        flags = Qt.ItemIsEnabled
+        if self.checkable:
+            flags |= Qt.ItemIsSelectable
+            if index.column() == NAME_COLUMN:
+                flags |= Qt.ItemIsUserCheckable
+        return flags
+
+    def headerData(self, section: int, orientation, role: int = Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.column_labels[section]
+        return None
+
+    def get_label(self, plugin: PluginInfo) -> str:
+        """Returns the plugin's name from its metadata, with its directory name if they differ"""
+        if plugin.directory_name in self.core_plugins:
+            return self.tr("{} (Core Plugin)").format(plugin.directory_name)
+        if plugin.name and plugin.name != plugin.directory_name:
+            return f"{plugin.name} ({plugin.directory_name})"
+        return plugin.directory_name
+
+    def get_tooltip(self, plugin: PluginInfo) -> str:
+        """Returns the directory name and state of the plugin"""
+        lines = [self.tr("Directory: {}").format(plugin.directory_name)]
+        if not plugin.active:
+            lines.append(self.tr("Inactive"))
+        if not plugin.installed and plugin.directory_name not in self.core_plugins:
+            lines.append(self.tr("Not installed in the profile"))
+        return "\n".join(lines)
+
+
+def format_size(size: int) -> str:
+    """Returns a size in bytes as KB or MB"""
+    if size < 1024 * 1024:
+        return f"{size / 1024:.0f} KB"
+    return f"{size / (1024 * 1024):.1f} MB"
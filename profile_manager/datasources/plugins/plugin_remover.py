@@ -1,8 +1,9 @@
-from configparser import RawConfigParser
 from shutil import rmtree
 
-from qgis.PyQt.QtWidgets import QMessageBox
-
+from profile_manager.datasources.dataservices.ini_session import (
+    IniSession,
+    open_ini_session,
+)
 from profile_manager.utils import adjust_to_operating_system, tr
 
 
@@ -10,7 +11,8 @@ def remove_plugins(
     profile_path: str,
     qgis_ini_file: str,
     plugin_names: list[str],
-):
+    session: IniSession = None,
+) -> list[str]:
     """Removes the specified plugins from the profile.
 
     Removes both the files from python/plugins/ and the QGIS/QGIS3.ini [PythonPlugins] section entries.
@@ -18,33 +20,32 @@ def remove_plugins(
     Note: Plugin specific settings are not removed as we have no way of knowing where or how they are stored.
 
     Args:
-        TODO
+        profile_path (str): Path to the profile
+        qgis_ini_file (str): Path to the profile's INI file
+        plugin_names (list[str]): Directory names of the plugins to remove
+        session (IniSession): Session to apply the changes to, if None the INI file is written
+            directly
+
+    Returns:
+        list[str]: Error messages of the plugins that could not be removed
     """
-    ini_parser = RawConfigParser()
-    ini_parser.optionxform = str  # str = case-sensitive option names
-    ini_parser.read(qgis_ini_file)
-
-    for plugin_name in plugin_names:
-        # Removes plugin from active state list in PythonPlugins section
-        if ini_parser.has_option("PythonPlugins", plugin_name):
-            ini_parser.remove_option("PythonPlugins", plugin_name)
-
-        plugins_dir = adjust_to_operating_system(
-            profile_path + "python/plugins/" + plugin_name + "/"
-        )
-
-        try:
-            rmtree(plugins_dir)
-        except OSError as e:
-            # TODO do not do GUI stuff in these functions if possible, maybe return a list of errors instead?
-            QMessageBox.critical(
-                None,
-                tr("Plugin could not be removed"),
-                tr("Plugin '{0}' could not be removed due to error:\n{1}").format(
-                    plugin_name, e
-                ),
+    error_messages = []
+    with open_ini_session(qgis_ini_file, session) as ini_parser:
+        for plugin_name in plugin_names:
+            # Removes plugin from active state list in PythonPlugins section
+            if ini_parser.has_option("PythonPlugins", plugin_name):
+                ini_parser.remove_option("PythonPlugins", plugin_name)
+
+            plugins_dir = adjust_to_operating_system(
+                profile_path + "python/plugins/" + plugin_name + "/"
             )
-            continue
 
-    with open(qgis_ini_file, "w") as qgisconf:
-        ini_parser.write(qgisconf, space_around_delimiters=False)
+            try:
+                rmtree(plugins_dir)
+            except OSError as e:
+                error_messages.append(
+                    tr("Plugin '{0}' could not be removed due to error:\n{1}").format(
+                        plugin_name, e
+                    )
+                )
+    return error_messages
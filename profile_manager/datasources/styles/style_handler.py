@@ -1,58 +1,376 @@
+import re
 import sqlite3
+from collections import defaultdict
+from dataclasses import dataclass, field
+from hashlib import sha256
 from os import path
+from pathlib import Path
 from shutil import copy
 
+from lxml import etree as et
 from qgis.core import Qgis, QgsMessageLog
 
+from profile_manager.utils import tr
 
-def import_styles(source_profile_path: str, target_profile_path: str):
+# Style tables with named entries and the tag map tables relating them to tags, with their entry id
+# column
+STYLE_ENTRY_TABLES = {
+    "symbol": ("tagmap", "symbol_id"),
+    "colorramp": ("ctagmap", "colorramp_id"),
+    "textformat": ("tftagmap", "textformat_id"),
+    "labelsettings": ("lstagmap", "labelsettings_id"),
+    "legendpatchshapes": ("lpstagmap", "legendpatchshape_id"),
+    "symbol3d": ("symbol3dtagmap", "symbol3d_id"),
+}
+
+
+def import_styles(
+    source_profile_path: str,
+    target_profile_path: str,
+    conflict_policy: str = "rename",
+    planned_summary: "StyleMergeSummary" = None,
+):
     """Imports styles from source profile to target profile.
 
-    Note: Currently it only imports symbols (not 3D) and label settings, not 3D symbols, color ramps, tags, etc.
+    Imports symbols, color ramps, text formats, label settings, legend patch shapes, 3D symbols,
+    their tags and smart groups. Entries identical to an entry of the target profile are skipped.
+    Entries whose name is taken by a different entry in the target profile are imported under a new
+    name or reported, see merge_style_tables. As the ids of the two databases are unrelated, tags
+    are matched by name and tag relations are remapped to the target's ids.
 
-    Styles are stored in symbology-style.db.
+    Styles are stored in symbology-style.db. The source database is attached read-only to the target
+    database so all rows are copied by SQL in a single transaction, nothing is imported if any
+    statement fails.
 
     Args:
-        TODO
+        source_profile_path (str): Path to the source profile
+        target_profile_path (str): Path to the target profile
+        conflict_policy (str): "rename" to import conflicting entries under a new name, "report" to
+            skip them
+        planned_summary (StyleMergeSummary): Result of plan_style_import previewed to the user,
+            nothing is imported if the merge would differ from it
 
     Returns:
-        error_message (str): An error message, if something SQL related failed.
+        error_message (str): An error message, if something SQL related failed or conflicting
+            entries were skipped.
     """
 
     source_db_path = source_profile_path + "symbology-style.db"
     target_db_path = target_profile_path + "symbology-style.db"
 
+    if not path.isfile(source_db_path):
+        return
+
     if not path.isfile(target_db_path):
         copy(source_db_path, target_db_path)
         return
 
-    source_db = sqlite3.connect(source_db_path)
-    target_db = sqlite3.connect(target_db_path)
+    try:
+        target_db = sqlite3.connect(Path(target_db_path).absolute().as_uri(), uri=True)
+        # transactions are controlled explicitly below
+        target_db.isolation_level = None
+        try:
+            target_db.execute(
+                "ATTACH DATABASE ? AS source",
+                (Path(source_db_path).absolute().as_uri() + "?mode=ro",),
+            )
+            target_db.execute("BEGIN")
+            try:
+                summary = merge_style_tables(target_db, conflict_policy)
+            except sqlite3.Error:
+                target_db.execute("ROLLBACK")
+                raise
+            if planned_summary is not None and summary != planned_summary:
+                target_db.execute("ROLLBACK")
+                return tr(
+                    "Styles not imported because the style databases changed since the preview."
+                )
+            target_db.execute("COMMIT")
+        finally:
+            target_db.close()
+    except sqlite3.Error as e:
+        error = f"{type(e)}: {str(e)}"
+        QgsMessageLog.logMessage(error, "Profile Manager", level=Qgis.Warning)
+        return error
+
+    QgsMessageLog.logMessage(
+        f"Imported styles: {len(summary.imported)} new, {len(summary.unchanged)} unchanged, "
+        f"{len(summary.renamed)} renamed, {len(summary.conflicts)} conflicts",
+        "Profile Manager",
+        level=Qgis.Info,
+    )
+    for renamed_entry in summary.renamed:
+        QgsMessageLog.logMessage(
+            f"Imported style renamed due to conflict: {renamed_entry}",
+            "Profile Manager",
+            level=Qgis.Info,
+        )
+    if summary.conflicts:
+        return tr(
+            "Styles not imported because different styles with the same name exist:\n{}"
+        ).format("\n".join(summary.conflicts))
+
+
+@dataclass
+class StyleMergeSummary:
+    """Entries handled by a style merge, as "table: name" """
+
+    imported: list[str] = field(default_factory=list)
+    unchanged: list[str] = field(default_factory=list)
+    renamed: list[str] = field(default_factory=list)
+    conflicts: list[str] = field(default_factory=list)
+
+
+def plan_style_import(
+    source_profile_path: str, target_profile_path: str, conflict_policy: str = "rename"
+) -> StyleMergeSummary:
+    """Returns which style entries import_styles would import, rename or skip, writing nothing.
+
+    Both databases are opened read-only.
 
-    source_db_cursor = source_db.cursor()
-    target_db_cursor = target_db.cursor()
+    Args:
+        source_profile_path (str): Path to the source profile
+        target_profile_path (str): Path to the target profile
+        conflict_policy (str): "rename" or "report", see import_styles
+
+    Returns:
+        StyleMergeSummary: Entries that would be imported, are unchanged, would be renamed or are
+            conflicts
 
+    Raises:
+        sqlite3.Error: If a database could not be read
+    """
+    source_db_path = source_profile_path + "symbology-style.db"
+    target_db_path = target_profile_path + "symbology-style.db"
+    summary = StyleMergeSummary()
+    if not path.isfile(source_db_path):
+        return summary
+
+    if not path.isfile(target_db_path):
+        # the whole database is copied
+        source_db = sqlite3.connect(
+            Path(source_db_path).absolute().as_uri() + "?mode=ro", uri=True
+        )
+        try:
+            source_tables = get_table_names(source_db, "main")
+            for table in STYLE_ENTRY_TABLES:
+                if table in source_tables:
+                    summary.imported.extend(
+                        f"{table}: {name}"
+                        for (name,) in source_db.execute(f"SELECT name FROM {table}")
+                    )
+        finally:
+            source_db.close()
+        return summary
+
+    target_db = sqlite3.connect(
+        Path(target_db_path).absolute().as_uri() + "?mode=ro", uri=True
+    )
     try:
-        # import label settings
-        custom_labels = source_db_cursor.execute("SELECT * FROM labelsettings")
-        target_db_cursor.executemany(
-            "INSERT OR REPLACE INTO labelsettings VALUES (?,?,?,?)", custom_labels
+        target_db.execute(
+            "ATTACH DATABASE ? AS source",
+            (Path(source_db_path).absolute().as_uri() + "?mode=ro",),
+        )
+        common_tables = get_table_names(target_db, "main") & get_table_names(
+            target_db, "source"
         )
+        for table in STYLE_ENTRY_TABLES:
+            if table in common_tables:
+                plan_entry_import(target_db, table, conflict_policy, summary)
+    finally:
+        target_db.close()
+    return summary
+
 
-        # import symbols
-        # FIXME: This has a hard-coded assumption that symbols with ids <= 115 are builtin symbols,
-        #        this will fail as soon as a new builtin symbol is shipped by QGIS.
-        custom_symbols = source_db_cursor.execute("SELECT * FROM symbol WHERE id>115")
-        target_db_cursor.executemany(
-            "INSERT OR REPLACE INTO symbol VALUES (?,?,?,?)", custom_symbols
+def merge_style_tables(
+    target_db: sqlite3.Connection, conflict_policy: str = "rename"
+) -> StyleMergeSummary:
+    """Merges the entries, tags, tag relations and smart groups of the attached source database.
+
+    The target's entries of each table are indexed by name and a hash of their XML definition.
+    Source entries that are identical to a target entry are skipped, so repeated merges of the same
+    library write nothing. A source entry whose name is taken by a different target entry is a
+    conflict. Depending on conflict_policy, it is imported under a new name, e.g. "Roads (1)", or
+    only reported. A conflicting entry that was imported under a new name before is recognized by
+    its hash and skipped.
+
+    Tables that do not exist in both databases, e.g. because one was created by an older QGIS
+    version, are skipped.
+
+    Args:
+        target_db (sqlite3.Connection): Connection to the target database with the source database
+            attached as "source"
+        conflict_policy (str): "rename" or "report"
+
+    Returns:
+        StyleMergeSummary: Imported, unchanged, renamed and conflicting entries
+    """
+    summary = StyleMergeSummary()
+    common_tables = get_table_names(target_db, "main") & get_table_names(
+        target_db, "source"
+    )
+    # which target entry each source entry ended up as, for remapping the tag relations
+    target_db.execute(
+        "CREATE TEMP TABLE style_import_plan "
+        "(entry_table TEXT, source_id INTEGER, target_name TEXT, is_new INTEGER)"
+    )
+
+    for table in STYLE_ENTRY_TABLES:
+        if table not in common_tables:
+            continue
+        plan = plan_entry_import(target_db, table, conflict_policy, summary)
+        target_db.executemany(
+            "INSERT INTO temp.style_import_plan VALUES (?, ?, ?, ?)",
+            [(table, *planned_entry) for planned_entry in plan],
+        )
+        target_db.execute(
+            f"""
+            INSERT INTO main.{table} (name, xml, favorite)
+            SELECT plan.target_name, s.xml, s.favorite
+            FROM temp.style_import_plan plan
+            JOIN source.{table} s ON s.id = plan.source_id
+            WHERE plan.entry_table = ? AND plan.is_new
+            """,
+            (table,),
         )
 
-        source_db.commit()
-        target_db.commit()
+    if "tag" in common_tables:
+        target_db.execute(
+            """
+            INSERT INTO main.tag (name)
+            SELECT DISTINCT name FROM source.tag s
+            WHERE NOT EXISTS (SELECT 1 FROM main.tag t WHERE t.name = s.name)
+            """
+        )
+        for table, (tagmap_table, id_column) in STYLE_ENTRY_TABLES.items():
+            if table not in common_tables or tagmap_table not in common_tables:
+                continue
+            # remaps the source's tag and entry ids to the target's
+            target_db.execute(
+                f"""
+                INSERT INTO main.{tagmap_table} (tag_id, {id_column})
+                SELECT DISTINCT target_tag.id, target_entry.id
+                FROM source.{tagmap_table} source_tagmap
+                JOIN source.tag source_tag ON source_tag.id = source_tagmap.tag_id
+                JOIN main.tag target_tag ON target_tag.id = (
+                    SELECT MIN(id) FROM main.tag WHERE name = source_tag.name
+                )
+                JOIN temp.style_import_plan plan
+                    ON plan.entry_table = ? AND plan.source_id = source_tagmap.{id_column}
+                JOIN main.{table} target_entry ON target_entry.name = plan.target_name
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM main.{tagmap_table} existing
+                    WHERE existing.tag_id = target_tag.id
+                    AND existing.{id_column} = target_entry.id
+                )
+                """,
+                (table,),
+            )
 
-        source_db.close()
-        target_db.close()
-    except sqlite3.Error as e:
-        error = f"{type(e)}: {str(e)}"
-        QgsMessageLog.logMessage(error, "Profile Manager", level=Qgis.Warning)
-        return error
+    target_db.execute("DROP TABLE temp.style_import_plan")
+
+    if "smartgroup" in common_tables:
+        # smart group conditions refer to tags by name, so they need no remapping
+        target_db.execute(
+            """
+            INSERT INTO main.smartgroup (name, xml)
+            SELECT name, xml FROM source.smartgroup s
+            WHERE NOT EXISTS (SELECT 1 FROM main.smartgroup t WHERE t.name = s.name)
+            """
+        )
+
+    return summary
+
+
+def plan_entry_import(
+    target_db: sqlite3.Connection,
+    table: str,
+    conflict_policy: str,
+    summary: StyleMergeSummary,
+) -> list[tuple[int, str, bool]]:
+    """Decides for each entry of a source style table if and under which name it is imported.
+
+    Args:
+        target_db (sqlite3.Connection): Target database with the source database attached
+        table (str): Name of the style table
+        conflict_policy (str): "rename" or "report"
+        summary (StyleMergeSummary): Summary to add the decisions to
+
+    Returns:
+        list[tuple[int, str, bool]]: Source id, name in the target and if it has to be inserted, for
+            each source entry that is imported or already exists in the target
+    """
+    hashes_by_name = {}
+    names_by_hash = defaultdict(set)
+    for name, xml in target_db.execute(f"SELECT name, xml FROM main.{table}"):
+        xml_hash = get_xml_hash(xml)
+        hashes_by_name[name] = xml_hash
+        names_by_hash[xml_hash].add(name)
+
+    source_entries = target_db.execute(
+        f"SELECT id, name, xml FROM source.{table}"
+    ).fetchall()
+    # a new name must not be taken in the target or by another source entry, which might be imported
+    # under its own name
+    used_names = set(hashes_by_name)
+    used_names.update(name for _, name, _ in source_entries)
+
+    plan = []
+    for source_id, name, xml in source_entries:
+        xml_hash = get_xml_hash(xml)
+        if name not in hashes_by_name:
+            plan.append((source_id, name, True))
+            summary.imported.append(f"{table}: {name}")
+        elif hashes_by_name[name] == xml_hash:
+            plan.append((source_id, name, False))
+            summary.unchanged.append(f"{table}: {name}")
+        else:
+            renamed_pattern = re.compile(re.escape(name) + r" \(\d+\)")
+            previously_renamed = [
+                existing_name
+                for existing_name in names_by_hash[xml_hash]
+                if renamed_pattern.fullmatch(existing_name)
+            ]
+            if previously_renamed:
+                plan.append((source_id, previously_renamed[0], False))
+                summary.unchanged.append(f"{table}: {name}")
+            elif conflict_policy == "rename":
+                new_name = get_unused_name(name, used_names)
+                used_names.add(new_name)
+                names_by_hash[xml_hash].add(new_name)
+                plan.append((source_id, new_name, True))
+                summary.renamed.append(f"{table}: {name} -> {new_name}")
+            else:
+                summary.conflicts.append(f"{table}: {name}")
+    return plan
+
+
+def get_unused_name(name: str, used_names) -> str:
+    """Returns the name suffixed by the first number in parentheses that makes it unused"""
+    number = 1
+    while f"{name} ({number})" in used_names:
+        number += 1
+    return f"{name} ({number})"
+
+
+def get_xml_hash(xml: str) -> str:
+    """Returns a hash of an entry's XML definition, ignoring differences only in formatting.
+
+    The hash is computed from the canonical XML, so the order of attributes and whitespace between
+    elements do not matter. Definitions that are not valid XML are hashed as they are.
+    """
+    try:
+        xml = et.canonicalize(xml, strip_text=True) if xml else ""
+    except et.Error:
+        pass
+    return sha256(xml.encode("utf-8")).hexdigest()
+
+
+def get_table_names(db: sqlite3.Connection, schema: str) -> set[str]:
+    """Returns the names of the tables in a schema of a database connection"""
+    return {
+        row[0]
+        for row in db.execute(
+            f"SELECT name FROM {schema}.sqlite_master WHERE type = 'table'"
+        )
+    }
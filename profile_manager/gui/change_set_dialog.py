@@ -0,0 +1,116 @@
+from qgis.PyQt.QtWidgets import (
+    QCheckBox,
+    QDialog,
+    QDialogButtonBox,
+    QLabel,
+    QTreeWidget,
+    QTreeWidgetItem,
+    QVBoxLayout,
+)
+
+from profile_manager.datasources.dataservices.change_set import (
+    ADDED,
+    CHANGE_ACTIONS,
+    CONFLICT,
+    MISSING,
+    OVERWRITTEN,
+    REMOVED,
+    RENAMED,
+    UNCHANGED,
+    ChangeSet,
+)
+
+
+class ChangeSetDialog(QDialog):
+    """Dialog previewing the changes of an import or removal, to be confirmed before applying"""
+
+    def __init__(
+        self, change_set: ChangeSet, title: str, apply_text: str, *args, **kwargs
+    ):
+        """Sets up the dialog listing the changes by category
+
+        Args:
+            change_set (ChangeSet): Changes to preview
+            title (str): Title of the dialog
+            apply_text (str): Text of the button applying the changes
+        """
+        super().__init__(*args, **kwargs)
+        self.setWindowTitle(title)
+        self.resize(600, 500)
+        self.change_set = change_set
+        self.action_labels = {
+            ADDED: self.tr("Added"),
+            OVERWRITTEN: self.tr("Overwritten"),
+            RENAMED: self.tr("Renamed"),
+            REMOVED: self.tr("Removed"),
+            CONFLICT: self.tr("Not changed, conflict"),
+            MISSING: self.tr("Not found"),
+            UNCHANGED: self.tr("Unchanged"),
+        }
+
+        self.summary_label = QLabel(self.get_summary())
+        self.summary_label.setWordWrap(True)
+
+        self.change_tree = QTreeWidget()
+        self.change_tree.setHeaderLabels([self.tr("Item"), self.tr("Change")])
+        self.change_tree.setColumnWidth(0, 400)
+
+        self.unchanged_check = QCheckBox(self.tr("Show unchanged items"))
+        self.unchanged_check.toggled.connect(self.populate_change_tree)
+
+        self.button_box = QDialogButtonBox(
+            QDialogButtonBox.Ok | QDialogButtonBox.Cancel
+        )
+        self.button_box.button(QDialogButtonBox.Ok).setText(apply_text)
+        self.button_box.accepted.connect(self.accept)
+        self.button_box.rejected.connect(self.reject)
+
+        self.layout = QVBoxLayout()
+        self.layout.addWidget(self.summary_label)
+        self.layout.addWidget(self.change_tree)
+        self.layout.addWidget(self.unchanged_check)
+        if change_set.error_messages:
+            error_label = QLabel("\n\n".join(change_set.error_messages))
+            error_label.setWordWrap(True)
+            error_label.setStyleSheet("color: red")
+            self.layout.addWidget(error_label)
+        self.layout.addWidget(self.button_box)
+        self.setLayout(self.layout)
+
+        self.populate_change_tree()
+
+    def get_summary(self) -> str:
+        """Returns the number of changes per action, e.g. "3 added, 1 overwritten" """
+        counts = [
+            f"{self.change_set.count(action)} {self.action_labels[action].lower()}"
+            for action in CHANGE_ACTIONS
+            if self.change_set.count(action)
+        ]
+        if not counts:
+            return self.tr("Nothing to change.")
+        return ", ".join(counts)
+
+    def populate_change_tree(self):
+        """Lists the changes by category in CHANGE_ACTIONS order, unchanged ones only if checked"""
+        self.change_tree.clear()
+        show_unchanged = self.unchanged_check.isChecked()
+        category_items = {}
+        for change in sorted(
+            self.change_set.changes,
+            key=lambda change: CHANGE_ACTIONS.index(change.action),
+        ):
+            if change.action == UNCHANGED and not show_unchanged:
+                continue
+            category_item = category_items.get(change.category)
+            if category_item is None:
+                category_item = QTreeWidgetItem([change.category])
+                category_items[change.category] = category_item
+                self.change_tree.addTopLevelItem(category_item)
+            QTreeWidgetItem(
+                category_item, [change.item, self.action_labels[change.action]]
+            )
+        for category_item in category_items.values():
+            category_item.setText(
+                1, self.tr("{} item(s)").format(category_item.childCount())
+            )
+            category_item.setExpanded(category_item.childCount() <= 50)
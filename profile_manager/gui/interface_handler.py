@@ -5,10 +5,10 @@ from qgis.PyQt.QtCore import Qt, QVariant
 from qgis.PyQt.QtGui import QIcon
 from qgis.PyQt.QtWidgets import QDialog, QListWidgetItem
 
-from profile_manager.datasources.dataservices.datasource_provider import (
-    DATA_SOURCE_SEARCH_LOCATIONS,
-    get_data_sources_tree,
+from profile_manager.datasources.dataservices.datasource_tree_model import (
+    DataSourceTreeModel,
 )
+from profile_manager.utils import adjust_to_operating_system
 
 
 class InterfaceHandler(QDialog):
@@ -20,6 +20,11 @@ class InterfaceHandler(QDialog):
         self.dlg = profile_manager_dialog
         self.checked = False
 
+        self.source_tree_model = DataSourceTreeModel(True, self.dlg)
+        self.target_tree_model = DataSourceTreeModel(False, self.dlg)
+        self.dlg.treeViewSource.setModel(self.source_tree_model)
+        self.dlg.treeViewTarget.setModel(self.target_tree_model)
+
     def populate_data_source_tree(self, profile_name, populating_source_profile):
         """Populates the chosen profile's data source tree.
 
@@ -38,35 +43,40 @@ class InterfaceHandler(QDialog):
         else:
             target_ini_path = ini_paths["target"]
 
-        # collect data source tree items from ini file
-        data_source_list = []
-        for provider in DATA_SOURCE_SEARCH_LOCATIONS.keys():
-            tree_root_item = get_data_sources_tree(
-                target_ini_path, provider, make_checkable=populating_source_profile
+        # parse the ini file once (if changed) and share it with the import/removal of data sources
+        snapshot = self.profile_manager.scan_cache.get_snapshot(target_ini_path)
+        self.profile_manager.data_source_handler.set_snapshot(
+            snapshot, populating_source_profile
+        )
+
+        # populate tree
+        if populating_source_profile:
+            self.source_tree_model.populate(
+                snapshot, self.tr("Source Profile: {}").format(profile_name)
+            )
+        else:
+            self.target_tree_model.populate(
+                snapshot, self.tr("Target Profile: {}").format(profile_name)
             )
-            if tree_root_item:
-                data_source_list.append(tree_root_item)
         QgsMessageLog.logMessage(
             f"Scanning profile '{profile_name}' for data source connections: Done!",
             "Profile Manager",
             Qgis.Info,
         )
 
-        # populate tree
         if populating_source_profile:
-            self.dlg.treeWidgetSource.clear()
-            self.dlg.treeWidgetSource.setHeaderLabel(
-                self.tr("Source Profile: {}").format(profile_name)
+            bookmark_file = adjust_to_operating_system(
+                f"{self.profile_manager.qgis_profiles_path}/{profile_name}/bookmarks.xml"
             )
-            for tree_root_item in data_source_list:
-                self.dlg.treeWidgetSource.addTopLevelItem(tree_root_item)
-        else:
-            self.dlg.treeWidgetTarget.clear()
-            self.dlg.treeWidgetTarget.setHeaderLabel(
-                self.tr("Target Profile: {}").format(profile_name)
+            bookmark_count = self.profile_manager.scan_cache.get_bookmark_count(
+                bookmark_file
+            )
+            self.dlg.bookmark_check.setToolTip(
+                self.tr("{} bookmark(s) in source profile").format(bookmark_count)
+            )
+            self.profile_manager.data_source_handler.bookmark_displayer.populate_bookmark_filter(
+                bookmark_file
             )
-            for tree_root_item in data_source_list:
-                self.dlg.treeWidgetTarget.addTopLevelItem(tree_root_item)
 
     def populate_profile_listings(self):
         """Populates the main list as well as the comboboxes with available profile names.
@@ -117,6 +127,15 @@ class InterfaceHandler(QDialog):
         self.dlg.importButton.clicked.connect(
             self.profile_manager.import_action_handler
         )
+        self.dlg.importRecipeButton.clicked.connect(
+            self.profile_manager.import_recipe_action_handler
+        )
+        self.dlg.saveRecipeButton.clicked.connect(
+            self.profile_manager.save_recipe_action_handler
+        )
+        self.dlg.compareProfilesButton.clicked.connect(
+            self.profile_manager.compare_profiles_action_handler
+        )
         self.dlg.closeDialog.rejected.connect(self.dlg.close)
         self.dlg.createProfileButton.clicked.connect(
             self.profile_manager.profile_manager_action_handler.create_new_profile
@@ -124,6 +143,9 @@ class InterfaceHandler(QDialog):
         self.dlg.removeProfileButton.clicked.connect(
             self.profile_manager.profile_manager_action_handler.remove_profile
         )
+        self.dlg.inventoryButton.clicked.connect(
+            self.profile_manager.inventory_action_handler
+        )
         self.dlg.removeSourcesButton.clicked.connect(
             self.profile_manager.remove_source_action_handler
         )
@@ -133,9 +155,28 @@ class InterfaceHandler(QDialog):
         self.dlg.copyProfileButton.clicked.connect(
             self.profile_manager.profile_manager_action_handler.copy_profile
         )
+        self.dlg.cancelTaskButton.clicked.connect(self.profile_manager.cancel_task)
+        self.dlg.cancelTaskButton.clicked.connect(
+            lambda: self.dlg.cancelTaskButton.setEnabled(False)
+        )
 
         # checkbox
         self.dlg.checkBox_checkAll.stateChanged.connect(self.check_everything)
+        self.dlg.bookmark_check.toggled.connect(self.dlg.bookmarkFilterGroup.setEnabled)
+
+        # plugin filter
+        self.dlg.pluginFilterEdit.textChanged.connect(
+            self.profile_manager.data_source_handler.plugin_handler.plugin_displayer.set_filter_text
+        )
+
+        # bookmark filter
+        bookmark_displayer = self.profile_manager.data_source_handler.bookmark_displayer
+        self.dlg.bookmarkGroupList.itemChanged.connect(
+            bookmark_displayer.update_preview
+        )
+        self.dlg.bookmarkExtentEdit.editingFinished.connect(
+            bookmark_displayer.update_preview
+        )
 
         # selections/indexes
         self.dlg.comboBoxNamesSource.currentIndexChanged.connect(
@@ -154,20 +195,48 @@ class InterfaceHandler(QDialog):
             self.conditionally_enable_profile_buttons
         )
 
+    def show_task(self, description: str):
+        """Shows the progress bar for a running task and disables the dialog's tabs meanwhile"""
+        self.dlg.tabWidget.setEnabled(False)
+        self.dlg.taskProgressBar.setValue(0)
+        self.dlg.taskProgressBar.setFormat(description)
+        self.dlg.taskProgressBar.setVisible(True)
+        self.dlg.cancelTaskButton.setEnabled(True)
+        self.dlg.cancelTaskButton.setVisible(True)
+
+    def show_task_progress(
+        self, bytes_done: int, bytes_total: int, items_done: int, items_total: int
+    ):
+        """Shows the progress of the running task in bytes and items"""
+        if bytes_total:
+            self.dlg.taskProgressBar.setValue(int(100 * bytes_done / bytes_total))
+        elif items_total:
+            self.dlg.taskProgressBar.setValue(int(100 * items_done / items_total))
+        self.dlg.taskProgressBar.setFormat(
+            self.tr("%p% ({0} of {1} items, {2:.1f} of {3:.1f} MB)").format(
+                items_done,
+                items_total,
+                bytes_done / (1024 * 1024),
+                bytes_total / (1024 * 1024),
+            )
+        )
+
+    def hide_task(self):
+        """Hides the progress bar of the finished task and enables the dialog's tabs"""
+        self.dlg.taskProgressBar.setVisible(False)
+        self.dlg.cancelTaskButton.setVisible(False)
+        self.dlg.tabWidget.setEnabled(True)
+
     def check_everything(self):
         """Checks/Unchecks every checkbox in the gui"""
         if self.checked:
             self.uncheck_everything()
         else:
-            for item in self.dlg.treeWidgetSource.findItems(
-                "", Qt.MatchContains | Qt.MatchRecursive
-            ):
-                item.setCheckState(0, Qt.Checked)
+            self.source_tree_model.set_all_checked(True)
 
-            for item in self.dlg.list_plugins.findItems(
-                "", Qt.MatchContains | Qt.MatchRecursive
-            ):
-                item.setCheckState(Qt.Checked)
+            self.profile_manager.data_source_handler.plugin_handler.set_all_plugins_checked(
+                True
+            )
 
             self.dlg.bookmark_check.setCheckState(Qt.Checked)
             self.dlg.favourites_check.setCheckState(Qt.Checked)
@@ -190,13 +259,11 @@ class InterfaceHandler(QDialog):
         self.dlg.ui_check.setChecked(Qt.Unchecked)
         self.dlg.checkBox_checkAll.setChecked(Qt.Unchecked)
 
-        for item in self.dlg.treeWidgetSource.findItems(
-            "", Qt.MatchContains | Qt.MatchRecursive
-        ):
-            item.setCheckState(0, Qt.Unchecked)
+        self.source_tree_model.set_all_checked(False)
 
-        for iterator in range(self.dlg.list_plugins.count()):
-            self.dlg.list_plugins.item(iterator).setCheckState(Qt.Unchecked)
+        self.profile_manager.data_source_handler.plugin_handler.set_all_plugins_checked(
+            False
+        )
 
     def conditionally_enable_import_button(self):
         """Sets up buttons of the Import tab so that the user is not tempted to do "impossible" things.
@@ -0,0 +1,118 @@
+from qgis.PyQt.QtWidgets import (
+    QComboBox,
+    QDialog,
+    QDialogButtonBox,
+    QHBoxLayout,
+    QLabel,
+    QLineEdit,
+    QTableWidget,
+    QTableWidgetItem,
+    QVBoxLayout,
+)
+
+from profile_manager.profiles.profile_inventory import (
+    INVENTORY_TABLES,
+    ProfileInventory,
+)
+
+# Maximum number of rows shown, more specific searches are needed to see the others
+MAX_SHOWN_ROWS = 1000
+
+
+class InventoryDialog(QDialog):
+    """A dialog searching the connections, plugins, bookmarks and styles of all profiles."""
+
+    def __init__(self, inventory_file: str, *args, **kwargs):
+        """Sets up the dialog showing all connections
+
+        Args:
+            inventory_file (str): Path to the SQLite file of a refreshed inventory
+
+        Raises:
+            sqlite3.Error: If the inventory could not be opened
+        """
+        super().__init__(*args, **kwargs)
+        self.setWindowTitle(self.tr("Search All Profiles"))
+        self.resize(800, 500)
+        self.inventory = ProfileInventory(inventory_file)
+        self.finished.connect(self.inventory.close)
+
+        self.column_labels = {
+            "profile": self.tr("Profile"),
+            "provider": self.tr("Provider"),
+            "name": self.tr("Name"),
+            "setting": self.tr("Setting"),
+            "value": self.tr("Value"),
+            "version": self.tr("Version"),
+            "active": self.tr("Active"),
+            "group_name": self.tr("Group"),
+            "extent": self.tr("Extent"),
+            "entry_type": self.tr("Type"),
+        }
+
+        self.table_combo = QComboBox()
+        for table, label in (
+            ("connection", self.tr("Data source connections")),
+            ("plugin", self.tr("Plugins")),
+            ("bookmark", self.tr("Bookmarks")),
+            ("style", self.tr("Styles")),
+        ):
+            self.table_combo.addItem(label, table)
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText(
+            self.tr("Search, e.g. a host name or plugin name")
+        )
+        self.search_edit.setClearButtonEnabled(True)
+
+        self.result_table = QTableWidget()
+        self.result_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.result_table.setSortingEnabled(True)
+        self.result_label = QLabel()
+
+        self.button_box = QDialogButtonBox(QDialogButtonBox.Close)
+        self.button_box.rejected.connect(self.reject)
+
+        search_layout = QHBoxLayout()
+        search_layout.addWidget(self.table_combo)
+        search_layout.addWidget(self.search_edit)
+        self.layout = QVBoxLayout()
+        self.layout.addLayout(search_layout)
+        self.layout.addWidget(self.result_table)
+        self.layout.addWidget(self.result_label)
+        self.layout.addWidget(self.button_box)
+        self.setLayout(self.layout)
+
+        self.table_combo.currentIndexChanged.connect(self.update_results)
+        self.search_edit.textChanged.connect(self.update_results)
+        self.update_results()
+
+    def update_results(self):
+        """Shows the rows of the chosen table matching the search text"""
+        table = self.table_combo.currentData()
+        text = self.search_edit.text()
+        columns = INVENTORY_TABLES[table]
+        rows = self.inventory.search(table, text, MAX_SHOWN_ROWS)
+
+        self.result_table.setSortingEnabled(False)
+        self.result_table.clear()
+        self.result_table.setColumnCount(len(columns))
+        self.result_table.setHorizontalHeaderLabels(
+            [self.column_labels[column] for column in columns]
+        )
+        self.result_table.setRowCount(len(rows))
+        for row_number, row in enumerate(rows):
+            for column_number, value in enumerate(row):
+                self.result_table.setItem(
+                    row_number, column_number, QTableWidgetItem(str(value))
+                )
+        self.result_table.setSortingEnabled(True)
+        self.result_table.resizeColumnsToContents()
+
+        if len(rows) < MAX_SHOWN_ROWS:
+            self.result_label.setText(self.tr("{} result(s)").format(len(rows)))
+        else:
+            self.result_label.setText(
+                self.tr("Showing {0} of {1} results, refine the search").format(
+                    len(rows), self.inventory.count(table, text)
+                )
+            )
@@ -0,0 +1,122 @@
+from qgis.PyQt.QtWidgets import (
+    QDialog,
+    QDialogButtonBox,
+    QFileDialog,
+    QLabel,
+    QMessageBox,
+    QTreeWidget,
+    QTreeWidgetItem,
+    QVBoxLayout,
+)
+
+from profile_manager.datasources.dataservices.profile_diff import (
+    DIFF_CATEGORIES,
+    ProfileDiff,
+)
+
+
+class ProfileDiffDialog(QDialog):
+    """A dialog listing the differences of two profiles by category, exportable as JSON."""
+
+    def __init__(
+        self, profile_diff: ProfileDiff, name_a: str, name_b: str, *args, **kwargs
+    ):
+        """Sets up the dialog listing the differences
+
+        Args:
+            profile_diff (ProfileDiff): Differences of the two profiles
+            name_a (str): Name of the first profile
+            name_b (str): Name of the second profile
+        """
+        super().__init__(*args, **kwargs)
+        self.setWindowTitle(self.tr("Compare Profiles"))
+        self.resize(600, 500)
+        self.profile_diff = profile_diff
+        self.category_labels = {
+            "connections": self.tr("Data source connections"),
+            "plugins": self.tr("Plugins"),
+            "favourites": self.tr("Favourites"),
+            "functions": self.tr("Expression functions"),
+            "bookmarks": self.tr("Bookmarks"),
+            "styles": self.tr("Styles"),
+            "models": self.tr("Models"),
+            "scripts": self.tr("Scripts"),
+        }
+
+        if profile_diff.count():
+            summary = self.tr("{0} difference(s) between '{1}' and '{2}'").format(
+                profile_diff.count(), name_a, name_b
+            )
+        else:
+            summary = self.tr("'{0}' and '{1}' do not differ").format(name_a, name_b)
+        self.summary_label = QLabel(summary)
+        self.summary_label.setWordWrap(True)
+
+        self.diff_tree = QTreeWidget()
+        self.diff_tree.setHeaderLabels([self.tr("Item"), name_a, name_b])
+        self.diff_tree.setColumnWidth(0, 300)
+        self.populate_diff_tree()
+
+        self.button_box = QDialogButtonBox(QDialogButtonBox.Close)
+        export_button = self.button_box.addButton(
+            self.tr("Export JSON..."), QDialogButtonBox.ActionRole
+        )
+        export_button.clicked.connect(self.export_json)
+        self.button_box.rejected.connect(self.reject)
+
+        self.layout = QVBoxLayout()
+        self.layout.addWidget(self.summary_label)
+        self.layout.addWidget(self.diff_tree)
+        self.layout.addWidget(self.button_box)
+        self.setLayout(self.layout)
+
+    def populate_diff_tree(self):
+        """Lists the differing items of each category with their details, e.g. plugin versions"""
+        for category in DIFF_CATEGORIES:
+            category_diff = self.profile_diff.categories[category]
+            category_item = QTreeWidgetItem(
+                [
+                    self.tr("{0} ({1} different, {2} equal)").format(
+                        self.category_labels[category],
+                        category_diff.count(),
+                        category_diff.unchanged,
+                    )
+                ]
+            )
+            self.diff_tree.addTopLevelItem(category_item)
+            for item, detail in category_diff.only_in_a.items():
+                QTreeWidgetItem(
+                    category_item,
+                    [item, detail or self.tr("present"), self.tr("missing")],
+                )
+            for item, detail in category_diff.only_in_b.items():
+                QTreeWidgetItem(
+                    category_item,
+                    [item, self.tr("missing"), detail or self.tr("present")],
+                )
+            for item, (detail_a, detail_b) in category_diff.changed.items():
+                QTreeWidgetItem(
+                    category_item,
+                    [
+                        item,
+                        detail_a or self.tr("differs"),
+                        detail_b or self.tr("differs"),
+                    ],
+                )
+            category_item.setExpanded(0 < category_diff.count() <= 50)
+
+    def export_json(self):
+        """Asks for a file and writes the differences to it as JSON"""
+        json_file, _ = QFileDialog.getSaveFileName(
+            self, self.tr("Export JSON"), "", self.tr("JSON (*.json)")
+        )
+        if not json_file:
+            return
+        try:
+            self.profile_diff.save_json(json_file)
+        except OSError as e:
+            QMessageBox.critical(
+                self,
+                self.tr("Export JSON"),
+                self.tr("The differences could not be exported:\n{}").format(e),
+            )
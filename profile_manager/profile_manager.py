@@ -22,34 +22,65 @@
 """
 
 # Import the code for the dialog
-import time
-from collections import defaultdict
+import sqlite3
 from os import path
-from pathlib import Path
-from shutil import copytree
 from sys import platform
 
 # PyQGIS
-from qgis.core import Qgis, QgsMessageLog, QgsUserProfileManager
-from qgis.PyQt.QtCore import (
-    QCoreApplication,
-    QLocale,
-    QSettings,
-    QSize,
-    Qt,
-    QTranslator,
+from qgis.core import (
+    Qgis,
+    QgsApplication,
+    QgsMessageLog,
+    QgsTask,
+    QgsUserProfileManager,
 )
+from qgis.PyQt.QtCore import QCoreApplication, QLocale, QSettings, QSize, QTranslator
 from qgis.PyQt.QtGui import QIcon
-from qgis.PyQt.QtWidgets import QAction, QMessageBox, QWidget
+from qgis.PyQt.QtWidgets import QAction, QDialog, QFileDialog, QMessageBox, QWidget
 
 # plugin
+from profile_manager.backups.backup_archive import create_backup_archive
+from profile_manager.backups.backup_creator import create_backup
+from profile_manager.backups.backup_retention import prune_backups
+from profile_manager.backups.backup_settings import get_backup_setting
+from profile_manager.datasources.dataservices.change_set import (
+    ChangeSet,
+    ChangeSetOutdated,
+    compute_import_change_set,
+    compute_removal_change_set,
+)
 from profile_manager.datasources.dataservices.datasource_handler import (
     DataSourceHandler,
+    DataSourceSelection,
+    split_checked_sources,
+)
+from profile_manager.datasources.dataservices.import_plan import (
+    create_recipe,
+    save_recipe,
 )
+from profile_manager.datasources.dataservices.profile_diff import diff_profiles
+from profile_manager.datasources.dataservices.scan_cache import ScanCache
+from profile_manager.gui.change_set_dialog import ChangeSetDialog
 from profile_manager.gui.interface_handler import InterfaceHandler
+from profile_manager.gui.inventory_dialog import InventoryDialog
+from profile_manager.gui.profile_diff_dialog import ProfileDiffDialog
 from profile_manager.profile_manager_dialog import ProfileManagerDialog
 from profile_manager.profiles.profile_action_handler import ProfileActionHandler
-from profile_manager.utils import adjust_to_operating_system, wait_cursor
+from profile_manager.tasks.datasource_tasks import (
+    ChangeSetTask,
+    ImportTask,
+    RemoveDataSourcesTask,
+)
+from profile_manager.tasks.operation_task import OperationTask
+from profile_manager.tasks.profile_tasks import RefreshInventoryTask
+from profile_manager.utils import (
+    get_backup_path,
+    get_inventory_path,
+    get_profile_ini_path,
+    get_profile_path,
+    get_qgis_profiles_path,
+    wait_cursor,
+)
 
 
 class ProfileManager:
@@ -73,6 +104,10 @@ class ProfileManager:
         self.qgs_profile_manager = (
             None  # TODO in QGIS 3.30 we could and should use iface.userProfileManager()
         )
+        self.scan_cache: ScanCache = None
+        self.prune_task: QgsTask = None
+        self.current_task: OperationTask = None
+        self.running_tasks: list[OperationTask] = []
         self.data_source_handler: DataSourceHandler = None
         self.profile_manager_action_handler: ProfileActionHandler = None
         self.interface_handler: InterfaceHandler = None
@@ -225,6 +260,7 @@ class ProfileManager:
                 self.qgs_profile_manager = QgsUserProfileManager(
                     self.qgis_profiles_path
                 )
+                self.scan_cache = ScanCache(self.dlg)
                 self.data_source_handler = DataSourceHandler(self.dlg, self)
                 self.profile_manager_action_handler = ProfileActionHandler(
                     self.dlg, self.qgis_profiles_path, self
@@ -251,68 +287,157 @@ class ProfileManager:
 
     def set_paths(self):
         """Sets various OS and profile dependent paths"""
-        home_path = Path.home()
+        self.qgis_profiles_path = get_qgis_profiles_path()
+        self.ini_path = get_profile_ini_path(
+            self.qgis_profiles_path, self.dlg.comboBoxNamesSource.currentText()
+        )
         if platform.startswith("win32"):
-            self.qgis_profiles_path = (
-                f"{home_path}/AppData/Roaming/QGIS/QGIS3/profiles".replace("\\", "/")
-            )
-            self.ini_path = (
-                self.qgis_profiles_path
-                + "/"
-                + self.dlg.comboBoxNamesSource.currentText()
-                + "/QGIS/QGIS3.ini"
-            )
             self.operating_system = "windows"
         elif platform == "darwin":
-            self.qgis_profiles_path = (
-                f"{home_path}/Library/Application Support/QGIS/QGIS3/profiles"
-            )
-            self.ini_path = (
-                self.qgis_profiles_path
-                + "/"
-                + self.dlg.comboBoxNamesSource.currentText()
-                + "/qgis.org/QGIS3.ini"
-            )
             self.operating_system = "mac"
         else:
-            self.qgis_profiles_path = f"{home_path}/.local/share/QGIS/QGIS3/profiles"
-            self.ini_path = (
-                self.qgis_profiles_path
-                + "/"
-                + self.dlg.comboBoxNamesSource.currentText()
-                + "/QGIS/QGIS3.ini"
-            )
             self.operating_system = "unix"
 
-        self.backup_path = adjust_to_operating_system(
-            str(Path.home()) + "/QGIS Profile Manager Backup/"
-        )
+        self.backup_path = get_backup_path()
+
+    def prepare_backup(self, profile: str, paths_to_back_up: list[str] = None):
+        """Returns a function creating a backup of the specified profile, to be called by a
+        background task.
 
-    def make_backup(self, profile: str):
-        """Creates a backup of the specified profile.
+        The backup settings are read here, on the GUI thread. Unless disabled in the settings, the
+        backup is incremental: files unchanged since the previous backup of the profile are
+        hardlinked instead of copied. If paths are given and scoped backups are enabled in the
+        settings, only these paths are backed up, otherwise the whole profile. If archive backups
+        are enabled in the settings, the backup is a compressed archive.
 
         Args:
             profile (str): Name of the profile to back up
+            paths_to_back_up (list[str]): Paths relative to the profile that are about to be written
 
-        Raises:
-            OSError: If copytree raises something
+        Returns:
+            Callable[[Callable[[], bool]], str]: Takes the task's cancel check and returns the
+                backup's path, None if canceled. Raises OSError if the backup could not be created.
         """
-        ts = int(time.time())
-        target_path = self.backup_path + str(ts)
         source_path = f"{self.qgis_profiles_path}/{profile}"
-        QgsMessageLog.logMessage(
-            f"Backing up profile '{source_path}' to '{target_path}'",
-            "Profile Manager",
-            level=Qgis.Info,
+        backup_path = self.backup_path
+        if not get_backup_setting("scoped"):
+            paths_to_back_up = None
+
+        if get_backup_setting("format") == "archive":
+            return lambda is_canceled: create_backup_archive(
+                source_path,
+                backup_path,
+                profile,
+                paths_to_back_up=paths_to_back_up,
+                is_canceled=is_canceled,
+            )
+
+        incremental = get_backup_setting("incremental")
+        return lambda is_canceled: create_backup(
+            source_path,
+            backup_path,
+            profile,
+            incremental=incremental,
+            paths_to_back_up=paths_to_back_up,
+            is_canceled=is_canceled,
+        )
+
+    def start_task(self, task: OperationTask, finished_callback):
+        """Runs an operation in a background task, showing its progress in the dialog.
+
+        The task is refused with a message while another running task writes to the same profile.
+
+        Args:
+            task (OperationTask): Task to run
+            finished_callback (Callable[[OperationTask], None]): Called on the GUI thread when the
+                task finished
+        """
+        busy_profile_paths = {
+            path.normcase(path.normpath(profile_path))
+            for running_task in self.running_tasks
+            for profile_path in running_task.written_profile_paths
+        }
+        if any(
+            path.normcase(path.normpath(profile_path)) in busy_profile_paths
+            for profile_path in task.written_profile_paths
+        ):
+            QMessageBox.warning(
+                None,
+                task.description(),
+                self.tr(
+                    "Another operation is still writing to the profile. Please wait until it "
+                    "finished or cancel it."
+                ),
+            )
+            return
+
+        self.running_tasks.append(task)
+        self.current_task = task
+        task.progress_reported.connect(self.interface_handler.show_task_progress)
+        task.operation_finished.connect(
+            lambda success, error_messages: self.task_finished(task, finished_callback)
+        )
+        self.interface_handler.show_task(task.description())
+        QgsApplication.taskManager().addTask(task)
+
+    def task_finished(self, task: OperationTask, finished_callback):
+        """Hides the progress of a finished task and hands it to its callback"""
+        self.running_tasks.remove(task)
+        self.current_task = self.running_tasks[-1] if self.running_tasks else None
+        if self.current_task is None:
+            self.interface_handler.hide_task()
+        finished_callback(task)
+        if task.backup:
+            self.start_backup_pruning()
+
+    def cancel_task(self):
+        """Cancels the running task, it cleans up after itself"""
+        if self.current_task is not None:
+            self.current_task.cancel()
+
+    def start_backup_pruning(self):
+        """Removes the backups not covered by the retention settings in a background task.
+
+        Does nothing if pruning is disabled in the settings or a pruning task is still running.
+        """
+        if not get_backup_setting("prune") or self.prune_task is not None:
+            return
+
+        backup_path = self.backup_path
+        keep_last = get_backup_setting("keep_last")
+        keep_daily = get_backup_setting("keep_daily")
+        keep_weekly = get_backup_setting("keep_weekly")
+        max_total_bytes = get_backup_setting("max_total_megabytes") * 1024 * 1024
+        self.prune_task = QgsTask.fromFunction(
+            self.tr("Pruning profile backups"),
+            lambda task: prune_backups(
+                backup_path,
+                keep_last,
+                keep_daily,
+                keep_weekly,
+                max_total_bytes,
+                is_canceled=task.isCanceled,
+            ),
+            on_finished=self.backup_pruning_finished,
         )
-        copytree(source_path, target_path)
+        QgsApplication.taskManager().addTask(self.prune_task)
+
+    def backup_pruning_finished(self, exception, removed_backups=None):
+        """Releases the finished pruning task and logs errors that aborted it"""
+        self.prune_task = None
+        if exception is not None:
+            QgsMessageLog.logMessage(
+                f"Pruning backups failed: {exception}",
+                "Profile Manager",
+                level=Qgis.Warning,
+            )
 
     def import_action_handler(self):
         """Handles data source import
 
-        Aborts and shows an error message if no backup could be made.
+        If enabled, the changes are computed and previewed for confirmation first. The import runs
+        in a background task. It aborts if no backup could be made.
         """
-        error_message = None
         with wait_cursor():
             self.get_checked_sources()
             source_profile_name = self.dlg.comboBoxNamesSource.currentText()
@@ -326,29 +451,109 @@ class ProfileManager:
             self.data_source_handler.set_path_to_bookmark_files(
                 source_profile_name, target_profile_name
             )
-            try:
-                self.make_backup(target_profile_name)
-            except OSError as e:
-                error_message = self.tr("Aborting import due to error:\n{}").format(e)
+            selection = self.data_source_handler.get_selection()
 
-            if error_message:
-                QMessageBox.critical(
-                    None, self.tr("Backup could not be created"), error_message
-                )
-                return
+        extent_error = self.data_source_handler.bookmark_displayer.extent_error
+        if selection.bookmarks and extent_error:
+            QMessageBox.critical(
+                None,
+                self.tr("Import"),
+                self.tr(
+                    "Nothing was imported, the bookmark filter is invalid:\n{}"
+                ).format(extent_error),
+            )
+            return
+        self.start_import(selection, target_profile_name)
 
-        with wait_cursor():
-            self.data_source_handler.import_plugins()
-            errors_on_sources = self.data_source_handler.import_all_the_things()
-            self.update_data_sources(only_update_plugins_for_target_profile=True)
+    def start_import(self, selection: DataSourceSelection, target_profile_name: str):
+        """Imports a selection in a background task, after previewing the changes if enabled
 
-        if errors_on_sources:
+        Args:
+            selection (DataSourceSelection): Profiles and checked items
+            target_profile_name (str): Name of the profile to import into
+        """
+        backup_function = self.prepare_backup(
+            target_profile_name, selection.get_import_write_set()
+        )
+        if not self.dlg.previewChangesCheck.isChecked():
+            self.start_task(
+                ImportTask(selection, backup_function), self.import_finished
+            )
+            return
+
+        self.start_task(
+            ChangeSetTask(selection, compute_import_change_set),
+            lambda task: self.confirm_change_set(
+                task,
+                self.tr("Import Preview"),
+                self.tr("Import"),
+                lambda change_set: self.start_task(
+                    ImportTask(selection, backup_function, change_set),
+                    self.import_finished,
+                ),
+            ),
+        )
+
+    def confirm_change_set(
+        self, task: ChangeSetTask, title: str, apply_text: str, apply_function
+    ):
+        """Previews the computed changes of an import or removal and applies them if confirmed
+
+        Args:
+            task (ChangeSetTask): Finished task that computed the changes
+            title (str): Title of the preview dialog
+            apply_text (str): Text of the button applying the changes
+            apply_function (Callable[[ChangeSet], None]): Starts applying the confirmed changes
+        """
+        if task.isCanceled():
+            return
+        if task.exception is not None:
+            QMessageBox.critical(
+                None,
+                title,
+                self.tr("The changes could not be computed due to error:\n{}").format(
+                    task.exception
+                ),
+            )
+            return
+
+        dialog = ChangeSetDialog(task.change_set, title, apply_text, self.dlg)
+        if dialog.exec() == QDialog.Accepted:
+            apply_function(task.change_set)
+
+    def import_finished(self, task: ImportTask):
+        """Shows the result of a data source import"""
+        if task.isCanceled():
+            QMessageBox.information(
+                None,
+                self.tr("Data Source Import"),
+                self.tr("Import canceled, the target profile has been restored."),
+            )
+        elif isinstance(task.exception, ChangeSetOutdated):
+            QMessageBox.warning(
+                None, self.tr("Data Source Import"), str(task.exception)
+            )
+        elif task.exception is not None and task.backup is None:
+            QMessageBox.critical(
+                None,
+                self.tr("Backup could not be created"),
+                self.tr("Aborting import due to error:\n{}").format(task.exception),
+            )
+        elif task.exception is not None:
             QMessageBox.critical(
                 None,
                 self.tr("Data Source Import"),
                 self.tr(
-                    "There were errors on import."
-                ),  # The user should have been shown dialogs or see a log
+                    "Import failed due to error, the target profile has been restored:\n{}"
+                ).format(task.exception),
+            )
+        elif task.error_messages:
+            QMessageBox.critical(
+                None,
+                self.tr("Data Source Import"),
+                self.tr("There were errors on import:\n\n{}").format(
+                    "\n\n".join(task.error_messages)
+                ),
             )
         else:
             QMessageBox.information(
@@ -359,17 +564,159 @@ class ProfileManager:
                     "Please refresh the QGIS Browser to see the changes."
                 ),
             )
+        self.update_data_sources()
         self.interface_handler.uncheck_everything()
         self.refresh_browser_model()
 
+    def import_recipe_action_handler(self):
+        """Handles importing the items of a recipe into the chosen target profile
+
+        The recipe's compiled import plan is cached until the recipe or its source profile changes.
+        The import runs in a background task like an import of the checked items.
+        """
+        recipe_file, _ = QFileDialog.getOpenFileName(
+            self.dlg,
+            self.tr("Import recipe"),
+            "",
+            self.tr("Recipes (*.json *.toml)"),
+        )
+        if not recipe_file:
+            return
+
+        target_profile_name = self.dlg.comboBoxNamesTarget.currentText()
+        with wait_cursor():
+            try:
+                plan = self.scan_cache.get_import_plan(
+                    recipe_file, self.qgis_profiles_path
+                )
+            except (OSError, ValueError) as e:
+                QMessageBox.critical(
+                    None,
+                    self.tr("Import recipe"),
+                    self.tr("The recipe could not be read:\n{}").format(e),
+                )
+                return
+        if plan.source_profile_name == target_profile_name:
+            QMessageBox.critical(
+                None,
+                self.tr("Import recipe"),
+                self.tr("Target profile can not be same as source profile"),
+            )
+            return
+
+        selection = plan.create_selection(self.qgis_profiles_path, target_profile_name)
+        self.start_import(selection, target_profile_name)
+
+    def save_recipe_action_handler(self):
+        """Handles saving the checked items as a recipe"""
+        recipe_file, _ = QFileDialog.getSaveFileName(
+            self.dlg,
+            self.tr("Save selection as recipe"),
+            "",
+            self.tr("JSON recipes (*.json)"),
+        )
+        if not recipe_file:
+            return
+
+        self.get_checked_sources()
+        source_profile_name = self.dlg.comboBoxNamesSource.currentText()
+        self.data_source_handler.set_path_to_files(
+            source_profile_name, self.dlg.comboBoxNamesTarget.currentText()
+        )
+        recipe = create_recipe(
+            self.data_source_handler.get_selection(), source_profile_name
+        )
+        try:
+            save_recipe(recipe, recipe_file)
+        except OSError as e:
+            QMessageBox.critical(
+                None,
+                self.tr("Save selection as recipe"),
+                self.tr("The recipe could not be saved:\n{}").format(e),
+            )
+
+    def inventory_action_handler(self):
+        """Handles searching all profiles
+
+        The inventory of all profiles is refreshed in a background task, only rescanning what
+        changed, and searched afterwards.
+        """
+        self.start_task(
+            RefreshInventoryTask(
+                get_inventory_path(self.qgis_profiles_path), self.qgis_profiles_path
+            ),
+            self.inventory_refreshed,
+        )
+
+    def inventory_refreshed(self, task: RefreshInventoryTask):
+        """Shows the refreshed inventory for searching"""
+        if task.isCanceled():
+            return
+        if task.exception is not None:
+            QMessageBox.critical(
+                None,
+                self.tr("Search All Profiles"),
+                self.tr("The profile inventory could not be refreshed:\n{}").format(
+                    task.exception
+                ),
+            )
+            return
+        try:
+            inventory_dialog = InventoryDialog(task.inventory_file, self.dlg)
+        except sqlite3.Error as e:
+            QMessageBox.critical(
+                None,
+                self.tr("Search All Profiles"),
+                self.tr("The profile inventory could not be opened:\n{}").format(e),
+            )
+            return
+        inventory_dialog.exec()
+
+    def compare_profiles_action_handler(self):
+        """Handles comparing the source and target profile
+
+        Scan results of unchanged files are reused from the scan cache.
+        """
+        source_profile_name = self.dlg.comboBoxNamesSource.currentText()
+        target_profile_name = self.dlg.comboBoxNamesTarget.currentText()
+        with wait_cursor():
+            profile_diff = diff_profiles(
+                get_profile_path(self.qgis_profiles_path, source_profile_name),
+                get_profile_path(self.qgis_profiles_path, target_profile_name),
+                scan=self.scan_cache.get,
+            )
+        ProfileDiffDialog(
+            profile_diff, source_profile_name, target_profile_name, self.dlg
+        ).exec()
+
     def remove_source_action_handler(self):
         """Handles data source removal
 
-        Aborts and shows an error message if no backup could be made.
+        If enabled, the changes are computed and previewed for confirmation first, otherwise the
+        removal is confirmed by a question. The removal runs in a background task. It aborts if no
+        backup could be made.
         """
         self.get_checked_sources()
         source_profile_name = self.dlg.comboBoxNamesSource.currentText()
         self.data_source_handler.set_path_to_files(source_profile_name, "")
+        selection = self.data_source_handler.get_selection()
+        backup_function = self.prepare_backup(
+            source_profile_name, selection.get_removal_write_set()
+        )
+
+        if self.dlg.previewChangesCheck.isChecked():
+            self.start_task(
+                ChangeSetTask(selection, compute_removal_change_set),
+                lambda task: self.confirm_change_set(
+                    task,
+                    self.tr("Remove Data Sources"),
+                    self.tr("Remove"),
+                    lambda change_set: self.start_removal(
+                        selection, backup_function, change_set
+                    ),
+                ),
+            )
+            return
 
         clicked_button = QMessageBox.question(
             None,
@@ -378,36 +725,73 @@ class ProfileManager:
                 "Are you sure you want to remove these sources?\n\nA backup will be created at '{}'"
             ).format(self.backup_path),
         )
-
         if clicked_button == QMessageBox.Yes:
-            error_message = None
-            with wait_cursor():
-                try:
-                    self.make_backup(source_profile_name)
-                except OSError as e:
-                    error_message = self.tr(
-                        "Aborting removal due to error:\n{}"
-                    ).format(e)
-
-                if not error_message:
-                    self.data_source_handler.remove_datasources_and_plugins()
-                    self.update_data_sources(True)
-
-            if error_message:
-                QMessageBox.critical(
-                    None, self.tr("Backup could not be created"), error_message
-                )
-            else:
-                QMessageBox.information(
-                    None,
-                    self.tr("Data Sources Removed"),
-                    self.tr(
-                        "Data sources have been successfully removed.\n\n"
-                        "Please refresh the QGIS Browser to see the changes."
-                    ),
-                )
-                self.refresh_browser_model()
-                self.interface_handler.uncheck_everything()
+            self.start_removal(selection, backup_function)
+
+    def start_removal(
+        self,
+        selection: DataSourceSelection,
+        backup_function,
+        change_set: ChangeSet = None,
+    ):
+        """Removes a selection in a background task
+
+        Args:
+            selection (DataSourceSelection): Profile and checked items
+            backup_function (Callable[[Callable[[], bool]], str]): Backs up the profile, see
+                prepare_backup
+            change_set (ChangeSet): Confirmed changes of the removal, computed by the task if None
+        """
+        # the snapshot is modified by the removal and must not be reused
+        self.data_source_handler.set_snapshot(None, True)
+        self.scan_cache.invalidate(selection.source_qgis_ini_file)
+
+        self.start_task(
+            RemoveDataSourcesTask(selection, backup_function, change_set),
+            self.remove_sources_finished,
+        )
+
+    def remove_sources_finished(self, task: RemoveDataSourcesTask):
+        """Shows the result of a data source removal"""
+        if task.isCanceled():
+            QMessageBox.information(
+                None,
+                self.tr("Remove Data Sources"),
+                self.tr("Removal canceled, the profile has been restored."),
+            )
+        elif isinstance(task.exception, ChangeSetOutdated):
+            QMessageBox.warning(
+                None, self.tr("Remove Data Sources"), str(task.exception)
+            )
+        elif task.exception is not None and task.backup is None:
+            QMessageBox.critical(
+                None,
+                self.tr("Backup could not be created"),
+                self.tr("Aborting removal due to error:\n{}").format(task.exception),
+            )
+        elif task.exception is not None or task.error_messages:
+            QMessageBox.critical(
+                None,
+                self.tr("Data sources could not be removed"),
+                self.tr("Removal failed due to error:\n{}").format(
+                    "\n\n".join(
+                        task.error_messages
+                        + ([str(task.exception)] if task.exception else [])
+                    )
+                ),
+            )
+        else:
+            QMessageBox.information(
+                None,
+                self.tr("Data Sources Removed"),
+                self.tr(
+                    "Data sources have been successfully removed.\n\n"
+                    "Please refresh the QGIS Browser to see the changes."
+                ),
+            )
+            self.refresh_browser_model()
+            self.interface_handler.uncheck_everything()
+        self.update_data_sources()
 
     def update_data_sources(
         self, only_update_plugins_for_target_profile=False, update_source=True
@@ -432,34 +816,11 @@ class ProfileManager:
         # TODO why is the split between web and db necessary??
         # TODO what titles does QGIS use in the GUI? can we use the same when needed in the plugin?
 
-        checked_web_sources = defaultdict(list)
-        checked_database_sources = defaultdict(list)
-
-        for item in self.dlg.treeWidgetSource.findItems(
-            "", Qt.MatchContains | Qt.MatchRecursive
-        ):
-            if item.childCount() == 0 and item.checkState(0) == Qt.Checked:
-                parent_text = item.parent().text(0)  # the provider group in the tree
-                item_text = item.text(
-                    0
-                )  # a specific data source in the provider's group
-                # FIXME hardcoded list of GUI titles
-                if parent_text in [
-                    "SpatiaLite",
-                    "PostgreSQL",
-                    "MSSQL",
-                    "DB2",
-                    "Oracle",
-                ]:
-                    checked_database_sources[parent_text].append(item_text)
-                # GeoPackage connections are stored under [providers] in the ini
-                elif (
-                    parent_text == "GeoPackage"
-                ):  # FIXME hardcoded relationship between GeoPackage and 'providers'
-                    checked_database_sources["providers"].append(item_text)
-                else:
-                    checked_web_sources[parent_text].append(item_text)
-
+        # the provider groups in the tree and the checked data sources in each provider's group
+        checked_sources = self.interface_handler.source_tree_model.get_checked_sources()
+        checked_web_sources, checked_database_sources = split_checked_sources(
+            checked_sources
+        )
         self.data_source_handler.set_data_sources(
             checked_web_sources, checked_database_sources
         )
@@ -470,53 +831,24 @@ class ProfileManager:
         Returns:
             tuple[str, str]: Path to source profile, path to target profile
         """
-        source = adjust_to_operating_system(
-            self.qgis_profiles_path
-            + "/"
-            + self.dlg.comboBoxNamesSource.currentText()
-            + "/"
+        source = get_profile_path(
+            self.qgis_profiles_path, self.dlg.comboBoxNamesSource.currentText()
         )
-        target = adjust_to_operating_system(
-            self.qgis_profiles_path
-            + "/"
-            + self.dlg.comboBoxNamesTarget.currentText()
-            + "/"
+        target = get_profile_path(
+            self.qgis_profiles_path, self.dlg.comboBoxNamesTarget.currentText()
         )
 
         return source, target
 
     def get_ini_paths(self):
         """Gets path to current chosen source and target qgis.ini file"""
-        if self.operating_system == "mac":
-            ini_path_source = adjust_to_operating_system(
-                self.qgis_profiles_path
-                + "/"
-                + self.dlg.comboBoxNamesSource.currentText()
-                + "/qgis.org/QGIS3.ini"
-            )
-            ini_path_target = adjust_to_operating_system(
-                self.qgis_profiles_path
-                + "/"
-                + self.dlg.comboBoxNamesTarget.currentText()
-                + "/qgis.org/QGIS3.ini"
-            )
-        else:
-            ini_path_source = adjust_to_operating_system(
-                self.qgis_profiles_path
-                + "/"
-                + self.dlg.comboBoxNamesSource.currentText()
-                + "/QGIS/QGIS3.ini"
-            )
-            ini_path_target = adjust_to_operating_system(
-                self.qgis_profiles_path
-                + "/"
-                + self.dlg.comboBoxNamesTarget.currentText()
-                + "/QGIS/QGIS3.ini"
-            )
-
         ini_paths = {
-            "source": ini_path_source,
-            "target": ini_path_target,
+            "source": get_profile_ini_path(
+                self.qgis_profiles_path, self.dlg.comboBoxNamesSource.currentText()
+            ),
+            "target": get_profile_ini_path(
+                self.qgis_profiles_path, self.dlg.comboBoxNamesTarget.currentText()
+            ),
         }
 
         return ini_paths
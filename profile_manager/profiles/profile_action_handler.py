@@ -25,7 +25,9 @@ class ProfileActionHandler(QDialog):
         self.profile_editor = ProfileEditor(
             self.dlg, self.qgis_path, self.profile_manager
         )
-        self.profile_copier = ProfileCopier(self.dlg, self.qgis_path)
+        self.profile_copier = ProfileCopier(
+            self.dlg, self.qgis_path, self.profile_manager
+        )
 
     def create_new_profile(self):
         """Creates a new profile"""
@@ -33,9 +35,8 @@ class ProfileActionHandler(QDialog):
         self.profile_manager.interface_handler.populate_profile_listings()
 
     def copy_profile(self):
-        """Copies the selected profile"""
+        """Copies the selected profile, the listings are updated when done"""
         self.profile_copier.copy_profile()
-        self.profile_manager.interface_handler.populate_profile_listings()
 
     def edit_profile(self):
         """Edits the selected profile"""
@@ -43,6 +44,5 @@ class ProfileActionHandler(QDialog):
         self.profile_manager.interface_handler.populate_profile_listings()
 
     def remove_profile(self):
-        """Removes the selected profile"""
+        """Removes the selected profile, the listings are updated when done"""
         self.profile_remover.remove_profile()
-        self.profile_manager.interface_handler.populate_profile_listings()
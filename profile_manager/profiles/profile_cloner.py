@@ -0,0 +1,98 @@
+import errno
+from os import fstat, path, remove
+from shutil import copy2, copystat
+
+from qgis.core import Qgis, QgsMessageLog
+
+try:
+    from fcntl import ioctl
+except ImportError:  # not available on Windows
+    ioctl = None
+try:
+    from os import copy_file_range
+except ImportError:  # Linux only
+    copy_file_range = None
+
+# ioctl request to share the data blocks of a file with another file (copy-on-write), Linux only
+FICLONE = 0x40049409
+# errors of a reflink if the file system or the kernel can not share blocks between the files
+UNSUPPORTED_ERRNOS = (errno.EOPNOTSUPP, errno.EXDEV, errno.EINVAL, errno.ENOTTY)
+
+
+class ProfileCloner:
+    """Copy function for copytree cloning a profile's files as cheaply as the file system allows.
+
+    For each file, in this order:
+    1. Reflink (FICLONE): the clone shares the data blocks of the file until either is modified
+       (copy-on-write), e.g. on Btrfs or XFS. Like a copy, it is independent of the original.
+    2. copy_file_range: the data is copied in the kernel, some file systems share blocks like with a
+       reflink.
+    3. A plain copy.
+
+    Files are never hardlinked: QGIS and the plugin updates of the Profile Manager may write to any
+    file of the clone, which would also change the original profile.
+
+    A method is not tried again after it failed once, as all files of a profile are on the same file
+    system. A reflink is only given up on errors telling that it is not supported, other errors,
+    e.g. a full disk, are raised.
+    """
+
+    def __init__(self, source_profile_path: str):
+        """
+        Args:
+            source_profile_path (str): Path to the profile being cloned
+        """
+        self.source_profile_path = source_profile_path
+        self.can_reflink = ioctl is not None
+        self.can_copy_file_range = copy_file_range is not None
+        self.file_counts = {"reflinked": 0, "copied": 0}
+
+    def __call__(self, source_file: str, target_file: str) -> str:
+        if self.can_reflink:
+            try:
+                with open(source_file, "rb") as source:
+                    with open(target_file, "wb") as target:
+                        ioctl(target.fileno(), FICLONE, source.fileno())
+                copystat(source_file, target_file)
+                self.file_counts["reflinked"] += 1
+                return target_file
+            except OSError as e:
+                if path.exists(target_file):
+                    remove(target_file)
+                if e.errno not in UNSUPPORTED_ERRNOS:
+                    raise
+                self.can_reflink = False
+
+        if self.can_copy_file_range:
+            try:
+                with open(source_file, "rb") as source:
+                    with open(target_file, "wb") as target:
+                        remaining_bytes = fstat(source.fileno()).st_size
+                        while remaining_bytes > 0:
+                            copied_bytes = copy_file_range(
+                                source.fileno(), target.fileno(), remaining_bytes
+                            )
+                            if copied_bytes == 0:
+                                break
+                            remaining_bytes -= copied_bytes
+                copystat(source_file, target_file)
+                self.file_counts["copied"] += 1
+                return target_file
+            except OSError:
+                self.can_copy_file_range = False
+
+        copy2(source_file, target_file)
+        self.file_counts["copied"] += 1
+        return target_file
+
+    def log_file_counts(self):
+        """Logs how many files were cloned by which method"""
+        QgsMessageLog.logMessage(
+            "Cloned profile '{0}': {1} files reflinked, {2} copied".format(
+                self.source_profile_path,
+                self.file_counts["reflinked"],
+                self.file_counts["copied"],
+            ),
+            "Profile Manager",
+            level=Qgis.Info,
+        )
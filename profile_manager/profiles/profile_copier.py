@@ -1,20 +1,29 @@
-from shutil import copytree
+from os import path
 
+from qgis.PyQt.QtCore import QSettings
 from qgis.PyQt.QtWidgets import QDialog, QMessageBox
 
 from profile_manager.gui.name_profile_dialog import NameProfileDialog
-from profile_manager.utils import wait_cursor
+from profile_manager.tasks.profile_tasks import CopyProfileTask
 
 
 class ProfileCopier(QDialog):
 
-    def __init__(self, profile_manager_dialog, qgis_path, *args, **kwargs):
+    def __init__(
+        self, profile_manager_dialog, qgis_path, profile_manager, *args, **kwargs
+    ):
         super().__init__(*args, **kwargs)
 
         self.dlg = profile_manager_dialog
         self.qgis_path = qgis_path
+        self.profile_manager = profile_manager
 
     def copy_profile(self):
+        """Copies the selected profile in a background task.
+
+        Unless disabled by the setting profile_manager/clone_profiles, files are reflinked where
+        possible instead of copied, see ProfileCloner.
+        """
         source_profile = self.dlg.list_profiles.currentItem()
         assert source_profile is not None  # should be forced by the GUI
         source_profile_path = self.qgis_path + "/" + source_profile.text() + "/"
@@ -22,24 +31,50 @@ class ProfileCopier(QDialog):
         dialog = NameProfileDialog()
         return_code = dialog.exec()
         if return_code == QDialog.Accepted:
-            error_message = None
-            with wait_cursor():
-                profile_name = dialog.text_input.text()
-                assert profile_name != ""  # should be forced by the GUI
-                profile_path = self.qgis_path + "/" + profile_name + "/"
-                try:
-                    copytree(source_profile_path, profile_path)
-                except FileExistsError:
-                    error_message = self.tr(
-                        "Profile directory '{}' already exists."
-                    ).format(profile_name)
-            if error_message:
+            profile_name = dialog.text_input.text()
+            assert profile_name != ""  # should be forced by the GUI
+            profile_path = self.qgis_path + "/" + profile_name + "/"
+            if path.exists(profile_path):
                 QMessageBox.critical(
-                    None, self.tr("Profile could not be copied"), error_message
-                )
-            else:
-                QMessageBox.information(
                     None,
-                    self.tr("Profile copied"),
-                    self.tr("Profile '{}' successfully copied.").format(profile_name),
+                    self.tr("Profile could not be copied"),
+                    self.tr("Profile directory '{}' already exists.").format(
+                        profile_name
+                    ),
                 )
+                return
+
+            self.profile_manager.start_task(
+                CopyProfileTask(
+                    source_profile_path,
+                    profile_path,
+                    clone=QSettings().value(
+                        "profile_manager/clone_profiles", True, type=bool
+                    ),
+                ),
+                lambda task: self.copy_finished(task, profile_name),
+            )
+
+    def copy_finished(self, task: CopyProfileTask, profile_name: str):
+        """Shows the result of copying a profile"""
+        if task.isCanceled():
+            QMessageBox.information(
+                None,
+                self.tr("Profile not copied"),
+                self.tr("Copying profile '{}' has been canceled.").format(profile_name),
+            )
+        elif task.exception is not None:
+            QMessageBox.critical(
+                None,
+                self.tr("Profile could not be copied"),
+                self.tr("Copying profile '{0}' failed due to error:\n{1}").format(
+                    profile_name, task.exception
+                ),
+            )
+        else:
+            QMessageBox.information(
+                None,
+                self.tr("Profile copied"),
+                self.tr("Profile '{}' successfully copied.").format(profile_name),
+            )
+        self.profile_manager.interface_handler.populate_profile_listings()
@@ -0,0 +1,349 @@
+import json
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from configparser import Error as ConfigParserError
+from os import path, scandir
+
+from lxml import etree as et
+from qgis.core import Qgis, QgsMessageLog
+
+from profile_manager.datasources.bookmarks.bookmark_handler import iterate_bookmarks
+from profile_manager.datasources.dataservices.datasource_distributor import (
+    get_connection_section,
+)
+from profile_manager.datasources.dataservices.datasource_provider import (
+    DATA_SOURCE_SEARCH_LOCATIONS,
+    ProfileSnapshot,
+)
+from profile_manager.datasources.dataservices.profile_diff import get_style_fingerprint
+from profile_manager.datasources.plugins.plugin_catalog import get_plugin_version
+from profile_manager.utils import (
+    adjust_to_operating_system,
+    get_file_state,
+    get_profile_path,
+)
+
+# Scanning is mostly waiting for the disk and parsing small files, a few threads keep the disk busy
+MAX_INVENTORY_WORKERS = 8
+# Version of the inventory's tables, an inventory of another version is rebuilt
+INVENTORY_SCHEMA_VERSION = 2
+INVENTORY_SCHEMA = """
+CREATE TABLE source_state (profile TEXT, kind TEXT, state TEXT, PRIMARY KEY (profile, kind));
+CREATE TABLE connection (profile TEXT, provider TEXT, name TEXT, setting TEXT, value TEXT);
+CREATE INDEX connection_profile ON connection (profile);
+CREATE INDEX connection_value ON connection (value);
+CREATE TABLE plugin (profile TEXT, name TEXT, version TEXT, active INTEGER);
+CREATE INDEX plugin_profile ON plugin (profile);
+CREATE INDEX plugin_name ON plugin (name);
+CREATE TABLE bookmark (profile TEXT, name TEXT, group_name TEXT, extent TEXT);
+CREATE INDEX bookmark_profile ON bookmark (profile);
+CREATE TABLE style (profile TEXT, entry_type TEXT, name TEXT);
+CREATE INDEX style_profile ON style (profile);
+"""
+# Tables of the inventory with their searchable columns, in the order they are listed in
+INVENTORY_TABLES = {
+    "connection": ["profile", "provider", "name", "setting", "value"],
+    "plugin": ["profile", "name", "version", "active"],
+    "bookmark": ["profile", "name", "group_name", "extent"],
+    "style": ["profile", "entry_type", "name"],
+}
+# Connection settings holding credentials, never stored in the inventory
+CREDENTIAL_SETTINGS = ["username", "password"]
+# Tables filled from each kind of source of a profile
+SOURCE_TABLES = {
+    "ini": ["connection"],
+    "plugins": ["plugin"],
+    "bookmarks": ["bookmark"],
+    "styles": ["style"],
+}
+
+
+class ProfileInventory:
+    """SQLite index of the connections, plugins, bookmarks and styles of all profiles, for finding
+    e.g. the profiles still using a database host or having a plugin installed.
+
+    Each profile's sources (QGIS3.ini, installed plugins, bookmarks.xml, symbology-style.db) are
+    only scanned again if their modification time or size changed since the last refresh. Profiles
+    are scanned in parallel, the inventory is only written by the thread that opened it.
+
+    The inventory must only be used on the thread that created it.
+    """
+
+    def __init__(self, inventory_file: str):
+        """Opens the inventory, creating it if it is missing or rebuilding it if its schema is old.
+
+        Args:
+            inventory_file (str): Path to the SQLite file of the inventory
+
+        Raises:
+            sqlite3.Error: If the inventory could not be opened
+        """
+        self.db = sqlite3.connect(inventory_file)
+        schema_version = self.db.execute("PRAGMA user_version").fetchone()[0]
+        if schema_version != INVENTORY_SCHEMA_VERSION:
+            with self.db:
+                for table in ["source_state", *INVENTORY_TABLES]:
+                    self.db.execute(f"DROP TABLE IF EXISTS {table}")
+                self.db.executescript(INVENTORY_SCHEMA)
+                self.db.execute(f"PRAGMA user_version = {INVENTORY_SCHEMA_VERSION}")
+            # overwrites the pages of the dropped tables, e.g. credentials stored by older versions
+            self.db.execute("VACUUM")
+
+    def close(self):
+        """Closes the inventory"""
+        self.db.close()
+
+    def refresh(
+        self, qgis_profiles_path: str, progress_callback=None, is_canceled=None
+    ) -> list[str]:
+        """Scans the changed sources of all profiles and drops the profiles that no longer exist.
+
+        Args:
+            qgis_profiles_path (str): Path to the directory containing the profiles
+            progress_callback (Callable[[str], None]): Called in the calling thread with the name of
+                each profile once it is up to date
+            is_canceled (Callable[[], bool]): Checked before each profile is scanned, remaining
+                profiles are skipped
+
+        Returns:
+            list[str]: Names of the profiles of which at least one source was scanned again
+        """
+        with scandir(qgis_profiles_path) as entries:
+            profile_names = sorted(entry.name for entry in entries if entry.is_dir())
+
+        stored_states = {}
+        for profile_name, kind, state in self.db.execute(
+            "SELECT profile, kind, state FROM source_state"
+        ):
+            stored_states.setdefault(profile_name, {})[kind] = state
+
+        with self.db:
+            for profile_name in stored_states.keys() - set(profile_names):
+                self.remove_profile(profile_name)
+
+        def scan(profile_name):
+            if is_canceled and is_canceled():
+                return {}, {}
+            return scan_profile(
+                get_profile_path(qgis_profiles_path, profile_name),
+                stored_states.get(profile_name, {}),
+            )
+
+        rescanned_profile_names = []
+        with ThreadPoolExecutor(max_workers=MAX_INVENTORY_WORKERS) as executor:
+            futures = {
+                executor.submit(scan, profile_name): profile_name
+                for profile_name in profile_names
+            }
+            for future in as_completed(futures):
+                profile_name = futures[future]
+                try:
+                    states, rows = future.result()
+                except (OSError, ConfigParserError) as e:
+                    QgsMessageLog.logMessage(
+                        f"Could not add profile '{profile_name}' to the inventory: {e}",
+                        "Profile Manager",
+                        level=Qgis.Warning,
+                    )
+                    continue
+                if rows:
+                    self.store_profile(profile_name, states, rows)
+                    rescanned_profile_names.append(profile_name)
+                if progress_callback:
+                    progress_callback(profile_name)
+        return sorted(rescanned_profile_names)
+
+    def store_profile(
+        self,
+        profile_name: str,
+        states: dict[str, str],
+        rows: dict[str, list[tuple]],
+    ):
+        """Replaces the rows of the rescanned sources of a profile, see scan_profile"""
+        with self.db:
+            for kind, kind_rows in rows.items():
+                for table in SOURCE_TABLES[kind]:
+                    self.db.execute(
+                        f"DELETE FROM {table} WHERE profile = ?", (profile_name,)
+                    )
+                    self.db.executemany(
+                        "INSERT INTO {} VALUES ({})".format(
+                            table, ", ".join("?" * len(INVENTORY_TABLES[table]))
+                        ),
+                        ((profile_name, *row) for row in kind_rows),
+                    )
+                self.db.execute(
+                    "INSERT OR REPLACE INTO source_state VALUES (?, ?, ?)",
+                    (profile_name, kind, states[kind]),
+                )
+
+    def remove_profile(self, profile_name: str):
+        """Drops all rows of a profile"""
+        for table in ["source_state", *INVENTORY_TABLES]:
+            self.db.execute(f"DELETE FROM {table} WHERE profile = ?", (profile_name,))
+
+    def search(self, table: str, text: str = "", limit: int = -1) -> list[tuple]:
+        """Returns the rows of a table with any column containing a text, ignoring case.
+
+        Args:
+            table (str): One of INVENTORY_TABLES, e.g. connection
+            text (str): Text to search for, "" for all rows
+            limit (int): Maximum number of rows to return, -1 for all
+
+        Returns:
+            list[tuple]: Matching rows with the columns of INVENTORY_TABLES, ordered by them
+        """
+        columns = INVENTORY_TABLES[table]
+        return self.db.execute(
+            "SELECT {0} FROM {1} WHERE {2} ORDER BY {0} LIMIT ?".format(
+                ", ".join(columns),
+                table,
+                " OR ".join(f"{column} LIKE ? ESCAPE '\\'" for column in columns),
+            ),
+            [f"%{escape_like(text)}%"] * len(columns) + [limit],
+        ).fetchall()
+
+    def count(self, table: str, text: str = "") -> int:
+        """Returns the number of rows search would return without limit"""
+        columns = INVENTORY_TABLES[table]
+        return self.db.execute(
+            "SELECT COUNT(*) FROM {0} WHERE {1}".format(
+                table,
+                " OR ".join(f"{column} LIKE ? ESCAPE '\\'" for column in columns),
+            ),
+            [f"%{escape_like(text)}%"] * len(columns),
+        ).fetchone()[0]
+
+    def query(self, sql: str, parameters=()) -> list[tuple]:
+        """Returns the rows of an SQL query on the inventory, e.g.
+
+        SELECT DISTINCT profile FROM connection
+            WHERE setting = 'host' AND value = 'old-db.example.com'
+        SELECT profile, version FROM plugin WHERE name = 'qfieldsync'
+        """
+        return self.db.execute(sql, parameters).fetchall()
+
+
+def scan_profile(
+    profile_path: str, stored_states: dict[str, str]
+) -> tuple[dict[str, str], dict[str, list[tuple]]]:
+    """Scans the sources of a profile that changed since they were stored, run on a worker thread.
+
+    Args:
+        profile_path (str): Path to the profile
+        stored_states (dict[str, str]): State of each kind of source when it was last scanned, see
+            SOURCE_TABLES
+
+    Returns:
+        tuple[dict[str, str], dict[str, list[tuple]]]: Current state of each kind of source and the
+            rows, without the profile column, of the kinds that changed
+    """
+    ini_path = adjust_to_operating_system(profile_path + "QGIS/QGIS3.ini")
+    bookmark_file = adjust_to_operating_system(profile_path + "bookmarks.xml")
+    style_db_path = adjust_to_operating_system(profile_path + "symbology-style.db")
+    plugins_dir = adjust_to_operating_system(profile_path + "python/plugins/")
+
+    plugin_states = []
+    if path.isdir(plugins_dir):
+        with scandir(plugins_dir) as entries:
+            plugin_states = sorted(
+                (entry.name, get_file_state(path.join(entry.path, "metadata.txt")))
+                for entry in entries
+                if entry.is_dir() and not entry.name.startswith("__")
+            )
+    states = {
+        "ini": json.dumps(get_file_state(ini_path)),
+        # the active state of plugins is stored in the INI file
+        "plugins": json.dumps([get_file_state(ini_path), plugin_states]),
+        "bookmarks": json.dumps(get_file_state(bookmark_file)),
+        "styles": json.dumps(get_file_state(style_db_path)),
+    }
+    changed_kinds = [
+        kind for kind, state in states.items() if stored_states.get(kind) != state
+    ]
+    if not changed_kinds:
+        return states, {}
+
+    rows = {}
+    snapshot = None
+    if "ini" in changed_kinds or "plugins" in changed_kinds:
+        snapshot = ProfileSnapshot(ini_path)
+    if "ini" in changed_kinds:
+        rows["ini"] = get_connection_rows(snapshot)
+    if "plugins" in changed_kinds:
+        rows["plugins"] = [
+            (
+                plugin_name,
+                get_plugin_version(path.join(plugins_dir, plugin_name)),
+                int(snapshot.plugins.get(plugin_name, "false").lower() == "true"),
+            )
+            for plugin_name, _ in plugin_states
+        ]
+    if "bookmarks" in changed_kinds:
+        rows["bookmarks"] = get_bookmark_rows(bookmark_file)
+    if "styles" in changed_kinds:
+        rows["styles"] = (
+            [
+                tuple(entry.split(": ", 1))
+                for entry in get_style_fingerprint(style_db_path)
+            ]
+            if path.isfile(style_db_path)
+            else []
+        )
+    return states, rows
+
+
+def get_connection_rows(snapshot: ProfileSnapshot) -> list[tuple[str, str, str, str]]:
+    """Returns provider, name, setting and value of the settings of a profile's connections.
+
+    Credentials (usernames and passwords) are left out, so they are not copied into the inventory.
+    """
+    rows = []
+    for provider in DATA_SOURCE_SEARCH_LOCATIONS:
+        # GeoPackage connections are stored under [providers] in the ini
+        section, key_filter = get_connection_section(
+            "providers" if provider == "GeoPackage" else provider
+        )
+        for connection_name in snapshot.get_data_source_connections(provider):
+            for key in snapshot.get_connection_keys(
+                section, connection_name, key_filter
+            ):
+                setting = key.split("\\")[-1]
+                if setting.lower() in CREDENTIAL_SETTINGS:
+                    continue
+                rows.append(
+                    (
+                        provider,
+                        connection_name,
+                        setting,
+                        snapshot.ini_parser.get(section, key, raw=True),
+                    )
+                )
+    return rows
+
+
+def get_bookmark_rows(bookmark_file: str) -> list[tuple[str, str, str]]:
+    """Returns name, group and extent of a profile's bookmarks, none if the file is not valid"""
+    if not path.isfile(bookmark_file):
+        return []
+    try:
+        return [
+            (
+                bookmark.get("name", ""),
+                bookmark.get("group", ""),
+                bookmark.get("extent", ""),
+            )
+            for bookmark in iterate_bookmarks(bookmark_file)
+        ]
+    except et.Error as e:
+        QgsMessageLog.logMessage(
+            f"Could not add bookmarks in '{bookmark_file}' to the inventory: {e}",
+            "Profile Manager",
+            level=Qgis.Warning,
+        )
+        return []
+
+
+def escape_like(text: str) -> str:
+    """Escapes the wildcards of SQL LIKE patterns with a backslash"""
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
@@ -1,10 +1,10 @@
 from pathlib import Path
-from shutil import rmtree
 
 from qgis.core import QgsApplication
 from qgis.PyQt.QtWidgets import QDialog, QMessageBox
 
-from profile_manager.utils import adjust_to_operating_system, wait_cursor
+from profile_manager.tasks.profile_tasks import RemoveProfileTask
+from profile_manager.utils import adjust_to_operating_system
 
 
 class ProfileRemover(QDialog):
@@ -21,7 +21,7 @@ class ProfileRemover(QDialog):
     def remove_profile(self):
         """Removes profile
 
-        Aborts and shows an error message if no backup could be made.
+        The removal runs in a background task. It aborts if no backup could be made.
         """
         profile_item = self.dlg.list_profiles.currentItem()
         # bad states that should be prevented by the GUI
@@ -40,36 +40,43 @@ class ProfileRemover(QDialog):
         )
 
         if clicked_button == QMessageBox.Yes:
-            error_message = None
+            self.profile_manager.start_task(
+                RemoveProfileTask(
+                    profile_path, self.profile_manager.prepare_backup(profile_name)
+                ),
+                lambda task: self.remove_finished(task, profile_name),
+            )
 
-            with wait_cursor():
-                try:
-                    self.profile_manager.make_backup(profile_name)
-                except OSError as e:
-                    error_message = self.tr(
-                        "Aborting removal of profile '{0}' due to error:\n{1}"
-                    ).format(profile_name, e)
-                if error_message:
-                    QMessageBox.critical(
-                        None, self.tr("Backup could not be created"), error_message
-                    )
-                    return
-
-            with wait_cursor():
-                try:
-                    rmtree(profile_path)
-                except FileNotFoundError as e:
-                    error_message = self.tr(
-                        "Aborting removal of profile '{0}' due to error:\n{1}"
-                    ).format(profile_name, e)
-
-            if error_message:
-                QMessageBox.critical(
-                    None, self.tr("Profile could not be removed"), error_message
-                )
-            else:
-                QMessageBox.information(
-                    None,
-                    self.tr("Profile removed"),
-                    self.tr("Profile '{}' has been removed.").format(profile_name),
-                )
+    def remove_finished(self, task: RemoveProfileTask, profile_name: str):
+        """Shows the result of removing a profile"""
+        if task.isCanceled():
+            QMessageBox.information(
+                None,
+                self.tr("Profile not removed"),
+                self.tr("Removing profile '{}' has been canceled.").format(
+                    profile_name
+                ),
+            )
+        elif task.exception is not None and task.backup is None:
+            QMessageBox.critical(
+                None,
+                self.tr("Backup could not be created"),
+                self.tr("Aborting removal of profile '{0}' due to error:\n{1}").format(
+                    profile_name, task.exception
+                ),
+            )
+        elif task.exception is not None:
+            QMessageBox.critical(
+                None,
+                self.tr("Profile could not be removed"),
+                self.tr(
+                    "Removal of profile '{0}' failed due to error, it has been restored:\n{1}"
+                ).format(profile_name, task.exception),
+            )
+        else:
+            QMessageBox.information(
+                None,
+                self.tr("Profile removed"),
+                self.tr("Profile '{}' has been removed.").format(profile_name),
+            )
+        self.profile_manager.interface_handler.populate_profile_listings()
@@ -0,0 +1,315 @@
+from functools import partial
+from os import path
+
+from qgis.core import Qgis, QgsMessageLog
+
+from profile_manager.backups.backup_restorer import restore_backup
+from profile_manager.datasources.bookmarks.bookmark_handler import import_bookmarks
+from profile_manager.datasources.customizations.customization_handler import (
+    import_customization_file,
+)
+from profile_manager.datasources.dataservices.change_set import (
+    ChangeSet,
+    compute_import_change_set,
+    compute_removal_change_set,
+    with_error_title,
+)
+from profile_manager.datasources.dataservices.datasource_handler import (
+    DataSourceSelection,
+)
+from profile_manager.datasources.dataservices.directory_sync import (
+    SyncSummary,
+    copy_files,
+)
+from profile_manager.datasources.plugins.plugin_importer import import_plugins
+from profile_manager.datasources.plugins.plugin_remover import remove_plugins
+from profile_manager.datasources.styles.style_handler import import_styles
+from profile_manager.tasks.operation_task import (
+    OperationCanceled,
+    OperationTask,
+    get_size,
+)
+from profile_manager.utils import adjust_to_operating_system, tr
+
+
+class ImportTask(OperationTask):
+    """Imports the selected data sources and plugins into the target profile.
+
+    The import applies a change set, computing it first unless one was previewed. A previewed change
+    set is only applied if none of the files and plugin directories it was computed from changed
+    since, otherwise the import fails with ChangeSetOutdated before anything is written. The target
+    profile is backed up before anything is written. All INI changes are part of the change set's
+    session of the target INI file which is written once, atomically, at the end. If the import is
+    canceled or fails, the backed up paths are restored.
+    """
+
+    def __init__(
+        self,
+        selection: DataSourceSelection,
+        backup_function,
+        change_set: ChangeSet = None,
+    ):
+        """
+        Args:
+            selection (DataSourceSelection): Profiles and checked items
+            backup_function (Callable[[Callable[[], bool]], str]): Backs up the target profile,
+                takes the cancel check and returns the backup's path or None if canceled
+            change_set (ChangeSet): Previewed changes of the import, computed if None
+        """
+        super().__init__(tr("Importing into profile"))
+        self.selection = selection
+        self.backup_function = backup_function
+        self.change_set = change_set
+        self.write_set = selection.get_import_write_set()
+        self.written_profile_paths = [selection.target_profile_path]
+
+    def execute(self):
+        selection = self.selection
+        if self.change_set is None:
+            self.change_set = compute_import_change_set(selection)
+        change_set = self.change_set
+        change_set.check_current()
+        self.error_messages += change_set.error_messages
+
+        steps = self.get_import_steps(change_set)
+        self.items_total = len(steps) + len(selection.plugin_names) + 1
+        self.bytes_total = sum(size for size, _ in steps) + sum(
+            get_size(
+                adjust_to_operating_system(
+                    selection.source_profile_path + "python/plugins/" + plugin_name
+                )
+            )
+            for plugin_name in selection.plugin_names
+        )
+
+        self.backup = self.backup_function(self.isCanceled)
+        if self.backup is None:
+            raise OperationCanceled()
+        self.add_progress()
+        # the backup may have taken a while
+        change_set.check_current()
+
+        for size, import_step in steps:
+            self.check_canceled()
+            error_message = import_step()
+            if error_message:
+                self.error_messages.append(error_message)
+            self.add_progress(size)
+
+        self.check_canceled()
+        self.error_messages += import_plugins(
+            selection.source_profile_path,
+            selection.target_profile_path,
+            selection.target_qgis_ini_file,
+            selection.plugin_names,
+            target_session=change_set.ini_session,
+            progress_callback=lambda plugin_name, size: self.add_progress(size),
+            is_canceled=self.isCanceled,
+            update_existing=selection.update_plugins,
+        )
+
+        self.check_canceled()
+        change_set.ini_session.commit()
+
+    def clean_up(self):
+        if self.backup:
+            restore_backup(
+                self.backup, self.selection.target_profile_path, self.write_set
+            )
+
+    def get_import_steps(self, change_set: ChangeSet) -> list[tuple[int, object]]:
+        """Returns the steps writing the files of a change set.
+
+        Styles are merged inside a single transaction of the target database, which is rolled back
+        if the merge differs from the previewed style changes.
+
+        Args:
+            change_set (ChangeSet): Changes to apply
+
+        Returns:
+            list[tuple[int, Callable[[], str]]]: Bytes to copy and a function returning an error
+                message or None
+        """
+        selection = self.selection
+        source_profile_path = selection.source_profile_path
+        target_profile_path = selection.target_profile_path
+        steps = []
+
+        if selection.bookmarks and change_set.bookmark_positions:
+            steps.append(
+                (
+                    get_size(selection.source_bookmark_file),
+                    lambda: with_error_title(
+                        tr("Error while importing bookmarks"),
+                        import_bookmarks(
+                            selection.source_bookmark_file,
+                            selection.target_bookmark_file,
+                            change_set.bookmark_positions,
+                        ),
+                    ),
+                )
+            )
+
+        for description, relative_dir, summary in (
+            (tr("Models"), "processing/models/", change_set.model_sync),
+            (tr("Scripts"), "processing/scripts/", change_set.script_sync),
+        ):
+            if summary is None:
+                continue
+            source_dir = adjust_to_operating_system(source_profile_path + relative_dir)
+            target_dir = adjust_to_operating_system(target_profile_path + relative_dir)
+            steps.append(
+                (
+                    sum(
+                        get_size(path.join(source_dir, relative_path))
+                        for relative_path in summary.copied
+                    ),
+                    partial(
+                        apply_sync_summary, description, source_dir, target_dir, summary
+                    ),
+                )
+            )
+
+        if change_set.style_summary is not None:
+            steps.append(
+                (
+                    get_size(path.join(source_profile_path, "symbology-style.db")),
+                    lambda: with_error_title(
+                        tr("Error while importing styles"),
+                        import_styles(
+                            source_profile_path,
+                            target_profile_path,
+                            planned_summary=change_set.style_summary,
+                        ),
+                    ),
+                )
+            )
+
+        if change_set.copy_customization_file:
+            steps.append(
+                (
+                    0,
+                    lambda: import_customization_file(
+                        source_profile_path, target_profile_path
+                    ),  # currently has no error handling
+                )
+            )
+
+        return steps
+
+
+def apply_sync_summary(
+    description: str, source_dir: str, target_dir: str, summary: SyncSummary
+) -> str:
+    """Copies the files a dry run of a sync found to be copied, see describe_sync_conflicts"""
+    copy_files(source_dir, target_dir, summary.copied)
+    return describe_sync_conflicts(description, summary)
+
+
+def describe_sync_conflicts(description: str, summary: SyncSummary) -> str:
+    """Logs a directory sync's summary and returns an error message listing its conflicts, if any"""
+    QgsMessageLog.logMessage(
+        f"{description}: {len(summary.copied)} copied, {len(summary.skipped)} unchanged, "
+        f"{len(summary.conflicts)} conflicts",
+        "Profile Manager",
+        level=Qgis.Info,
+    )
+    if summary.conflicts:
+        return tr(
+            "{0} not imported because they were changed in the target profile:\n{1}"
+        ).format(description, "\n".join(summary.conflicts))
+    return None
+
+
+class RemoveDataSourcesTask(OperationTask):
+    """Removes the selected data sources and plugins from the source profile.
+
+    The removal applies a change set, computing it first unless one was previewed. Like an import,
+    it fails with ChangeSetOutdated if the profile changed since the change set was computed. The
+    source profile is backed up first. The INI changes are part of the change set's session of the
+    source INI file which is written once, atomically, at the end. If the removal is canceled or
+    fails, the backed up paths are restored.
+    """
+
+    def __init__(
+        self,
+        selection: DataSourceSelection,
+        backup_function,
+        change_set: ChangeSet = None,
+    ):
+        """
+        Args:
+            selection (DataSourceSelection): Profile and checked items
+            backup_function (Callable[[Callable[[], bool]], str]): Backs up the source profile,
+                takes the cancel check and returns the backup's path or None if canceled
+            change_set (ChangeSet): Previewed changes of the removal, computed if None
+        """
+        super().__init__(tr("Removing data sources from profile"))
+        self.selection = selection
+        self.backup_function = backup_function
+        self.change_set = change_set
+        self.write_set = selection.get_removal_write_set()
+        self.written_profile_paths = [selection.source_profile_path]
+
+    def execute(self):
+        selection = self.selection
+        if self.change_set is None:
+            self.change_set = compute_removal_change_set(selection)
+        change_set = self.change_set
+        change_set.check_current()
+
+        plugin_sizes = [
+            get_size(
+                adjust_to_operating_system(
+                    selection.source_profile_path + "python/plugins/" + plugin_name
+                )
+            )
+            for plugin_name in selection.plugin_names
+        ]
+        self.items_total = len(plugin_sizes) + 2
+        self.bytes_total = sum(plugin_sizes)
+
+        self.backup = self.backup_function(self.isCanceled)
+        if self.backup is None:
+            raise OperationCanceled()
+        self.add_progress()
+        change_set.check_current()
+
+        for plugin_name, size in zip(selection.plugin_names, plugin_sizes):
+            self.check_canceled()
+            self.error_messages += remove_plugins(
+                selection.source_profile_path,
+                selection.source_qgis_ini_file,
+                [plugin_name],
+                session=change_set.ini_session,
+            )
+            self.add_progress(size)
+
+        self.check_canceled()
+        change_set.ini_session.commit()
+        self.add_progress()
+
+    def clean_up(self):
+        if self.backup:
+            restore_backup(
+                self.backup, self.selection.source_profile_path, self.write_set
+            )
+
+
+class ChangeSetTask(OperationTask):
+    """Computes the change set of an import or removal for a preview, without writing anything."""
+
+    def __init__(self, selection: DataSourceSelection, compute_function):
+        """
+        Args:
+            selection (DataSourceSelection): Profiles and checked items
+            compute_function (Callable[[DataSourceSelection], ChangeSet]): compute_import_change_set
+                or compute_removal_change_set
+        """
+        super().__init__(tr("Computing changes"))
+        self.selection = selection
+        self.compute_function = compute_function
+        self.change_set: ChangeSet = None
+
+    def execute(self):
+        self.change_set = self.compute_function(self.selection)
@@ -0,0 +1,98 @@
+from os import lstat, path, walk
+
+from qgis.core import QgsTask
+from qgis.PyQt.QtCore import pyqtSignal
+
+
+class OperationCanceled(Exception):
+    """Raised inside a task's operation to stop it once the task was canceled"""
+
+
+class OperationTask(QgsTask):
+    """Base class of the background tasks for operations on profiles.
+
+    Subclasses implement execute() and, if a canceled or failed operation leaves something behind,
+    clean_up(). Both run on a worker thread and must not touch the GUI. Progress is counted in bytes
+    and items and reported through progress_reported, the result through operation_finished, both
+    received on the GUI thread.
+    """
+
+    # bytes done, bytes total, items done, items total
+    progress_reported = pyqtSignal("qint64", "qint64", int, int)
+    # success, error messages of the parts of the operation that failed
+    operation_finished = pyqtSignal(bool, list)
+
+    def __init__(self, description: str):
+        super().__init__(description, QgsTask.CanCancel)
+        self.error_messages = []
+        self.exception = None
+        # path to the backup the operation made before changing a profile
+        self.backup = None
+        # paths of the profiles the operation writes to, no other task may write to them meanwhile
+        self.written_profile_paths: list[str] = []
+        self.bytes_done = 0
+        self.bytes_total = 0
+        self.items_done = 0
+        self.items_total = 0
+
+    def run(self) -> bool:
+        try:
+            self.execute()
+        except OperationCanceled:
+            pass
+        except Exception as e:
+            self.exception = e
+
+        if self.isCanceled() or self.exception is not None:
+            try:
+                self.clean_up()
+            except OSError as e:
+                self.error_messages.append(str(e))
+            return False
+        return True
+
+    def finished(self, result: bool):
+        self.operation_finished.emit(result, self.error_messages)
+
+    def execute(self):
+        """Runs the operation.
+
+        Raises:
+            OperationCanceled: If the task was canceled
+        """
+        raise NotImplementedError
+
+    def clean_up(self):
+        """Undoes what a canceled or failed operation left behind"""
+
+    def check_canceled(self):
+        """Raises OperationCanceled if the task was canceled"""
+        if self.isCanceled():
+            raise OperationCanceled()
+
+    def add_progress(self, bytes_done: int = 0, items_done: int = 1):
+        """Counts finished work and reports the progress"""
+        self.bytes_done += bytes_done
+        self.items_done += items_done
+        if self.bytes_total:
+            self.setProgress(100 * min(self.bytes_done / self.bytes_total, 1))
+        elif self.items_total:
+            self.setProgress(100 * min(self.items_done / self.items_total, 1))
+        self.progress_reported.emit(
+            self.bytes_done, self.bytes_total, self.items_done, self.items_total
+        )
+
+
+def get_size(path_to_measure: str) -> int:
+    """Returns the size of a file or directory tree in bytes, 0 if it does not exist"""
+    if path.isfile(path_to_measure):
+        return path.getsize(path_to_measure)
+
+    size = 0
+    for directory, _, file_names in walk(path_to_measure):
+        for file_name in file_names:
+            try:
+                size += lstat(path.join(directory, file_name)).st_size
+            except OSError:
+                continue
+    return size
@@ -0,0 +1,142 @@
+from os import lstat, path, remove, rmdir, scandir, walk
+from shutil import copy2, copytree, rmtree
+
+from profile_manager.backups.backup_restorer import restore_backup
+from profile_manager.profiles.profile_cloner import ProfileCloner
+from profile_manager.profiles.profile_inventory import ProfileInventory
+from profile_manager.tasks.operation_task import OperationCanceled, OperationTask
+from profile_manager.utils import tr
+
+
+class CopyProfileTask(OperationTask):
+    """Copies a profile into a new directory, removing the partial copy if canceled or failed."""
+
+    def __init__(
+        self, source_profile_path: str, target_profile_path: str, clone: bool = False
+    ):
+        """
+        Args:
+            source_profile_path (str): Path to the profile to copy
+            target_profile_path (str): Path to the new profile, must not exist
+            clone (bool): If files should be reflinked where possible, see ProfileCloner
+        """
+        super().__init__(tr("Copying profile"))
+        self.source_profile_path = source_profile_path
+        self.target_profile_path = target_profile_path
+        self.created_target = False
+        self.written_profile_paths = [target_profile_path]
+        self.cloner = ProfileCloner(source_profile_path) if clone else None
+
+    def execute(self):
+        if path.exists(self.target_profile_path):
+            raise FileExistsError(
+                tr("Profile directory '{}' already exists.").format(
+                    self.target_profile_path
+                )
+            )
+
+        for directory, _, file_names in walk(self.source_profile_path):
+            self.items_total += len(file_names)
+            for file_name in file_names:
+                self.bytes_total += lstat(path.join(directory, file_name)).st_size
+
+        self.created_target = True
+        copytree(
+            self.source_profile_path,
+            self.target_profile_path,
+            copy_function=self.copy_file,
+        )
+        if self.cloner:
+            self.cloner.log_file_counts()
+
+    def copy_file(self, source_file: str, target_file: str) -> str:
+        """Copy function for copytree counting the progress and stopping when canceled"""
+        self.check_canceled()
+        if self.cloner:
+            self.cloner(source_file, target_file)
+        else:
+            copy2(source_file, target_file)
+        self.add_progress(lstat(target_file).st_size)
+        return target_file
+
+    def clean_up(self):
+        if self.created_target and path.exists(self.target_profile_path):
+            rmtree(self.target_profile_path)
+
+
+class RemoveProfileTask(OperationTask):
+    """Backs up and removes a profile, restoring the backup if canceled or failed while removing."""
+
+    def __init__(self, profile_path: str, backup_function):
+        """
+        Args:
+            profile_path (str): Path to the profile to remove
+            backup_function (Callable[[Callable[[], bool]], str]): Backs up the whole profile, takes
+                the cancel check and returns the backup's path or None if canceled
+        """
+        super().__init__(tr("Removing profile"))
+        self.profile_path = profile_path
+        self.backup_function = backup_function
+        self.started_removal = False
+        self.written_profile_paths = [profile_path]
+
+    def execute(self):
+        for directory, _, file_names in walk(self.profile_path):
+            self.items_total += len(file_names)
+            for file_name in file_names:
+                self.bytes_total += lstat(path.join(directory, file_name)).st_size
+
+        self.backup = self.backup_function(self.isCanceled)
+        if self.backup is None:
+            raise OperationCanceled()
+        self.check_canceled()
+
+        self.started_removal = True
+        for directory, directory_names, file_names in walk(
+            self.profile_path, topdown=False
+        ):
+            for directory_name in directory_names:
+                # symlinks to directories are not walked into
+                if path.islink(path.join(directory, directory_name)):
+                    remove(path.join(directory, directory_name))
+            for file_name in file_names:
+                self.check_canceled()
+                file_path = path.join(directory, file_name)
+                size = lstat(file_path).st_size
+                remove(file_path)
+                self.add_progress(size)
+            rmdir(directory)
+
+    def clean_up(self):
+        if self.started_removal and self.backup:
+            restore_backup(self.backup, self.profile_path, [""])
+
+
+class RefreshInventoryTask(OperationTask):
+    """Refreshes the inventory of all profiles, only rescanning the profiles that changed."""
+
+    def __init__(self, inventory_file: str, qgis_profiles_path: str):
+        """
+        Args:
+            inventory_file (str): Path to the SQLite file of the inventory
+            qgis_profiles_path (str): Path to the directory containing the profiles
+        """
+        super().__init__(tr("Refreshing profile inventory"))
+        self.inventory_file = inventory_file
+        self.qgis_profiles_path = qgis_profiles_path
+        self.rescanned_profile_names = []
+
+    def execute(self):
+        with scandir(self.qgis_profiles_path) as entries:
+            self.items_total = sum(1 for entry in entries if entry.is_dir())
+
+        inventory = ProfileInventory(self.inventory_file)
+        try:
+            self.rescanned_profile_names = inventory.refresh(
+                self.qgis_profiles_path,
+                progress_callback=lambda profile_name: self.add_progress(),
+                is_canceled=self.isCanceled,
+            )
+        finally:
+            inventory.close()
+        self.check_canceled()
@@ -1,4 +1,7 @@
 from contextlib import contextmanager
+from hashlib import sha256
+from os import lstat, path, stat, walk
+from pathlib import Path
 from sys import platform
 
 from qgis.PyQt.QtCore import QCoreApplication, Qt
@@ -31,6 +34,77 @@ def adjust_to_operating_system(path_to_adjust):
         raise NotImplementedError(f"Unsupported platform '{platform}'")
 
 
+def get_qgis_profiles_path() -> str:
+    """Returns the path to the directory containing the current user's QGIS profiles on this OS"""
+    home_path = Path.home()
+    if platform.startswith("win32"):
+        return f"{home_path}/AppData/Roaming/QGIS/QGIS3/profiles".replace("\\", "/")
+    elif platform == "darwin":
+        return f"{home_path}/Library/Application Support/QGIS/QGIS3/profiles"
+    else:
+        return f"{home_path}/.local/share/QGIS/QGIS3/profiles"
+
+
+def get_backup_path() -> str:
+    """Returns the path to the directory the profile backups are stored in"""
+    return adjust_to_operating_system(
+        str(Path.home()) + "/QGIS Profile Manager Backup/"
+    )
+
+
+def get_inventory_path(qgis_profiles_path: str) -> str:
+    """Returns the path to the SQLite inventory of all profiles, next to the profiles directory"""
+    return adjust_to_operating_system(
+        str(Path(qgis_profiles_path).parent) + "/profile_manager_inventory.sqlite"
+    )
+
+
+def get_profile_path(qgis_profiles_path: str, profile_name: str) -> str:
+    """Returns the path to a profile's directory, with a trailing separator"""
+    return adjust_to_operating_system(qgis_profiles_path + "/" + profile_name + "/")
+
+
+def get_profile_ini_path(qgis_profiles_path: str, profile_name: str) -> str:
+    """Returns the path to a profile's QGIS3.ini, which is in qgis.org/ instead of QGIS/ on macOS"""
+    return adjust_to_operating_system(
+        qgis_profiles_path + "/" + profile_name + "/QGIS/QGIS3.ini"
+    )
+
+
 def tr(message):
     # for translating in non-QObject class contexts
     return QCoreApplication.translate("ProfileManager", message)
+
+
+def get_file_state(file_path: str) -> list[int]:
+    """Returns the modification time and size of a file, None if it does not exist"""
+    try:
+        file_stat = stat(file_path)
+    except OSError:
+        return None
+    return [file_stat.st_mtime_ns, file_stat.st_size]
+
+
+def get_directory_state(directory: str) -> str:
+    """Returns a digest of the paths, modification times and sizes of all files in a directory tree.
+
+    The digest changes if any file or subdirectory is added, removed or modified. None if the
+    directory does not exist.
+    """
+    if not path.isdir(directory):
+        return None
+    digest = sha256()
+    for current_dir, dir_names, file_names in walk(directory):
+        dir_names.sort()
+        for name in sorted(dir_names + file_names):
+            entry_path = path.join(current_dir, name)
+            try:
+                entry_stat = lstat(entry_path)
+            except OSError:
+                continue
+            relative_path = path.relpath(entry_path, directory)
+            digest.update(relative_path.encode("utf-8", "surrogateescape"))
+            digest.update(
+                f"\0{entry_stat.st_mtime_ns}\0{entry_stat.st_size}\0".encode()
+            )
+    return digest.hexdigest()
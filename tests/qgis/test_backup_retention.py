@@ -0,0 +1,66 @@
+import os
+
+from profile_manager.backups.backup_creator import create_backup
+from profile_manager.backups.backup_retention import prune_backups
+
+MEGABYTE = 1024 * 1024
+
+
+def create_profile(tmp_path):
+    profile_path = tmp_path / "profile"
+    (profile_path / "QGIS").mkdir(parents=True)
+    (profile_path / "QGIS" / "QGIS3.ini").write_bytes(b"x" * MEGABYTE)
+    return profile_path
+
+
+def test_hardlinked_files_are_counted_once(tmp_path):
+    profile_path = create_profile(tmp_path)
+    backup_path = tmp_path / "backups"
+    backups = [
+        create_backup(f"{profile_path}/", f"{backup_path}/", "profile")
+        for _ in range(3)
+    ]
+    # the incremental backups share the unchanged INI file
+    assert os.stat(os.path.join(backups[-1], "QGIS", "QGIS3.ini")).st_nlink == 3
+
+    removed = prune_backups(
+        f"{backup_path}/", 10, 0, 0, max_total_bytes=int(1.5 * MEGABYTE)
+    )
+    assert removed == []
+    assert all(os.path.isdir(backup) for backup in backups)
+
+
+def test_oldest_backups_are_removed_until_the_budget_fits(tmp_path):
+    profile_path = create_profile(tmp_path)
+    backup_path = tmp_path / "backups"
+    backups = []
+    for content in (b"a", b"b", b"c"):
+        (profile_path / "QGIS" / "QGIS3.ini").write_bytes(content * MEGABYTE)
+        backups.append(create_backup(f"{profile_path}/", f"{backup_path}/", "profile"))
+
+    removed = prune_backups(
+        f"{backup_path}/", 10, 0, 0, max_total_bytes=int(1.5 * MEGABYTE)
+    )
+    assert removed == backups[:2]
+    assert os.path.isdir(backups[2])
+
+
+def test_latest_backup_is_kept_over_budget(tmp_path):
+    profile_path = create_profile(tmp_path)
+    backup_path = tmp_path / "backups"
+    backup = create_backup(f"{profile_path}/", f"{backup_path}/", "profile")
+
+    assert prune_backups(f"{backup_path}/", 1, 0, 0, max_total_bytes=1) == []
+    assert os.path.isdir(backup)
+
+
+def test_retention_policy_keeps_the_most_recent_backups(tmp_path):
+    profile_path = create_profile(tmp_path)
+    backup_path = tmp_path / "backups"
+    backups = [
+        create_backup(f"{profile_path}/", f"{backup_path}/", "profile")
+        for _ in range(4)
+    ]
+
+    removed = prune_backups(f"{backup_path}/", 2, 0, 0)
+    assert sorted(removed) == sorted(backups[:2])
@@ -0,0 +1,126 @@
+import os
+
+import pytest
+
+from profile_manager.datasources.bookmarks.bookmark_displayer import parse_extent
+from profile_manager.datasources.bookmarks.bookmark_handler import (
+    import_bookmarks,
+    iterate_bookmarks,
+    plan_bookmark_import,
+)
+from profile_manager.datasources.bookmarks.bookmark_index import BookmarkIndex
+
+BOOKMARK = (
+    '<Bookmark id="{id}" group="{group}" name="{name}" '
+    'extent="POLYGON(({x0} {y0}, {x1} {y0}, {x1} {y1}, {x0} {y1}, {x0} {y0}))">'
+    '<spatialrefsys nativeFormat="Wkt"><authid>EPSG:4326</authid></spatialrefsys>'
+    "</Bookmark>"
+)
+
+
+def write_bookmarks(file_path, bookmarks):
+    file_path.write_text(
+        "<Bookmarks>"
+        + "".join(
+            BOOKMARK.format(id=position, **bookmark)
+            for position, bookmark in enumerate(bookmarks)
+        )
+        + "</Bookmarks>"
+    )
+    return str(file_path)
+
+
+def create_bookmark(name, group="", x0=0, y0=0, x1=1, y1=1):
+    return {"name": name, "group": group, "x0": x0, "y0": y0, "x1": x1, "y1": y1}
+
+
+@pytest.fixture
+def bookmark_file(tmp_path):
+    return write_bookmarks(
+        tmp_path / "bookmarks.xml",
+        [
+            create_bookmark("Bern", "Switzerland", 7.3, 46.9, 7.5, 47.0),
+            create_bookmark("Zurich", "Switzerland", 8.4, 47.3, 8.6, 47.4),
+            create_bookmark("Paris", "France", 2.2, 48.8, 2.5, 48.9),
+            create_bookmark("Ungrouped", "", 7.0, 46.0, 7.1, 46.1),
+        ],
+    )
+
+
+def get_bookmark_names(bookmark_file):
+    return [bookmark.get("name") for bookmark in iterate_bookmarks(bookmark_file)]
+
+
+def test_import_skips_duplicates_with_other_ids(tmp_path, bookmark_file):
+    target_file = write_bookmarks(
+        tmp_path / "target.xml",
+        [
+            create_bookmark("Local"),
+            # same content as Zurich in the source, but another id
+            create_bookmark("Zurich", "Switzerland", 8.4, 47.3, 8.6, 47.4),
+            # same name as Bern in the source, but another extent
+            create_bookmark("Bern", "Switzerland", 7.0, 46.0, 8.0, 47.0),
+        ],
+    )
+
+    new_bookmarks, existing_bookmarks = plan_bookmark_import(bookmark_file, target_file)
+    assert new_bookmarks == [(0, "Bern"), (2, "Paris"), (3, "Ungrouped")]
+    assert existing_bookmarks == [(1, "Zurich")]
+
+    assert import_bookmarks(bookmark_file, target_file) is None
+    assert get_bookmark_names(target_file) == [
+        "Local",
+        "Zurich",
+        "Bern",
+        "Bern",
+        "Paris",
+        "Ungrouped",
+    ]
+
+    # importing again adds nothing
+    assert import_bookmarks(bookmark_file, target_file) is None
+    assert len(get_bookmark_names(target_file)) == 6
+
+
+def test_import_only_the_filtered_positions(tmp_path, bookmark_file):
+    target_file = str(tmp_path / "new" / "bookmarks.xml")
+    (tmp_path / "new").mkdir()
+
+    assert import_bookmarks(bookmark_file, target_file, frozenset({1, 3})) is None
+
+    assert get_bookmark_names(target_file) == ["Zurich", "Ungrouped"]
+
+
+def test_invalid_source_leaves_the_target_untouched(tmp_path, bookmark_file):
+    source_file = tmp_path / "broken.xml"
+    source_file.write_text("<Bookmarks><Bookmark")
+    content = open(bookmark_file).read()
+
+    assert import_bookmarks(str(source_file), bookmark_file) is not None
+
+    assert open(bookmark_file).read() == content
+    assert sorted(os.listdir(tmp_path)) == ["bookmarks.xml", "broken.xml"]
+
+
+def test_filter_by_group_and_extent(bookmark_file):
+    index = BookmarkIndex(bookmark_file)
+
+    assert index.count() == 4
+    assert index.get_groups() == ["", "France", "Switzerland"]
+    assert index.filter() == [0, 1, 2, 3]
+    assert index.filter(["Switzerland", ""]) == [0, 1, 3]
+    assert index.filter(None, (7.0, 46.5, 8.0, 47.5)) == [0]
+    assert index.filter(["France"], (7.0, 46.5, 9.0, 47.5)) == []
+
+
+def test_parse_extent_orders_the_corners():
+    assert parse_extent("") is None
+    assert parse_extent(" 8, 47.5 ,7,46.5") == (7.0, 46.5, 8.0, 47.5)
+
+
+@pytest.mark.parametrize(
+    "text", ["7, 46.5, 8", "a, b, c, d", "7, 46, 8, 47, 9", "nan,0,1,1"]
+)
+def test_invalid_extent_is_rejected(text):
+    with pytest.raises(ValueError, match="Invalid extent"):
+        parse_extent(text)
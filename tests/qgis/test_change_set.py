@@ -0,0 +1,157 @@
+import hashlib
+import os
+import sqlite3
+
+import pytest
+
+from profile_manager.backups.backup_creator import create_backup
+from profile_manager.datasources.dataservices.change_set import (
+    ADDED,
+    MISSING,
+    UNCHANGED,
+    ChangeSetOutdated,
+    compute_import_change_set,
+)
+from profile_manager.datasources.dataservices.datasource_handler import create_selection
+from profile_manager.datasources.styles.style_handler import import_styles
+from profile_manager.tasks.datasource_tasks import ImportTask
+
+SOURCE_INI = r"""[qgis]
+connections-wms\A\url=https://a.example.com
+connections-wms\B\url=https://b.example.com
+
+[PythonPlugins]
+foo=true
+"""
+TARGET_INI = r"""[qgis]
+connections-wms\A\url=https://a.example.com
+
+[PythonPlugins]
+bar=true
+"""
+
+
+@pytest.fixture
+def profiles_path(tmp_path):
+    for profile_name, ini in (("source", SOURCE_INI), ("target", TARGET_INI)):
+        (tmp_path / profile_name / "QGIS").mkdir(parents=True)
+        (tmp_path / profile_name / "QGIS" / "QGIS3.ini").write_text(ini)
+        (tmp_path / profile_name / "python" / "plugins").mkdir(parents=True)
+    plugin_dir = tmp_path / "source" / "python" / "plugins" / "foo"
+    (plugin_dir / "sub").mkdir(parents=True)
+    (plugin_dir / "__init__.py").write_text("")
+    (plugin_dir / "sub" / "module.py").write_text("VALUE = 1\n")
+    return tmp_path
+
+
+def get_tree_digest(directory):
+    digest = hashlib.sha256()
+    for current_dir, dir_names, file_names in sorted(os.walk(directory)):
+        dir_names.sort()
+        for file_name in sorted(file_names):
+            file_path = os.path.join(current_dir, file_name)
+            digest.update(file_path.encode())
+            with open(file_path, "rb") as file:
+                digest.update(file.read())
+    return digest.hexdigest()
+
+
+def create_import_task(profiles_path, selection, change_set=None):
+    def backup_function(is_canceled):
+        return create_backup(
+            selection.target_profile_path,
+            f"{profiles_path}/backups/",
+            "target",
+            is_canceled=is_canceled,
+        )
+
+    return ImportTask(selection, backup_function, change_set)
+
+
+def test_change_set_is_computed_without_writing(profiles_path):
+    selection = create_selection(
+        str(profiles_path),
+        "source",
+        "target",
+        checked_sources={"WMS": ["A", "B"]},
+        plugin_names=["foo", "missing"],
+    )
+    target_digest = get_tree_digest(profiles_path / "target")
+
+    change_set = compute_import_change_set(selection)
+
+    assert get_tree_digest(profiles_path / "target") == target_digest
+    changes = {(change.item, change.action) for change in change_set.changes}
+    assert ("foo", ADDED) in changes
+    assert ("[PythonPlugins] foo", ADDED) in changes
+    assert ("missing", MISSING) in changes
+    assert (r"[qgis] connections-wms\A\url", UNCHANGED) in changes
+    assert (r"[qgis] connections-wms\B\url", ADDED) in changes
+    assert change_set.is_current()
+
+
+def test_confirmed_change_set_is_applied(profiles_path):
+    selection = create_selection(
+        str(profiles_path),
+        "source",
+        "target",
+        checked_sources={"WMS": ["B"]},
+        plugin_names=["foo"],
+    )
+    change_set = compute_import_change_set(selection)
+
+    task = create_import_task(profiles_path, selection, change_set)
+    assert task.run(), task.exception
+
+    target_ini = (profiles_path / "target" / "QGIS" / "QGIS3.ini").read_text()
+    assert r"connections-wms\B\url=https://b.example.com" in target_ini
+    assert "foo=true" in target_ini
+    assert (
+        profiles_path / "target" / "python" / "plugins" / "foo" / "sub" / "module.py"
+    ).is_file()
+
+
+def test_change_in_plugin_tree_outdates_the_change_set(profiles_path):
+    selection = create_selection(
+        str(profiles_path), "source", "target", plugin_names=["foo"]
+    )
+    change_set = compute_import_change_set(selection)
+    target_digest = get_tree_digest(profiles_path / "target")
+
+    # only a nested file changes, the plugin's top level directory is untouched
+    module_file = (
+        profiles_path / "source" / "python" / "plugins" / "foo" / "sub" / "module.py"
+    )
+    module_file.write_text("VALUE = 22\n")
+    assert not change_set.is_current()
+
+    task = create_import_task(profiles_path, selection, change_set)
+    assert not task.run()
+    assert isinstance(task.exception, ChangeSetOutdated)
+    assert get_tree_digest(profiles_path / "target") == target_digest
+
+
+def test_style_import_is_rolled_back_if_it_differs_from_the_plan(profiles_path):
+    for profile_name, xml in (("source", "<symbol a='1'/>"), ("target", "<symbol/>")):
+        db = sqlite3.connect(profiles_path / profile_name / "symbology-style.db")
+        db.execute(
+            "CREATE TABLE symbol (id INTEGER PRIMARY KEY, name TEXT UNIQUE, xml TEXT, "
+            "favorite INTEGER)"
+        )
+        db.execute("INSERT INTO symbol (name, xml) VALUES ('Roads', ?)", (xml,))
+        db.commit()
+        db.close()
+    selection = create_selection(str(profiles_path), "source", "target", styles=True)
+    change_set = compute_import_change_set(selection)
+    assert change_set.style_summary.renamed == ["symbol: Roads -> Roads (1)"]
+
+    change_set.style_summary.renamed = []
+    error_message = import_styles(
+        selection.source_profile_path,
+        selection.target_profile_path,
+        planned_summary=change_set.style_summary,
+    )
+    assert "changed since the preview" in error_message
+    db = sqlite3.connect(profiles_path / "target" / "symbology-style.db")
+    assert db.execute("SELECT name FROM symbol").fetchall() == [("Roads",)]
+    db.close()
@@ -0,0 +1,68 @@
+import os
+
+from profile_manager.datasources.dataservices.directory_sync import sync_directory
+
+
+def write_file(file_path, content, mtime_ns=None):
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    file_path.write_text(content)
+    if mtime_ns is not None:
+        os.utime(file_path, ns=(mtime_ns, mtime_ns))
+
+
+def test_sync_copies_changed_files_and_reports_conflicts(tmp_path):
+    source, target = tmp_path / "source", tmp_path / "target"
+    write_file(source / "same.txt", "same", 1_000_000_000)
+    write_file(target / "same.txt", "same", 1_000_000_000)
+    write_file(source / "changed.txt", "new", 2_000_000_000)
+    write_file(target / "changed.txt", "old", 1_000_000_000)
+    write_file(source / "edited.txt", "source", 1_000_000_000)
+    write_file(target / "edited.txt", "target", 2_000_000_000)
+    write_file(source / "sub" / "new.txt", "new")
+    write_file(target / "extra.txt", "kept")
+
+    summary = sync_directory(str(source), str(target))
+
+    assert summary.skipped == ["same.txt"]
+    assert sorted(summary.copied) == ["changed.txt", os.path.join("sub", "new.txt")]
+    assert summary.conflicts == ["edited.txt"]
+    assert summary.removed == []
+    assert (target / "changed.txt").read_text() == "new"
+    assert (target / "edited.txt").read_text() == "target"
+    assert (target / "extra.txt").exists()
+
+
+def test_sync_compares_touched_files_by_hash(tmp_path):
+    source, target = tmp_path / "source", tmp_path / "target"
+    write_file(source / "touched.txt", "same", 2_000_000_000)
+    write_file(target / "touched.txt", "same", 1_000_000_000)
+    write_file(source / "kept_time.txt", "new", 1_000_000_000)
+    write_file(target / "kept_time.txt", "old", 1_000_000_000)
+
+    summary = sync_directory(str(source), str(target), compare_hashes=True)
+
+    assert summary.skipped == ["touched.txt"]
+    assert summary.copied == ["kept_time.txt"]
+    assert os.stat(target / "touched.txt").st_mtime_ns == 2_000_000_000
+    assert (target / "kept_time.txt").read_text() == "new"
+
+
+def test_mirror_replaces_conflicts_and_removes_extra_files(tmp_path):
+    source, target = tmp_path / "source", tmp_path / "target"
+    write_file(source / "edited.txt", "source", 1_000_000_000)
+    write_file(target / "edited.txt", "target", 2_000_000_000)
+    write_file(source / "was_dir", "file")
+    write_file(target / "was_dir" / "inner.txt", "inner")
+    write_file(target / "extra" / "file.txt", "extra")
+
+    dry_summary = sync_directory(str(source), str(target), dry_run=True, mirror=True)
+    assert (target / "edited.txt").read_text() == "target"
+
+    summary = sync_directory(str(source), str(target), mirror=True)
+
+    assert summary == dry_summary
+    assert summary.conflicts == []
+    assert sorted(summary.copied) == ["edited.txt", "was_dir"]
+    assert sorted(summary.removed) == ["extra", "was_dir"]
+    assert sorted(os.listdir(target)) == ["edited.txt", "was_dir"]
+    assert (target / "was_dir").read_text() == "file"
@@ -0,0 +1,121 @@
+import json
+
+import pytest
+
+from profile_manager.datasources.dataservices.datasource_provider import ProfileSnapshot
+from profile_manager.datasources.dataservices.import_plan import (
+    ImportPlan,
+    compile_recipe,
+    load_import_plan,
+    select_data_sources,
+    select_plugins,
+)
+
+SOURCE_INI = r"""[PostgreSQL]
+connections\Shared\host=db.example.com
+connections\Local\host=localhost
+
+[SpatiaLite]
+connections\Cache\sqlitepath=/tmp/cache.sqlite
+
+[qgis]
+connections-wms\Shared\url=https://example.com/wms
+
+[PythonPlugins]
+qfieldsync=true
+processing=true
+"""
+
+
+@pytest.fixture
+def profiles_path(tmp_path):
+    for profile_name in ("source", "target"):
+        (tmp_path / profile_name / "QGIS").mkdir(parents=True)
+    (tmp_path / "source" / "QGIS" / "QGIS3.ini").write_text(SOURCE_INI)
+    (tmp_path / "target" / "QGIS" / "QGIS3.ini").write_text("")
+    return tmp_path
+
+
+@pytest.fixture
+def snapshot(profiles_path):
+    return ProfileSnapshot(str(profiles_path / "source" / "QGIS" / "QGIS3.ini"))
+
+
+def test_select_all_connections_of_a_provider(snapshot):
+    assert select_data_sources(snapshot, ["PostgreSQL/*"]) == {
+        "PostgreSQL": ["Shared", "Local"]
+    }
+
+
+def test_select_name_in_all_providers_matches_where_it_exists(snapshot):
+    assert select_data_sources(snapshot, ["*/Shared"]) == {
+        "PostgreSQL": ["Shared"],
+        "WMS": ["Shared"],
+    }
+    assert select_data_sources(snapshot, ["*/Cache"]) == {"SpatiaLite": ["Cache"]}
+
+
+def test_select_name_in_no_provider_raises(snapshot):
+    with pytest.raises(ValueError, match="not found"):
+        select_data_sources(snapshot, ["*/Missing"])
+    with pytest.raises(ValueError, match="not found"):
+        select_data_sources(snapshot, ["PostgreSQL/Cache"])
+
+
+@pytest.mark.parametrize("selector", ["PostgreSQL", "Unknown/*", 42])
+def test_select_malformed_selector_raises(snapshot, selector):
+    with pytest.raises(ValueError):
+        select_data_sources(snapshot, [selector])
+
+
+def test_select_plugins(snapshot):
+    assert select_plugins(snapshot, ["*"]) == ["qfieldsync"]
+    with pytest.raises(ValueError, match="not found"):
+        select_plugins(snapshot, ["missing_plugin"])
+
+
+def test_compile_recipe_resolves_wildcards(profiles_path):
+    plan = compile_recipe(
+        {
+            "source": "source",
+            "data_sources": ["*/Shared"],
+            "plugins": ["*"],
+            "bookmarks": True,
+        },
+        str(profiles_path),
+    )
+    assert plan.source_profile_name == "source"
+    assert plan.checked_sources == {"PostgreSQL": ["Shared"], "WMS": ["Shared"]}
+    assert plan.plugin_names == ["qfieldsync"]
+    assert plan.items["bookmarks"] is True
+    assert plan.items["styles"] is False
+
+
+@pytest.mark.parametrize(
+    "recipe",
+    [
+        [],
+        {"data_sources": []},
+        {"source": "missing"},
+        {"source": "source", "unknown": True},
+        {"source": "source", "plugins": "qfieldsync"},
+        {"source": "source", "styles": "yes"},
+    ],
+)
+def test_compile_invalid_recipe_raises(profiles_path, recipe):
+    with pytest.raises(ValueError):
+        compile_recipe(recipe, str(profiles_path))
+
+
+def test_saved_plan_is_reused_until_the_source_changes(profiles_path, tmp_path):
+    recipe_file = str(tmp_path / "recipe.json")
+    with open(recipe_file, "w") as file:
+        json.dump({"source": "source", "plugins": ["*"]}, file)
+    plan_file = str(tmp_path / "plan.json")
+    plan = load_import_plan(recipe_file, str(profiles_path), plan_file)
+
+    assert ImportPlan.load(plan_file) == plan
+    assert plan.is_current(recipe_file, str(profiles_path))
+    with open(profiles_path / "source" / "QGIS" / "QGIS3.ini", "a") as ini_file:
+        ini_file.write("[x]\ny=1\n")
+    assert not plan.is_current(recipe_file, str(profiles_path))
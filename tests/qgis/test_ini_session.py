@@ -0,0 +1,75 @@
+import os
+
+import pytest
+
+from profile_manager.datasources.dataservices import ini_session
+from profile_manager.datasources.dataservices.ini_session import (
+    IniSession,
+    open_ini_session,
+)
+
+INI = """[qgis]
+showTips=false
+"""
+
+
+@pytest.fixture
+def ini_file(tmp_path):
+    ini_file = tmp_path / "QGIS3.ini"
+    ini_file.write_text(INI)
+    os.chmod(ini_file, 0o600)
+    return ini_file
+
+
+def test_commit_replaces_the_file_keeping_its_mode(ini_file):
+    session = IniSession(str(ini_file))
+    session.ini_parser.set("qgis", "checkVersion", "false")
+    session.ini_parser["PythonPlugins"] = {"qfieldsync": "true"}
+
+    session.commit()
+
+    assert ini_file.read_text() == (
+        "[qgis]\nshowTips=false\ncheckVersion=false\n\n[PythonPlugins]\nqfieldsync=true\n\n"
+    )
+    assert os.stat(ini_file).st_mode & 0o777 == 0o600
+    assert os.listdir(ini_file.parent) == ["QGIS3.ini"]
+
+
+def test_failed_commit_leaves_the_file_untouched(ini_file, monkeypatch):
+    def fail_replace(source, target):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(ini_session, "replace", fail_replace)
+    session = IniSession(str(ini_file))
+    session.ini_parser.remove_section("qgis")
+
+    with pytest.raises(OSError):
+        session.commit()
+
+    assert ini_file.read_text() == INI
+    assert os.listdir(ini_file.parent) == ["QGIS3.ini"]
+
+
+def test_shared_session_is_only_written_by_its_owner(ini_file):
+    session = IniSession(str(ini_file))
+    with open_ini_session(str(ini_file), session) as parser:
+        parser.set("qgis", "checkVersion", "false")
+    with open_ini_session(str(ini_file), session) as parser:
+        parser.set("qgis", "showTips", "true")
+
+    assert ini_file.read_text() == INI
+    session.commit()
+    assert ini_file.read_text() == "[qgis]\nshowTips=true\ncheckVersion=false\n\n"
+
+
+def test_own_session_is_not_committed_if_the_block_raises(ini_file):
+    with pytest.raises(ValueError):
+        with open_ini_session(str(ini_file)) as parser:
+            parser.remove_section("qgis")
+            raise ValueError("import failed")
+
+    assert ini_file.read_text() == INI
+
+    with open_ini_session(str(ini_file)) as parser:
+        parser.remove_section("qgis")
+    assert ini_file.read_text() == ""
@@ -0,0 +1,77 @@
+import pytest
+
+import profile_manager.__main__ as command_line
+
+SOURCE_INI = r"""[PostgreSQL]
+connections\Shared\host=db.example.com
+
+[qgis]
+connections-wms\Shared\url=https://example.com/wms
+connections-wms\Other\url=https://example.com/other
+"""
+
+
+@pytest.fixture
+def profiles_path(tmp_path):
+    for profile_name, ini in (("source", SOURCE_INI), ("target", "")):
+        (tmp_path / profile_name / "QGIS").mkdir(parents=True)
+        (tmp_path / profile_name / "QGIS" / "QGIS3.ini").write_text(ini)
+    return tmp_path
+
+
+def run_main(profiles_path, *arguments):
+    return command_line.main(
+        [
+            "--profiles-path",
+            str(profiles_path),
+            "--backup-path",
+            str(profiles_path / "backups"),
+            *arguments,
+        ]
+    )
+
+
+def test_dry_run_prints_the_selected_connections(profiles_path, capsys):
+    exit_code = run_main(
+        profiles_path,
+        "--source",
+        "source",
+        "--data-source",
+        "*/Shared",
+        "--dry-run",
+        "target",
+    )
+
+    assert exit_code == 0
+    output = capsys.readouterr().out
+    assert output.startswith("target:\n")
+    assert r"[PostgreSQL] connections\Shared\host" in output
+    assert r"[qgis] connections-wms\Shared\url" in output
+    assert "Other" not in output
+    assert (profiles_path / "target" / "QGIS" / "QGIS3.ini").read_text() == ""
+    assert not (profiles_path / "backups").exists()
+    # QGIS is initialized like in the worker processes of an import
+    assert command_line.qgs_application is not None
+
+
+def test_selector_matching_no_provider_is_a_usage_error(profiles_path, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        run_main(
+            profiles_path,
+            "--source",
+            "source",
+            "--data-source",
+            "*/Missing",
+            "--dry-run",
+            "target",
+        )
+
+    assert exit_info.value.code == 2
+    assert "Data source '*/Missing' not found" in capsys.readouterr().err
+
+
+def test_source_profile_can_not_be_a_target(profiles_path, capsys):
+    with pytest.raises(SystemExit):
+        run_main(profiles_path, "--source", "source", "--all", "source")
+
+    assert "can not include the source profile" in capsys.readouterr().err
@@ -0,0 +1,62 @@
+from qgis.PyQt.QtCore import Qt
+
+from profile_manager.datasources.plugins.plugin_catalog import PluginInfo
+from profile_manager.datasources.plugins.plugin_list_model import (
+    NAME_COLUMN,
+    SIZE_COLUMN,
+    VERSION_COLUMN,
+    PluginListModel,
+)
+
+
+def create_model(checkable=True):
+    model = PluginListModel(checkable, ["processing"])
+    model.set_plugins(
+        [
+            PluginInfo(
+                "qgis2web",
+                name="qgis2web",
+                version="3.1",
+                size=3 * 1024 * 1024,
+                installed=True,
+                active=True,
+            ),
+            PluginInfo("old_tool", name="Old Tool", size=2048, installed=True),
+            PluginInfo("processing", active=True),
+        ]
+    )
+    return model
+
+
+def test_plugin_cells_by_role():
+    model = create_model()
+    index = model.index(1, NAME_COLUMN)
+
+    assert model.data(index) == "Old Tool (old_tool)"
+    assert model.data(index, Qt.UserRole) == "old tool (old_tool)"
+    assert model.data(index, Qt.CheckStateRole) == Qt.Unchecked
+    assert model.data(index, Qt.ToolTipRole) == "Directory: old_tool\nInactive"
+    assert model.data(index, Qt.FontRole).italic()
+    assert model.data(model.index(0, NAME_COLUMN), Qt.FontRole) is None
+    assert model.data(model.index(0, VERSION_COLUMN)) == "3.1"
+    assert model.data(model.index(0, SIZE_COLUMN)) == "3.0 MB"
+    assert model.data(model.index(0, SIZE_COLUMN), Qt.UserRole) == 3 * 1024 * 1024
+    assert model.data(model.index(0, VERSION_COLUMN), Qt.ToolTipRole) is None
+    assert model.data(index, Qt.DecorationRole) is None
+
+
+def test_check_all_skips_core_plugins():
+    model = create_model()
+    model.set_all_checked(True)
+
+    assert model.get_checked_plugin_names() == ["qgis2web", "old_tool"]
+    assert model.data(model.index(0, NAME_COLUMN), Qt.CheckStateRole) == Qt.Checked
+    assert model.data(model.index(2, NAME_COLUMN)) == "processing (Core Plugin)"
+
+    assert model.setData(model.index(0, NAME_COLUMN), Qt.Unchecked, Qt.CheckStateRole)
+    assert model.get_checked_plugin_names() == ["old_tool"]
+
+
+def test_uncheckable_model_has_no_check_state():
+    model = create_model(checkable=False)
+    assert model.data(model.index(0, NAME_COLUMN), Qt.CheckStateRole) is None
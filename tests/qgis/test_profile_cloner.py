@@ -0,0 +1,44 @@
+import errno
+
+import pytest
+
+from profile_manager.profiles import profile_cloner
+from profile_manager.profiles.profile_cloner import ProfileCloner
+
+
+def failing_ioctl(error_number):
+    def ioctl(*args):
+        raise OSError(error_number, "ioctl failed")
+
+    return ioctl
+
+
+@pytest.fixture
+def source_file(tmp_path):
+    file_path = tmp_path / "source.txt"
+    file_path.write_text("content")
+    return file_path
+
+
+def test_unsupported_reflink_falls_back_to_a_copy(tmp_path, source_file, monkeypatch):
+    monkeypatch.setattr(profile_cloner, "ioctl", failing_ioctl(errno.EOPNOTSUPP))
+    cloner = ProfileCloner(str(tmp_path))
+    target_file = tmp_path / "target.txt"
+
+    cloner(str(source_file), str(target_file))
+
+    assert target_file.read_text() == "content"
+    assert not cloner.can_reflink
+    assert cloner.file_counts == {"reflinked": 0, "copied": 1}
+
+
+def test_other_reflink_errors_are_raised(tmp_path, source_file, monkeypatch):
+    monkeypatch.setattr(profile_cloner, "ioctl", failing_ioctl(errno.ENOSPC))
+    cloner = ProfileCloner(str(tmp_path))
+    target_file = tmp_path / "target.txt"
+
+    with pytest.raises(OSError):
+        cloner(str(source_file), str(target_file))
+
+    assert cloner.can_reflink
+    assert not target_file.exists()
@@ -0,0 +1,92 @@
+import json
+
+import pytest
+
+from profile_manager.datasources.dataservices.profile_diff import (
+    DIFF_CATEGORIES,
+    diff_profiles,
+)
+
+INI = r"""[PostgreSQL]
+connections\Shared\host=db.example.com
+connections\Shared\port={port}
+connections\{name}\host=localhost
+
+[PythonPlugins]
+qfieldsync={active}
+
+[browser]
+favourites=/data/{name}, /data/common
+"""
+
+
+def create_profile(profile_path, name, port, active, version, script):
+    (profile_path / "QGIS").mkdir(parents=True)
+    (profile_path / "QGIS" / "QGIS3.ini").write_text(
+        INI.format(name=name, port=port, active=active)
+    )
+    plugin_dir = profile_path / "python" / "plugins" / "qfieldsync"
+    plugin_dir.mkdir(parents=True)
+    (plugin_dir / "metadata.txt").write_text(f"[general]\nversion={version}\n")
+    scripts_dir = profile_path / "processing" / "scripts"
+    scripts_dir.mkdir(parents=True)
+    (scripts_dir / "script.py").write_text(script)
+    (scripts_dir / f"{name}.py").write_text("")
+    return str(profile_path) + "/"
+
+
+@pytest.fixture
+def profile_a(tmp_path):
+    return create_profile(tmp_path / "a", "A", 5432, "true", "4.1", "print(1)")
+
+
+@pytest.fixture
+def profile_b(tmp_path):
+    return create_profile(tmp_path / "b", "B", 5433, "false", "4.2", "print(1)")
+
+
+def test_diff_lists_the_differing_items(profile_a, profile_b):
+    profile_diff = diff_profiles(profile_a, profile_b)
+
+    connections = profile_diff.categories["connections"]
+    assert connections.only_in_a == {"PostgreSQL/A": ""}
+    assert connections.only_in_b == {"PostgreSQL/B": ""}
+    assert connections.changed == {"PostgreSQL/Shared": ("", "")}
+    plugins = profile_diff.categories["plugins"]
+    assert plugins.changed == {"qfieldsync": ("4.1", "4.2 (inactive)")}
+    favourites = profile_diff.categories["favourites"]
+    assert favourites.only_in_a == {"/data/A": ""}
+    assert favourites.unchanged == 1
+    scripts = profile_diff.categories["scripts"]
+    assert scripts.only_in_a == {"A.py": ""}
+    assert scripts.changed == {}
+    assert scripts.unchanged == 1
+    assert profile_diff.count() == 8
+
+
+def test_identical_profiles_have_no_differences(profile_a):
+    profile_diff = diff_profiles(profile_a, profile_a)
+
+    assert list(profile_diff.categories) == DIFF_CATEGORIES
+    assert profile_diff.count() == 0
+
+
+def test_diff_scans_files_with_the_given_function(profile_a, profile_b, tmp_path):
+    scanned = []
+
+    def scan(file_path, scan_function, kind=None):
+        scanned.append((file_path, kind))
+        return scan_function(file_path)
+
+    diff_profiles(profile_a, profile_b, scan)
+
+    assert (profile_a + "QGIS/QGIS3.ini", "fingerprint") in scanned
+    assert (profile_b + "processing/scripts/script.py", None) in scanned
+
+    json_file = tmp_path / "diff.json"
+    diff_profiles(profile_a, profile_b, scan).save_json(str(json_file))
+    exported = json.loads(json_file.read_text())
+    assert exported["format"] == 1
+    assert exported["categories"]["plugins"]["changed"] == {
+        "qfieldsync": ["4.1", "4.2 (inactive)"]
+    }
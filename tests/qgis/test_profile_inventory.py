@@ -0,0 +1,104 @@
+import os
+import shutil
+
+import pytest
+
+from profile_manager.profiles.profile_inventory import ProfileInventory
+from profile_manager.utils import get_inventory_path
+
+INI = r"""[PostgreSQL]
+connections\{name}\host={host}
+connections\{name}\username=admin
+connections\{name}\password=secret
+
+[PythonPlugins]
+qfieldsync=true
+"""
+
+
+def write_profile(profiles_path, name, host):
+    ini_dir = profiles_path / name / "QGIS"
+    ini_dir.mkdir(parents=True, exist_ok=True)
+    (ini_dir / "QGIS3.ini").write_text(INI.format(name=name, host=host))
+    plugin_dir = profiles_path / name / "python" / "plugins" / "qfieldsync"
+    plugin_dir.mkdir(parents=True, exist_ok=True)
+    (plugin_dir / "metadata.txt").write_text("[general]\nversion=4.1\n")
+
+
+@pytest.fixture
+def profiles_path(tmp_path):
+    profiles_path = tmp_path / "profiles"
+    write_profile(profiles_path, "default", "db.example.com")
+    write_profile(profiles_path, "other", "old-db.example.com")
+    return profiles_path
+
+
+@pytest.fixture
+def inventory(profiles_path):
+    inventory = ProfileInventory(get_inventory_path(str(profiles_path)))
+    yield inventory
+    inventory.close()
+
+
+def test_inventory_is_stored_next_to_the_profiles(profiles_path):
+    assert get_inventory_path(str(profiles_path)) == str(
+        profiles_path.parent / "profile_manager_inventory.sqlite"
+    )
+
+
+def test_refresh_indexes_all_profiles_without_credentials(profiles_path, inventory):
+    progress = []
+
+    assert inventory.refresh(str(profiles_path), progress.append) == [
+        "default",
+        "other",
+    ]
+
+    assert sorted(progress) == ["default", "other"]
+    assert inventory.search("connection") == [
+        ("default", "PostgreSQL", "default", "host", "db.example.com"),
+        ("other", "PostgreSQL", "other", "host", "old-db.example.com"),
+    ]
+    assert inventory.search("connection", "old-db") == [
+        ("other", "PostgreSQL", "other", "host", "old-db.example.com"),
+    ]
+    assert inventory.count("plugin", "qfield") == 2
+    assert inventory.query(
+        "SELECT profile, version FROM plugin WHERE name = ? ORDER BY profile",
+        ["qfieldsync"],
+    ) == [
+        ("default", "4.1"),
+        ("other", "4.1"),
+    ]
+
+
+def test_refresh_only_rescans_changed_profiles(profiles_path, inventory):
+    inventory.refresh(str(profiles_path))
+    assert inventory.refresh(str(profiles_path)) == []
+
+    write_profile(profiles_path, "other", "new-db.example.com")
+    ini_file = profiles_path / "other" / "QGIS" / "QGIS3.ini"
+    # the new host has the same length, so only the modification time tells the change apart
+    os.utime(ini_file, (0, 0))
+
+    assert inventory.refresh(str(profiles_path)) == ["other"]
+    assert inventory.search("connection", "db.example.com") == [
+        ("default", "PostgreSQL", "default", "host", "db.example.com"),
+        ("other", "PostgreSQL", "other", "host", "new-db.example.com"),
+    ]
+
+
+def test_refresh_drops_removed_profiles(profiles_path, inventory):
+    inventory.refresh(str(profiles_path))
+
+    shutil.rmtree(profiles_path / "other")
+
+    assert inventory.refresh(str(profiles_path)) == []
+    assert inventory.search("connection", "other") == []
+    assert inventory.search("plugin") == [("default", "qfieldsync", "4.1", 1)]
+
+
+def test_canceled_refresh_scans_nothing(profiles_path, inventory):
+    assert inventory.refresh(str(profiles_path), is_canceled=lambda: True) == []
+
+    assert inventory.search("connection") == []
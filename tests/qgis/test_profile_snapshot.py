@@ -0,0 +1,45 @@
+import pytest
+
+from profile_manager.datasources.dataservices.datasource_distributor import (
+    remove_data_sources,
+)
+from profile_manager.datasources.dataservices.datasource_provider import ProfileSnapshot
+
+INI = r"""[PostgreSQL]
+connections\Shared\host=db.example.com
+connections\Local\host=localhost
+"""
+
+
+@pytest.fixture
+def ini_file(tmp_path):
+    ini_file = tmp_path / "QGIS3.ini"
+    ini_file.write_text(INI)
+    return ini_file
+
+
+def test_snapshot_refuses_changes(ini_file):
+    snapshot = ProfileSnapshot(str(ini_file))
+
+    with pytest.raises(TypeError):
+        snapshot.ini_parser.set("PostgreSQL", "connections\\Other\\host", "x")
+    with pytest.raises(TypeError):
+        snapshot.ini_parser.remove_option("PostgreSQL", "connections\\Local\\host")
+    with pytest.raises(TypeError):
+        snapshot.ini_parser["PostgreSQL"]["connections\\Other\\host"] = "x"
+    with pytest.raises(TypeError):
+        snapshot.ini_parser["New"] = {}
+    assert snapshot.get_data_source_connections("PostgreSQL") == ["Shared", "Local"]
+
+
+def test_removal_leaves_the_shared_snapshot_unchanged(ini_file):
+    snapshot = ProfileSnapshot(str(ini_file))
+
+    remove_data_sources(str(ini_file), {"PostgreSQL": ["Local"]}, {}, snapshot=snapshot)
+
+    assert "Local" not in ini_file.read_text()
+    assert "Shared" in ini_file.read_text()
+    assert snapshot.ini_parser.has_option("PostgreSQL", "connections\\Local\\host")
+    assert snapshot.get_connection_keys("PostgreSQL", "Local") == [
+        "connections\\Local\\host"
+    ]
@@ -0,0 +1,92 @@
+import sqlite3
+
+from profile_manager.datasources.styles.style_handler import (
+    import_styles,
+    plan_style_import,
+)
+
+
+def create_style_db(profile_path, symbols):
+    """Creates a symbology-style.db with the symbol and tag tables and the given (name, xml) symbols"""
+    db = sqlite3.connect(profile_path / "symbology-style.db")
+    db.executescript(
+        """
+        CREATE TABLE symbol (id INTEGER PRIMARY KEY, name TEXT UNIQUE, xml TEXT, favorite INTEGER);
+        CREATE TABLE tag (id INTEGER PRIMARY KEY, name TEXT);
+        CREATE TABLE tagmap (tag_id INTEGER, symbol_id INTEGER);
+        """
+    )
+    db.executemany("INSERT INTO symbol (name, xml, favorite) VALUES (?, ?, 0)", symbols)
+    db.commit()
+    db.close()
+
+
+def get_symbols(profile_path):
+    db = sqlite3.connect(profile_path / "symbology-style.db")
+    try:
+        return dict(db.execute("SELECT name, xml FROM symbol"))
+    finally:
+        db.close()
+
+
+def test_renamed_entry_does_not_collide_with_source_entry(tmp_path):
+    source, target = tmp_path / "source", tmp_path / "target"
+    source.mkdir()
+    target.mkdir()
+    create_style_db(
+        source,
+        [("Roads", '<symbol name="Roads" alpha="1"/>'), ("Roads (1)", "<symbol/>")],
+    )
+    create_style_db(target, [("Roads", '<symbol name="Roads" alpha="0.5"/>')])
+
+    summary = plan_style_import(f"{source}/", f"{target}/")
+    assert summary.renamed == ["symbol: Roads -> Roads (2)"]
+    assert summary.imported == ["symbol: Roads (1)"]
+
+    assert import_styles(f"{source}/", f"{target}/") is None
+    assert get_symbols(target) == {
+        "Roads": '<symbol name="Roads" alpha="0.5"/>',
+        "Roads (1)": "<symbol/>",
+        "Roads (2)": '<symbol name="Roads" alpha="1"/>',
+    }
+
+
+def test_formatting_only_differences_are_unchanged(tmp_path):
+    source, target = tmp_path / "source", tmp_path / "target"
+    source.mkdir()
+    target.mkdir()
+    create_style_db(
+        source, [("Blue", '<symbol name="Blue"  alpha="1"><layer/></symbol>')]
+    )
+    create_style_db(
+        target,
+        [("Blue", '<symbol alpha="1" name="Blue">\n  <layer></layer>\n</symbol>')],
+    )
+
+    summary = plan_style_import(f"{source}/", f"{target}/")
+    assert summary.unchanged == ["symbol: Blue"]
+    assert not summary.renamed
+
+
+def test_repeated_import_writes_nothing(tmp_path):
+    source, target = tmp_path / "source", tmp_path / "target"
+    source.mkdir()
+    target.mkdir()
+    create_style_db(source, [("Roads", "<symbol a='1'/>")])
+    create_style_db(target, [("Roads", "<symbol a='2'/>")])
+
+    import_styles(f"{source}/", f"{target}/")
+    import_styles(f"{source}/", f"{target}/")
+    assert sorted(get_symbols(target)) == ["Roads", "Roads (1)"]
+
+
+def test_conflicts_are_reported(tmp_path):
+    source, target = tmp_path / "source", tmp_path / "target"
+    source.mkdir()
+    target.mkdir()
+    create_style_db(source, [("Roads", "<symbol a='1'/>")])
+    create_style_db(target, [("Roads", "<symbol a='2'/>")])
+
+    error_message = import_styles(f"{source}/", f"{target}/", conflict_policy="report")
+    assert "symbol: Roads" in error_message
+    assert get_symbols(target) == {"Roads": "<symbol a='2'/>"}
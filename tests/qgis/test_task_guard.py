@@ -0,0 +1,64 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from profile_manager import profile_manager as profile_manager_module
+from profile_manager.profile_manager import ProfileManager
+from profile_manager.tasks.operation_task import OperationTask
+
+
+def create_task(*profile_paths):
+    task = OperationTask("Test operation")
+    task.written_profile_paths = list(profile_paths)
+    return task
+
+
+@pytest.fixture
+def profile_manager(monkeypatch):
+    monkeypatch.setattr(profile_manager_module, "QgsApplication", MagicMock())
+    monkeypatch.setattr(profile_manager_module, "QMessageBox", MagicMock())
+    profile_manager = ProfileManager(MagicMock())
+    profile_manager.interface_handler = MagicMock()
+    return profile_manager
+
+
+def test_task_writing_a_busy_profile_is_refused(profile_manager):
+    first_task = create_task("/profiles/target/")
+    profile_manager.start_task(first_task, MagicMock())
+
+    profile_manager.start_task(create_task("/profiles/target"), MagicMock())
+
+    assert profile_manager.running_tasks == [first_task]
+    profile_manager_module.QMessageBox.warning.assert_called_once()
+    profile_manager_module.QgsApplication.taskManager().addTask.assert_called_once_with(
+        first_task
+    )
+
+
+def test_tasks_writing_other_profiles_run_at_the_same_time(profile_manager):
+    tasks = [
+        create_task("/profiles/one/"),
+        create_task("/profiles/two/"),
+        create_task(),
+    ]
+    for task in tasks:
+        profile_manager.start_task(task, MagicMock())
+
+    assert profile_manager.running_tasks == tasks
+    profile_manager_module.QMessageBox.warning.assert_not_called()
+
+
+def test_profile_is_writable_again_once_the_task_finished(profile_manager):
+    first_task = create_task("/profiles/target/")
+    finished_callback = MagicMock()
+    profile_manager.start_task(first_task, finished_callback)
+    first_task.finished(True)
+
+    finished_callback.assert_called_once_with(first_task)
+    assert profile_manager.running_tasks == []
+    assert profile_manager.current_task is None
+    profile_manager.interface_handler.hide_task.assert_called_once()
+
+    second_task = create_task("/profiles/target/")
+    profile_manager.start_task(second_task, MagicMock())
+    assert profile_manager.running_tasks == [second_task]